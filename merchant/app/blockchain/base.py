@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from typing import Dict, List, Optional, Tuple
+import asyncio
 from decimal import Decimal
 from app.models import ChainType, TokenType
 
@@ -10,11 +11,24 @@ class BlockchainInterface(ABC):
         self.rpc_url = rpc_url
         self.chain = chain
     
+    async def open(self):
+        """Open connections (called from the app lifespan)"""
+        pass
+    
+    async def close(self):
+        """Close connections (called from the app lifespan)"""
+        pass
+    
     @abstractmethod
     async def get_balance(self, address: str, token: TokenType) -> Decimal:
         """Get token balance for an address"""
         pass
     
+    async def get_balances(self, requests: List[Tuple[str, TokenType]]) -> List[Optional[Decimal]]:
+        """Get token balances of many (address, token) pairs, None where a read failed"""
+        results = await asyncio.gather(*(self.get_balance(address, token) for address, token in requests), return_exceptions=True)
+        return [None if isinstance(result, Exception) else result for result in results]
+    
     @abstractmethod
     async def get_native_balance(self, address: str) -> Decimal:
         """Get native token balance (ETH, BNB, AVAX, etc.)"""
@@ -35,6 +49,10 @@ class BlockchainInterface(ABC):
         """Get transaction status and details"""
         pass
     
+    async def get_transaction_statuses(self, tx_hashes: List[str]) -> List[Dict]:
+        """Get status and details of many transactions"""
+        return list(await asyncio.gather(*(self.get_transaction_status(tx_hash) for tx_hash in tx_hashes)))
+    
     @abstractmethod
     async def get_token_contract_address(self, token: TokenType) -> str:
         """Get token contract address for this chain"""
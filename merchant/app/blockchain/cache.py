@@ -0,0 +1,123 @@
+"""
+Block-height-aware cache in front of an EVM chain's RPC endpoints.
+
+Two kinds of answers are cached:
+
+- Head-dependent ones (balances, the latest block number, pending or shallow
+  transaction statuses) are keyed by the hash of the head they were read at.
+  When a new head arrives, or a reorg replaces the current one, their keys stop
+  matching and the next read goes to the chain.
+- Final ones (statuses of transactions at least `confirmations` blocks deep)
+  never change, so they are kept until evicted. Reorgs deeper than the chain's
+  confirmation depth are outside this model, as they are for payment
+  verification itself.
+
+The head comes from the chain's HeadTracker (app/blockchain/heads.py), whose
+head-change events drive set_head(). Both tiers are LRU-bounded and can share
+a Redis tier (RPC_CACHE_REDIS).
+"""
+
+from typing import Any, Dict, Optional
+import logging
+
+from app.blockchain.heads import Head, HeadTracker
+from app.core.cache import TieredCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+async def _miss() -> None:
+    return None
+
+class ChainCache:
+    """RPC response cache for one EVM chain"""
+    
+    def __init__(self, chain: str, confirmations: int, heads: HeadTracker):
+        self.chain = chain
+        self.confirmations = confirmations
+        self.heads = heads
+        block_time = heads.block_time
+        redis_url = settings.redis_url if settings.rpc_cache_redis else ""
+        # An entry more than a few blocks old can no longer match the head
+        self.at_head = TieredCache(
+            f"rpc:{chain}:head", settings.rpc_cache_max_entries, block_time * 4, redis_url, max(1, int(block_time * 4))
+        )
+        self.final = TieredCache(
+            f"rpc:{chain}:final", settings.rpc_cache_max_entries, float("inf"), redis_url, settings.rpc_cache_redis_ttl_seconds
+        )
+        self.head: Optional[Head] = None
+        heads.subscribe(self.set_head)
+        self.reorgs = 0
+        self.head_errors = 0
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+    
+    def set_head(self, head: Head):
+        """Record a new head, dropping head-dependent entries if it replaces blocks we had seen"""
+        current = self.head
+        reorg = current is not None and (
+            head.number < current.number
+            or (head.number == current.number and head.hash != current.hash)
+            or (head.number == current.number + 1 and head.parent_hash != current.hash)
+        )
+        if reorg:
+            self.reorgs += 1
+            # Their keys no longer match anyway; clearing frees the space straight away
+            self.at_head.local.entries.clear()
+            logger.warning(f"❌ Reorg on {self.chain}: head {current.number} {current.hash[:10]} replaced by {head.number} {head.hash[:10]}")
+        self.head = head
+    
+    async def current_head(self) -> Optional[Head]:
+        """Head to key entries by; None if it cannot be read"""
+        try:
+            return await self.heads.latest()
+        except Exception:
+            # A stale head would pin answers to an old block; callers read the chain instead
+            self.head_errors += 1
+            return None
+    
+    def is_final(self, head: Head, block_number: Optional[int]) -> bool:
+        """Whether a block is deep enough below `head` that it will not be reorganised away"""
+        return block_number is not None and head.number - block_number >= self.confirmations
+    
+    def _count(self, method: str, hit: bool):
+        counters = self.hits if hit else self.misses
+        counters[method] = counters.get(method, 0) + 1
+    
+    async def get_at_head(self, head: Head, method: str, key: str) -> Optional[Any]:
+        """Value cached at `head`, or None"""
+        value = await self.at_head.get(f"{head.hash}:{method}:{key}", _miss)
+        self._count(method, value is not None)
+        return value
+    
+    async def put_at_head(self, head: Head, method: str, key: str, value: Any):
+        """Store a value read while `head` was the latest block"""
+        await self.at_head.put(f"{head.hash}:{method}:{key}", value)
+    
+    async def get_final(self, method: str, key: str) -> Optional[Any]:
+        """Value cached for good, or None (not counted as a miss; callers fall through to get_at_head)"""
+        value = await self.final.get(f"{method}:{key}", _miss)
+        if value is not None:
+            self._count(method, True)
+        return value
+    
+    async def put_final(self, method: str, key: str, value: Any):
+        await self.final.put(f"{method}:{key}", value)
+    
+    async def close(self):
+        await self.at_head.close()
+        await self.final.close()
+    
+    def stats(self) -> Dict[str, Any]:
+        methods = {}
+        for method in sorted(set(self.hits) | set(self.misses)):
+            hits, misses = self.hits.get(method, 0), self.misses.get(method, 0)
+            methods[method] = {"hits": hits, "misses": misses, "hit_ratio": round(hits / (hits + misses), 4)}
+        return {
+            "head": self.head.number if self.head else None,
+            "reorgs": self.reorgs,
+            "head_errors": self.head_errors,
+            "methods": methods,
+            "at_head": self.at_head.stats(),
+            "final": self.final.stats(),
+        }
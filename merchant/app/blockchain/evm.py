@@ -0,0 +1,394 @@
+from web3 import AsyncWeb3
+from web3.middleware import async_geth_poa_middleware
+from eth_abi import decode, encode
+from eth_utils import function_signature_to_4byte_selector, to_checksum_address
+from typing import Any, Dict, List, Optional, Tuple
+from decimal import Decimal
+import asyncio
+import logging
+import aiohttp
+
+from app.blockchain.base import BlockchainInterface
+from app.blockchain.cache import ChainCache
+from app.blockchain.fees import URGENCY_LEVELS, FeeOracle, GasLimits
+from app.blockchain.heads import Head, HeadTracker
+from app.blockchain.nonces import NonceManager
+from app.blockchain.rpc import PoolProvider, RpcPool, RpcTransport
+from app.blockchain.signing import create_evm_account, sign_evm_transaction
+from app.blockchain.tokens import Token, token_registry
+from app.core.executor import crypto_executor
+from app.models import ChainType, TokenType
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# ERC-20 calldata is encoded directly; selectors are computed once at import
+BALANCE_OF = function_signature_to_4byte_selector("balanceOf(address)")
+DECIMALS = function_signature_to_4byte_selector("decimals()")
+TRANSFER = function_signature_to_4byte_selector("transfer(address,uint256)")
+AGGREGATE3 = function_signature_to_4byte_selector("aggregate3((address,bool,bytes)[])")
+
+# Multicall3 has the same address on every chain it is deployed to
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+DEFAULT_GAS_LIMIT = 100000  # Gas limit for an ERC-20 transfer until more is seen to be needed
+NATIVE_DECIMALS = 18
+
+TX_NOT_FOUND = "Transaction not found"
+TX_NOT_MINED = "Transaction not yet mined"
+
+def balance_of_data(address: str) -> bytes:
+    return BALANCE_OF + encode(["address"], [address])
+
+def transfer_data(to_address: str, amount: int) -> bytes:
+    return TRANSFER + encode(["address", "uint256"], [to_address, amount])
+
+def aggregate3_data(calls: List[Tuple[str, bytes]]) -> bytes:
+    """Multicall3 aggregate3 calldata for (target, calldata) pairs, each allowed to fail on its own"""
+    return AGGREGATE3 + encode(["(address,bool,bytes)[]"], [[(target, True, data) for target, data in calls]])
+
+def decode_aggregate3(result: bytes) -> List[Optional[bytes]]:
+    """Return data of each aggregated call, None where the call reverted"""
+    (results,) = decode(["(bool,bytes)[]"], result)
+    return [data if success else None for success, data in results]
+
+def transaction_status(tx_hash: str, tx: Any, receipt: Any) -> Dict:
+    """Status dict from raw eth_getTransactionByHash / eth_getTransactionReceipt results"""
+    for result in (tx, receipt):
+        if isinstance(result, Exception):
+            return {"tx_hash": tx_hash, "status": "pending", "error": str(result)}
+    if tx is None:
+        return {"tx_hash": tx_hash, "status": "pending", "error": TX_NOT_FOUND}
+    if receipt is None:
+        return {"tx_hash": tx_hash, "status": "pending", "error": TX_NOT_MINED}
+    
+    return {
+        "tx_hash": tx_hash,
+        "status": "confirmed" if int(receipt["status"], 16) == 1 else "failed",
+        "block_number": int(receipt["blockNumber"], 16),
+        "gas_used": int(receipt["gasUsed"], 16),
+        "from": to_checksum_address(tx["from"]) if tx.get("from") else None,
+        "to": to_checksum_address(tx["to"]) if tx.get("to") else None,
+        "value": int(tx["value"], 16) if tx.get("value") else None,
+        "gas_price": int(tx["gasPrice"], 16) if tx.get("gasPrice") else None
+    }
+
+class EVMChain(BlockchainInterface):
+    """EVM chain integration configured by an entry of settings.evm_chains
+    
+    Every EVM network (Ethereum, Polygon, BSC, Avalanche C-Chain, ...) runs on this
+    one engine; they differ only in chain id, RPC endpoints, tokens, PoA flag,
+    fee model and confirmation depth.
+    """
+    
+    def __init__(self, chain: ChainType, config: Dict[str, Any]):
+        super().__init__(config["rpc_urls"][0] if config["rpc_urls"] else "", chain)
+        self.chain_id: int = config["chain_id"]
+        self.fee_model: str = config.get("fee_model", "legacy")
+        self.confirmations: int = config.get("confirmations", 1)
+        self.block_time: float = config.get("block_time", 2.0)
+        self.native_symbol: str = config.get("native_symbol", "ETH")
+        # None where Multicall3 is not deployed; batched reads then fall back to one call each
+        self.multicall_address: Optional[str] = config.get("multicall_address", MULTICALL3_ADDRESS)
+        self.multicall_batches = 0
+        self.multicall_calls = 0
+        self.multicall_failures = 0
+        if self.fee_model not in ("legacy", "eip1559"):
+            raise ValueError(f"Unsupported fee model for {chain.value}: {self.fee_model}")
+        
+        # Every call, through web3 or batched, is routed over the chain's endpoints by one pool
+        self.pool = RpcPool(config["rpc_urls"])
+        self.w3 = AsyncWeb3(PoolProvider(self.pool))
+        self.session: Optional[aiohttp.ClientSession] = None
+        # The validation middleware asks for eth_chainId before every eth_call; the chain id is configured
+        self.w3.middleware_onion.remove("validation")
+        if config.get("poa"):
+            # PoA chains put extra data in block headers
+            self.w3.middleware_onion.inject(async_geth_poa_middleware, layer=0)
+        self.transport = RpcTransport(self.pool)
+        # Nonces of the wallets sending on this chain, handed out without a round trip per send
+        self.nonces = NonceManager(chain.value, self._fetch_pending_nonce)
+        # Latest block, followed in the background once the app has started
+        self.heads = HeadTracker(chain.value, self._fetch_head, self.block_time, config.get("ws_url", ""))
+        # Fee suggestions refreshed on every head, and gas limits learned per token contract
+        self.fee_oracle = FeeOracle(chain.value, self.fee_model, self.heads, self.w3)
+        self.gas_limits = GasLimits(DEFAULT_GAS_LIMIT)
+        self.token_addresses = {entry.address.lower() for entry in token_registry.tokens.get(chain, {}).values()}
+        # Balances and statuses already read at the current head (None when RPC_CACHE_ENABLED=false)
+        self.cache: Optional[ChainCache] = None
+        if settings.rpc_cache_enabled:
+            self.cache = ChainCache(chain.value, self.confirmations, self.heads)
+    
+    async def open(self):
+        """Open a pooled HTTP session for the RPC endpoints (called from the app lifespan)"""
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=settings.rpc_max_connections),
+            timeout=aiohttp.ClientTimeout(total=settings.rpc_timeout_seconds),
+            raise_for_status=True
+        )
+        self.pool.session = self.session
+    
+    async def close(self):
+        """Close the RPC session (called from the app lifespan)"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+            self.pool.session = None
+        if self.cache is not None:
+            await self.cache.close()
+    
+    async def _fetch_head(self) -> Head:
+        block = await self.w3.eth.get_block("latest")
+        return Head(block["number"], block["hash"].hex(), block["parentHash"].hex(), block["timestamp"])
+    
+    async def _head(self) -> Optional[Head]:
+        """Head to key cache entries by, or None to read straight from the chain"""
+        return await self.cache.current_head() if self.cache is not None else None
+    
+    async def _call_uint(self, contract_address: str, data: bytes) -> int:
+        result = await self.w3.eth.call({"to": contract_address, "data": data})
+        return int.from_bytes(result, "big")
+    
+    async def _fetch_decimals(self, contract_address: str) -> int:
+        return await self._call_uint(contract_address, DECIMALS)
+    
+    async def _token(self, token: TokenType) -> Token:
+        """Registry entry for `token`; decimals come from config, or one RPC call the first time"""
+        return await token_registry.resolve(self.chain, token, self._fetch_decimals)
+    
+    async def get_balance(self, address: str, token: TokenType) -> Decimal:
+        """Get ERC-20 token balance"""
+        entry = await self._token(token)
+        head = await self._head()
+        key = f"{entry.address}:{address.lower()}"
+        if head is not None:
+            cached = await self.cache.get_at_head(head, "balanceOf", key)
+            if cached is not None:
+                return Decimal(cached)
+        
+        balance = entry.from_units(await self._call_uint(entry.address, balance_of_data(address)))
+        if head is not None:
+            await self.cache.put_at_head(head, "balanceOf", key, str(balance))
+        return balance
+    
+    async def get_balances(self, requests: List[Tuple[str, TokenType]]) -> List[Optional[Decimal]]:
+        """Get ERC-20 balances of many (address, token) pairs through Multicall3 aggregate3
+        
+        Pairs already read at the current head come from the cache; the rest are sent
+        in chunks of settings.multicall_batch_size calls, all in flight at once. A call
+        that reverts yields None without failing the rest of its chunk.
+        """
+        if not requests:
+            return []
+        if not self.multicall_address:
+            return await super().get_balances(requests)
+        
+        entries = [await self._token(token) for _, token in requests]
+        keys = [f"{entry.address}:{address.lower()}" for (address, _), entry in zip(requests, entries)]
+        balances: List[Optional[Decimal]] = [None] * len(requests)
+        head = await self._head()
+        if head is not None:
+            cached = await asyncio.gather(*(self.cache.get_at_head(head, "balanceOf", key) for key in keys))
+            balances = [Decimal(value) if value is not None else None for value in cached]
+        missing = [i for i, balance in enumerate(balances) if balance is None]
+        if not missing:
+            return balances
+        
+        calls = [(entries[i].address, balance_of_data(requests[i][0])) for i in missing]
+        size = max(1, settings.multicall_batch_size)
+        chunks = await asyncio.gather(*(self._aggregate(calls[i:i + size]) for i in range(0, len(calls), size)))
+        
+        for i, data in zip(missing, (data for chunk in chunks for data in chunk)):
+            if data and len(data) >= 32:
+                balances[i] = entries[i].from_units(int.from_bytes(data[:32], "big"))
+                if head is not None:
+                    await self.cache.put_at_head(head, "balanceOf", keys[i], str(balances[i]))
+        return balances
+    
+    async def _aggregate(self, calls: List[Tuple[str, bytes]]) -> List[Optional[bytes]]:
+        self.multicall_batches += 1
+        self.multicall_calls += len(calls)
+        try:
+            result = await self.w3.eth.call({"to": self.multicall_address, "data": aggregate3_data(calls)})
+            return decode_aggregate3(result)
+        except Exception as e:
+            # The whole batch failed (RPC error, no Multicall3 on the chain): read each balance on its own
+            self.multicall_failures += 1
+            logger.warning(f"❌ Multicall on {self.chain.value} failed, reading {len(calls)} balances one by one: {e}")
+            results = await asyncio.gather(*(self.w3.eth.call({"to": target, "data": data}) for target, data in calls), return_exceptions=True)
+            return [None if isinstance(result, Exception) else bytes(result) for result in results]
+    
+    async def get_native_balance(self, address: str) -> Decimal:
+        """Get native coin balance (ETH, MATIC, BNB, AVAX, ...)"""
+        head = await self._head()
+        if head is not None:
+            cached = await self.cache.get_at_head(head, "eth_getBalance", address.lower())
+            if cached is not None:
+                return Decimal(cached)
+        
+        balance = Decimal(await self.w3.eth.get_balance(address)) / Decimal(10 ** NATIVE_DECIMALS)
+        if head is not None:
+            await self.cache.put_at_head(head, "eth_getBalance", address.lower(), str(balance))
+        return balance
+    
+    async def _fetch_pending_nonce(self, address: str) -> int:
+        return await self.w3.eth.get_transaction_count(address, "pending")
+    
+    async def create_wallet(self) -> Tuple[str, str]:
+        """Create new wallet"""
+        return await crypto_executor.run(create_evm_account)
+    
+    async def send_transaction(self, from_address: str, to_address: str, amount: Decimal, token: TokenType, private_key: str) -> str:
+        """Send ERC-20 token transaction
+        
+        Concurrent sends from one wallet get consecutive nonces from self.nonces and
+        are signed and broadcast in parallel. Fees and the gas limit come from
+        self.fee_oracle and self.gas_limits, so no fee RPC is made while they are fresh.
+        """
+        entry = await self._token(token)
+        fees = await self.fee_oracle.fees()
+        
+        async with self.nonces.reserve(from_address) as nonce:
+            # Build transaction
+            transaction = {
+                "chainId": self.chain_id,
+                "from": from_address,
+                "to": entry.address,
+                "value": 0,
+                "data": transfer_data(to_address, entry.to_units(amount)),
+                "gas": self.gas_limits.limit(entry.address),
+                "nonce": nonce,
+                **fees,
+            }
+            
+            # Sign transaction off the event loop
+            raw_transaction = await crypto_executor.run(sign_evm_transaction, transaction, private_key)
+            
+            # Send transaction
+            tx_hash = await self.w3.eth.send_raw_transaction(raw_transaction)
+        
+        return tx_hash.hex()
+    
+    async def get_transaction_status(self, tx_hash: str) -> Dict:
+        """Get transaction status and details (transaction and receipt in one HTTP request)"""
+        return (await self.get_transaction_statuses([tx_hash]))[0]
+    
+    async def get_transaction_statuses(self, tx_hashes: List[str]) -> List[Dict]:
+        """Get status and details of many transactions through JSON-RPC batches
+        
+        Statuses of transactions at least `confirmations` blocks deep are cached for good;
+        pending and shallow ones only until the next head.
+        """
+        head = await self._head()
+        if head is None:
+            return await self._fetch_statuses(tx_hashes)
+        
+        statuses = await asyncio.gather(*(self._cached_status(head, tx_hash) for tx_hash in tx_hashes))
+        missing = [i for i, status in enumerate(statuses) if status is None]
+        if missing:
+            fetched = await self._fetch_statuses([tx_hashes[i] for i in missing])
+            for i, status in zip(missing, fetched):
+                statuses[i] = status
+                if self.cache.is_final(head, status.get("block_number")):
+                    await self.cache.put_final("status", tx_hashes[i].lower(), status)
+                elif status.get("error") in (None, TX_NOT_FOUND, TX_NOT_MINED):
+                    # RPC errors are not cached, so the next check tries again
+                    await self.cache.put_at_head(head, "status", tx_hashes[i].lower(), status)
+        return statuses
+    
+    async def _cached_status(self, head: Head, tx_hash: str) -> Optional[Dict]:
+        status = await self.cache.get_final("status", tx_hash.lower())
+        if status is None:
+            status = await self.cache.get_at_head(head, "status", tx_hash.lower())
+        return status
+    
+    async def _fetch_statuses(self, tx_hashes: List[str]) -> List[Dict]:
+        calls = []
+        for tx_hash in tx_hashes:
+            calls.append(("eth_getTransactionByHash", [tx_hash]))
+            calls.append(("eth_getTransactionReceipt", [tx_hash]))
+        try:
+            results = await self.transport.batch(calls)
+        except Exception as e:
+            return [{"tx_hash": tx_hash, "status": "pending", "error": str(e)} for tx_hash in tx_hashes]
+        
+        statuses = [transaction_status(tx_hash, results[2 * i], results[2 * i + 1]) for i, tx_hash in enumerate(tx_hashes)]
+        for status in statuses:
+            # Every confirmed token transfer we look at teaches the gas limit table
+            if status["status"] == "confirmed" and status.get("gas_used") and (status.get("to") or "").lower() in self.token_addresses:
+                self.gas_limits.observe(status["to"], status["gas_used"])
+        return statuses
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "multicall_batches": self.multicall_batches,
+            "multicall_calls": self.multicall_calls,
+            "multicall_failures": self.multicall_failures,
+            **self.transport.stats(),
+            **self.pool.stats(),
+            "heads": self.heads.stats(),
+            "nonces": self.nonces.stats(),
+            "fees": self.fee_oracle.stats(),
+            "gas_limits": self.gas_limits.stats(),
+            **({"cache": self.cache.stats()} if self.cache is not None else {}),
+        }
+    
+    async def get_token_contract_address(self, token: TokenType) -> str:
+        """Get token contract address"""
+        return token_registry.get(self.chain, token).address
+    
+    async def estimate_gas(self, from_address: str, to_address: str, amount: Decimal, token: TokenType) -> int:
+        """Estimate gas cost for transaction (asks the node only until the token's transfers have been seen)"""
+        entry = await self._token(token)
+        learned = self.gas_limits.estimate(entry.address)
+        if learned is not None:
+            return learned
+        
+        try:
+            gas = await self.w3.eth.estimate_gas({
+                "from": from_address,
+                "to": entry.address,
+                "data": transfer_data(to_address, entry.to_units(amount)),
+            })
+        except Exception:
+            return DEFAULT_GAS_LIMIT
+        self.gas_limits.observe(entry.address, gas)
+        return gas
+    
+    async def fee_quote(self, token: TokenType, urgency: Optional[str] = None) -> Dict[str, Any]:
+        """Fee options for sending `token`, from the fee oracle's cache"""
+        entry = token_registry.get(self.chain, token)
+        gas_limit = self.gas_limits.limit(entry.address)
+        levels = {}
+        for level in ([urgency] if urgency else URGENCY_LEVELS):
+            fees = await self.fee_oracle.fees(level)
+            fee_per_gas = fees.get("maxFeePerGas", fees.get("gasPrice"))
+            levels[level] = {
+                "max_fee_per_gas": fees.get("maxFeePerGas"),
+                "max_priority_fee_per_gas": fees.get("maxPriorityFeePerGas"),
+                "gas_price": fees.get("gasPrice"),
+                # Most the transfer can cost; EIP-1559 transactions usually pay less
+                "max_cost": Decimal(fee_per_gas * gas_limit) / Decimal(10 ** NATIVE_DECIMALS),
+            }
+        return {
+            "chain": self.chain.value,
+            "token": token.value,
+            "fee_model": self.fee_model,
+            "native_symbol": self.native_symbol,
+            "block_number": self.fee_oracle.block_number,
+            "base_fee_per_gas": self.fee_oracle.base_fee,
+            "gas_limit": gas_limit,
+            "levels": levels,
+        }
+    
+    async def get_latest_block_number(self) -> int:
+        """Get latest block number (from memory while the head tracker is current)"""
+        return (await self.heads.latest()).number
+    
+    async def get_transaction_receipt(self, tx_hash: str) -> Optional[Dict]:
+        """Get transaction receipt"""
+        try:
+            receipt = await self.w3.eth.get_transaction_receipt(tx_hash)
+            return dict(receipt)
+        except Exception:
+            return None
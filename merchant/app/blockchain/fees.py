@@ -0,0 +1,151 @@
+"""
+Fee suggestions and gas limits for EVM sends, kept ready so a payout needs no fee RPC.
+
+A FeeOracle refreshes on every head from its chain's HeadTracker. On EIP-1559
+chains it reads eth_feeHistory over the last FEE_HISTORY_BLOCKS blocks; on
+legacy chains it reads eth_gasPrice. From that it caches a suggestion for each
+urgency level. fees() serves the cached suggestion, and reads the chain only
+when it is older than FEE_MAX_AGE_BLOCKS block times, e.g. before the tracker
+has started.
+
+GasLimits learns how much gas transfers of each token contract use, from
+eth_estimateGas answers and from receipts seen while checking transactions.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+import asyncio
+import logging
+import statistics
+import time
+
+from app.blockchain.heads import Head, HeadTracker
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class Urgency:
+    """How a suggestion at one urgency level is derived"""
+    reward_percentile: float  # priority fee paid in recent blocks, at this percentile
+    base_fee_multiplier: float  # room for the base fee to rise (12.5% per full block) before the fee cap is hit
+    gas_price_multiplier: float  # on legacy chains, applied to eth_gasPrice
+
+URGENCY_LEVELS: Dict[str, Urgency] = {
+    "slow": Urgency(10, 1.25, 1.0),
+    "standard": Urgency(50, 2.0, 1.0),
+    "fast": Urgency(90, 3.0, 1.25),
+}
+
+# Headroom over the most gas a token's transfers have been seen to use
+GAS_LIMIT_MARGIN = 1.25
+
+class FeeOracle:
+    """Cached fee suggestions for one EVM chain"""
+    
+    def __init__(self, chain: str, fee_model: str, heads: HeadTracker, w3):
+        self.chain = chain
+        self.fee_model = fee_model
+        self.heads = heads
+        self.w3 = w3
+        self.suggestions: Dict[str, Dict[str, int]] = {}
+        self.base_fee: Optional[int] = None
+        self.block_number: Optional[int] = None
+        self.updated_at = 0.0
+        self.lock = asyncio.Lock()
+        self.refreshes = 0
+        self.on_demand_refreshes = 0
+        self.errors = 0
+        heads.subscribe(self.on_head)
+    
+    async def on_head(self, head: Head):
+        """Refresh for a new head (skipped if a refresh is already running)"""
+        if self.lock.locked():
+            return
+        async with self.lock:
+            try:
+                await self.refresh()
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"❌ Could not refresh fees on {self.chain}: {e}")
+    
+    async def refresh(self):
+        if self.fee_model == "eip1559":
+            percentiles = [urgency.reward_percentile for urgency in URGENCY_LEVELS.values()]
+            history = await self.w3.eth.fee_history(settings.fee_history_blocks, "latest", percentiles)
+            # The last base fee is the one the next block will charge
+            base_fee = history["baseFeePerGas"][-1]
+            rewards = history.get("reward") or []
+            suggestions = {}
+            for i, (level, urgency) in enumerate(URGENCY_LEVELS.items()):
+                tips = [block_rewards[i] for block_rewards in rewards if len(block_rewards) > i]
+                tip = int(statistics.median(tips)) if tips else await self.w3.eth.max_priority_fee
+                suggestions[level] = {
+                    "maxFeePerGas": int(base_fee * urgency.base_fee_multiplier) + tip,
+                    "maxPriorityFeePerGas": tip,
+                }
+            self.base_fee = base_fee
+            self.block_number = history["oldestBlock"] + len(history["baseFeePerGas"]) - 2
+        else:
+            gas_price = await self.w3.eth.gas_price
+            suggestions = {
+                level: {"gasPrice": int(gas_price * urgency.gas_price_multiplier)} for level, urgency in URGENCY_LEVELS.items()
+            }
+            self.block_number = self.heads.head.number if self.heads.head else None
+        self.suggestions = suggestions
+        self.updated_at = time.monotonic()
+        self.refreshes += 1
+    
+    @property
+    def fresh(self) -> bool:
+        return bool(self.suggestions) and time.monotonic() - self.updated_at < settings.fee_max_age_blocks * self.heads.block_time
+    
+    async def fees(self, urgency: str = "standard") -> Dict[str, int]:
+        """Fee fields for a transaction at `urgency`, read from the chain only if the cached ones are stale"""
+        if urgency not in URGENCY_LEVELS:
+            raise ValueError(f"Unsupported urgency: {urgency}")
+        if not self.fresh:
+            async with self.lock:
+                # Whoever held the lock may have just refreshed
+                if not self.fresh:
+                    self.on_demand_refreshes += 1
+                    await self.refresh()
+        return dict(self.suggestions[urgency])
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "block_number": self.block_number,
+            "age_seconds": round(time.monotonic() - self.updated_at, 1) if self.suggestions else None,
+            "base_fee_per_gas": self.base_fee,
+            "refreshes": self.refreshes,
+            "on_demand_refreshes": self.on_demand_refreshes,
+            "errors": self.errors,
+        }
+
+class GasLimits:
+    """Gas limits for token transfers, learned per contract"""
+    
+    def __init__(self, default: int):
+        self.default = default
+        self.observed: Dict[str, int] = {}
+    
+    def observe(self, contract_address: str, gas: int):
+        """Record gas a transfer of the token used, or was estimated to use"""
+        key = contract_address.lower()
+        self.observed[key] = max(self.observed.get(key, 0), gas)
+    
+    def estimate(self, contract_address: str) -> Optional[int]:
+        """Most gas seen for a transfer of the token, None until one has been seen"""
+        return self.observed.get(contract_address.lower())
+    
+    def limit(self, contract_address: str) -> int:
+        """Gas limit for a transfer of the token
+        
+        Never below the default: a first transfer to a new holder costs more than
+        the transfers seen so far may have, and unused gas is not charged.
+        """
+        observed = self.estimate(contract_address)
+        return max(self.default, int(observed * GAS_LIMIT_MARGIN)) if observed else self.default
+    
+    def stats(self) -> Dict[str, Any]:
+        return {"contracts": len(self.observed), "max_observed": max(self.observed.values(), default=None)}
@@ -0,0 +1,185 @@
+"""
+Latest block of each EVM chain, tracked in the background and shared in memory.
+
+A HeadTracker follows `newHeads` over a websocket when the chain has a
+<CHAIN>_WS_URL and polls eth_getBlockByNumber("latest") otherwise (or while the
+websocket is down). Polling is adaptive: after a new head it sleeps until the
+next block is due, then checks every quarter block time until it arrives.
+
+Consumers read `current()` (no RPC) or `latest()` (one shared RPC if the head is
+stale, e.g. before the tracker is started) and can subscribe() to head changes.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import inspect
+import json
+import logging
+import time
+
+import aiohttp
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest interval in the block time estimate
+BLOCK_TIME_ALPHA = 0.1
+
+@dataclass
+class Head:
+    """Latest block of a chain"""
+    number: int
+    hash: str
+    parent_hash: str
+    timestamp: int
+
+def head_from_header(header: Dict[str, Any]) -> Head:
+    """Head from a raw JSON-RPC block header (newHeads notification or eth_getBlockByNumber result)"""
+    return Head(int(header["number"], 16), header["hash"], header["parentHash"], int(header["timestamp"], 16))
+
+def confirmation_count(head_number: int, block_number: Optional[int]) -> Optional[int]:
+    """Blocks from `block_number` to the head, counting the block itself (at least 1 for a mined transaction)"""
+    if block_number is None:
+        return None
+    # A head behind the block (lagging node, or 0 when unknown) still means the block exists
+    return max(1, head_number - block_number + 1)
+
+class HeadTracker:
+    """Current head of one chain, kept up to date by a background task"""
+    
+    def __init__(self, chain: str, fetch_head: Callable[[], Awaitable[Head]], block_time: float, ws_url: str = ""):
+        self.chain = chain
+        self.fetch_head = fetch_head
+        self.block_time = block_time
+        self.ws_url = ws_url
+        self.head: Optional[Head] = None
+        self.checked_at = 0.0
+        self.lock = asyncio.Lock()
+        self.listeners: List[Callable[[Head], Any]] = []
+        self.task: Optional[asyncio.Task] = None
+        self.mode = "idle"
+        self.polls = 0
+        self.heads = 0
+        self.errors = 0
+    
+    def subscribe(self, listener: Callable[[Head], Any]):
+        """Call `listener(head)` on every new head; coroutine listeners run as tasks"""
+        self.listeners.append(listener)
+    
+    async def start(self):
+        """Start following the chain (called from the app lifespan)"""
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop following the chain (called from the app lifespan)"""
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+        self.mode = "idle"
+    
+    def current(self) -> Optional[Head]:
+        """Head as last seen, or None if it is too old to count as current"""
+        max_age = settings.head_max_staleness_blocks * self.block_time if self.task is not None else self.block_time / 2
+        if self.head is not None and time.monotonic() - self.checked_at < max_age:
+            return self.head
+        return None
+    
+    async def latest(self) -> Head:
+        """Current head, read from the chain first if it is stale (concurrent callers share the read)"""
+        head = self.current()
+        if head is not None:
+            return head
+        async with self.lock:
+            # Whoever held the lock may have just read it
+            if self.current() is None:
+                await self.poll()
+        return self.head
+    
+    async def poll(self) -> bool:
+        """Read the head from the chain; True if it changed"""
+        self.polls += 1
+        return self.observe(await self.fetch_head())
+    
+    def observe(self, head: Head) -> bool:
+        """Record a head seen on the chain, notifying subscribers if it is new"""
+        self.checked_at = time.monotonic()
+        previous = self.head
+        if previous is not None and head.hash == previous.hash:
+            return False
+        if previous is not None and head.number > previous.number and head.timestamp > previous.timestamp:
+            interval = (head.timestamp - previous.timestamp) / (head.number - previous.number)
+            self.block_time += BLOCK_TIME_ALPHA * (interval - self.block_time)
+        self.head = head
+        self.heads += 1
+        for listener in self.listeners:
+            try:
+                result = listener(head)
+                if inspect.isawaitable(result):
+                    asyncio.ensure_future(result)
+            except Exception as e:
+                logger.error(f"❌ Head listener on {self.chain} failed: {e}")
+        return True
+    
+    async def _run(self):
+        while True:
+            if self.ws_url:
+                try:
+                    self.mode = "websocket"
+                    await self._follow_websocket()
+                except Exception as e:
+                    self.errors += 1
+                    logger.error(f"❌ newHeads subscription on {self.chain} failed, polling instead: {e}")
+            self.mode = "polling"
+            await self._poll_until(time.monotonic() + settings.head_ws_retry_seconds if self.ws_url else None)
+    
+    async def _follow_websocket(self):
+        async with aiohttp.ClientSession() as session:
+            async with session.ws_connect(self.ws_url, heartbeat=30) as ws:
+                await ws.send_json({"jsonrpc": "2.0", "id": 1, "method": "eth_subscribe", "params": ["newHeads"]})
+                reply = await ws.receive_json(timeout=settings.rpc_timeout_seconds)
+                if "error" in reply:
+                    raise RuntimeError(reply["error"])
+                # Catch up on the head produced while (re)connecting
+                await self.poll()
+                async for message in ws:
+                    if message.type != aiohttp.WSMsgType.TEXT:
+                        break
+                    notification = json.loads(message.data)
+                    if notification.get("method") == "eth_subscription":
+                        self.observe(head_from_header(notification["params"]["result"]))
+        raise ConnectionError("websocket closed")
+    
+    async def _poll_until(self, deadline: Optional[float]):
+        while deadline is None or time.monotonic() < deadline:
+            try:
+                changed = await self.poll()
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"❌ Could not read the {self.chain} head: {e}")
+                changed = False
+            retry = max(settings.head_poll_min_seconds, self.block_time / 4)
+            if changed:
+                # Sleep until the next block is due by the chain's clock, then look for it
+                due = self.head.timestamp + self.block_time - time.time()
+                await asyncio.sleep(min(max(due, retry), self.block_time))
+            else:
+                await asyncio.sleep(retry)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "head": self.head.number if self.head else None,
+            "age_seconds": round(time.monotonic() - self.checked_at, 1) if self.head else None,
+            "block_time": round(self.block_time, 2),
+            "heads": self.heads,
+            "polls": self.polls,
+            "errors": self.errors,
+        }
@@ -1,8 +1,6 @@
-from typing import Dict, Optional
-from app.blockchain.ethereum import EthereumBlockchain
-from app.blockchain.polygon import PolygonBlockchain
-from app.blockchain.bsc import BSCBlockchain
-from app.blockchain.avalanche import AvalancheBlockchain
+from typing import Dict, List, Optional, Tuple
+from app.blockchain.evm import EVMChain
+from app.blockchain.heads import confirmation_count
 from app.blockchain.tron import TronBlockchain
 from app.blockchain.solana import SolanaBlockchain
 from app.models import ChainType, TokenType
@@ -13,13 +11,34 @@ class BlockchainManager:
     
     def __init__(self):
         self.blockchains: Dict[ChainType, any] = {
-            ChainType.ETHEREUM: EthereumBlockchain(settings.ethereum_rpc_url),
-            ChainType.POLYGON: PolygonBlockchain(settings.polygon_rpc_url),
-            ChainType.BSC: BSCBlockchain(settings.bsc_rpc_url),
-            ChainType.AVALANCHE: AvalancheBlockchain(settings.avalanche_rpc_url),
+            ChainType(name): EVMChain(ChainType(name), config) for name, config in settings.evm_chains.items()
+        }
+        self.blockchains.update({
             ChainType.TRON: TronBlockchain(settings.tron_rpc_url),
             ChainType.SOLANA: SolanaBlockchain(settings.solana_rpc_url),
-        }
+        })
+    
+    async def open(self):
+        """Open every chain's RPC connections (called from the app lifespan)"""
+        for blockchain in self.blockchains.values():
+            await blockchain.open()
+    
+    async def close(self):
+        """Close every chain's RPC connections (called from the app lifespan)"""
+        for blockchain in self.blockchains.values():
+            await blockchain.close()
+    
+    async def start_head_trackers(self):
+        """Follow the head of every EVM chain that has an RPC endpoint (called from the app lifespan)"""
+        for blockchain in self.blockchains.values():
+            if isinstance(blockchain, EVMChain) and blockchain.rpc_url:
+                await blockchain.heads.start()
+    
+    async def stop_head_trackers(self):
+        """Stop following chain heads (called from the app lifespan)"""
+        for blockchain in self.blockchains.values():
+            if isinstance(blockchain, EVMChain):
+                await blockchain.heads.stop()
     
     def get_blockchain(self, chain: ChainType):
         """Get blockchain instance for a specific chain"""
@@ -32,6 +51,15 @@ class BlockchainManager:
         blockchain = self.get_blockchain(chain)
         return await blockchain.get_balance(address, token)
     
+    async def get_balances(self, chain: ChainType, requests: List[Tuple[str, TokenType]]):
+        """Get token balances of many (address, token) pairs on a specific chain"""
+        blockchain = self.get_blockchain(chain)
+        return await blockchain.get_balances(requests)
+    
+    def stats(self) -> Dict[str, Dict]:
+        """Counters of the chains that keep them"""
+        return {chain.value: blockchain.stats() for chain, blockchain in self.blockchains.items() if hasattr(blockchain, "stats")}
+    
     async def get_native_balance(self, chain: ChainType, address: str):
         """Get native token balance for a specific chain"""
         blockchain = self.get_blockchain(chain)
@@ -52,6 +80,11 @@ class BlockchainManager:
         blockchain = self.get_blockchain(chain)
         return await blockchain.get_transaction_status(tx_hash)
     
+    async def get_transaction_statuses(self, chain: ChainType, tx_hashes: List[str]):
+        """Get status of many transactions on a specific chain"""
+        blockchain = self.get_blockchain(chain)
+        return await blockchain.get_transaction_statuses(tx_hashes)
+    
     async def get_token_contract_address(self, chain: ChainType, token: TokenType):
         """Get token contract address for a specific chain"""
         blockchain = self.get_blockchain(chain)
@@ -62,11 +95,24 @@ class BlockchainManager:
         blockchain = self.get_blockchain(chain)
         return await blockchain.estimate_gas(from_address, to_address, amount, token)
     
+    async def get_fee_quote(self, chain: ChainType, token: TokenType, urgency: Optional[str] = None):
+        """Fee options for sending `token` on an EVM chain, served from its fee oracle"""
+        blockchain = self.get_blockchain(chain)
+        if not isinstance(blockchain, EVMChain):
+            raise ValueError(f"Fee quotes are not available on {chain.value}")
+        return await blockchain.fee_quote(token, urgency)
+    
     async def get_latest_block_number(self, chain: ChainType):
         """Get latest block number for a specific chain"""
         blockchain = self.get_blockchain(chain)
         return await blockchain.get_latest_block_number()
     
+    async def get_confirmations(self, chain: ChainType, block_number: Optional[int]) -> Optional[int]:
+        """Confirmations of a transaction mined in `block_number` (no RPC call on EVM chains while their head is tracked)"""
+        if block_number is None:
+            return None
+        return confirmation_count(await self.get_latest_block_number(chain), block_number)
+    
     async def get_transaction_receipt(self, chain: ChainType, tx_hash: str):
         """Get transaction receipt for a specific chain"""
         blockchain = self.get_blockchain(chain)
@@ -0,0 +1,221 @@
+"""
+Nonces for EVM sends, handed out in memory so one wallet can have many payouts in flight.
+
+Each (chain, wallet) is synced with the node's pending transaction count once;
+after that, reserve() hands out consecutive nonces under a per-wallet lock that
+is held only while a nonce is picked, so signing and broadcasting overlap. The
+wallet is synced again
+
+- after a send fails (whether or not the node took the transaction, the pending
+  count tells which nonce is next, filling the gap if it did not),
+- when the wallet has been idle for NONCE_RESYNC_SECONDS and the chain's pending
+  count differs from ours (a dropped transaction left a gap, or something else
+  sent from the wallet), and
+- when this worker (re)acquires the wallet's lease.
+
+With several workers, a lease (NONCE_LEASE_BACKEND=redis or postgres) lets one
+worker at a time send from a wallet; the others wait up to
+NONCE_LEASE_WAIT_SECONDS for it. The memory backend assumes a single worker.
+"""
+
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# How often a worker waiting for another worker's lease asks again
+LEASE_RETRY_SECONDS = 0.05
+
+class WalletBusy(RuntimeError):
+    """Another worker holds the wallet's lease"""
+
+class NonceLease(ABC):
+    """Which worker may send from a wallet"""
+    
+    name = ""
+    
+    def __init__(self):
+        # Unique per process, so a restarted worker does not inherit its predecessor's leases
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        # When each lease this worker holds runs out, by the local clock
+        self.held_until: Dict[str, float] = {}
+        self.acquisitions = 0
+        self.waits = 0
+    
+    @abstractmethod
+    async def try_acquire(self, key: str, ttl: float) -> Optional[bool]:
+        """Take or renew the lease on `key`: True if newly taken, False if renewed, None if another worker holds it"""
+        pass
+    
+    async def acquire(self, key: str) -> bool:
+        """Take or renew the lease on `key`, waiting for another holder; True if this worker did not already hold it"""
+        ttl = settings.nonce_lease_seconds
+        # Renewing costs a round trip, so only do it once half the lease has run out
+        if self.held_until.get(key, 0) - time.monotonic() > ttl / 2:
+            return False
+        deadline = time.monotonic() + settings.nonce_lease_wait_seconds
+        while True:
+            started = time.monotonic()
+            acquired = await self.try_acquire(key, ttl)
+            if acquired is not None:
+                self.held_until[key] = started + ttl
+                self.acquisitions += 1
+                return acquired
+            if time.monotonic() >= deadline:
+                raise WalletBusy(f"Wallet {key} is in use by another worker")
+            self.waits += 1
+            await asyncio.sleep(LEASE_RETRY_SECONDS)
+    
+    async def close(self):
+        """Release connections (called from the app lifespan)"""
+        pass
+    
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "held": len(self.held_until), "acquisitions": self.acquisitions, "waits": self.waits}
+
+class MemoryNonceLease(NonceLease):
+    """Every wallet belongs to this process; only safe with a single worker"""
+    
+    name = "memory"
+    
+    async def try_acquire(self, key: str, ttl: float) -> Optional[bool]:
+        return False
+
+# Returns 1 if the lease was free (or expired), 0 if the caller already held it, -1 if someone else does
+LEASE_SCRIPT = """
+local owner = redis.call('GET', KEYS[1])
+if owner == ARGV[1] then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+    return 0
+end
+if owner then
+    return -1
+end
+redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+return 1
+"""
+
+class RedisNonceLease(NonceLease):
+    """Leases shared through Redis; sends fail if Redis is unreachable, since a duplicate nonce would be worse"""
+    
+    name = "redis"
+    
+    def __init__(self, redis_url: str):
+        super().__init__()
+        import redis.asyncio as redis
+        from app.core.cache import REDIS_TIMEOUT_SECONDS
+        self.redis = redis.from_url(
+            redis_url,
+            socket_timeout=REDIS_TIMEOUT_SECONDS,
+            socket_connect_timeout=REDIS_TIMEOUT_SECONDS
+        )
+        self.script = self.redis.register_script(LEASE_SCRIPT)
+    
+    async def try_acquire(self, key: str, ttl: float) -> Optional[bool]:
+        result = await self.script(keys=[f"nonce_lease:{key}"], args=[self.owner, int(ttl * 1000)])
+        return None if result < 0 else bool(result)
+    
+    async def close(self):
+        await self.redis.aclose()
+
+class PostgresNonceLease(NonceLease):
+    """Leases kept in the nonce_leases table (migration 0010) of the configured database backend"""
+    
+    name = "postgres"
+    
+    async def try_acquire(self, key: str, ttl: float) -> Optional[bool]:
+        from app.repositories.base import get_backend
+        result = await get_backend().rpc("acquire_nonce_lease", {"p_key": key, "p_owner": self.owner, "p_ttl_ms": int(ttl * 1000)})
+        return None if result < 0 else bool(result)
+
+def create_nonce_lease() -> NonceLease:
+    """Create the nonce lease backend selected in settings"""
+    if settings.nonce_lease_backend == "redis":
+        return RedisNonceLease(settings.redis_url)
+    if settings.nonce_lease_backend == "postgres":
+        return PostgresNonceLease()
+    if settings.nonce_lease_backend != "memory":
+        raise ValueError(f"Unsupported nonce lease backend: {settings.nonce_lease_backend}")
+    return MemoryNonceLease()
+
+# Shared by every chain's NonceManager in this process
+lease = create_nonce_lease()
+
+@dataclass
+class WalletNonces:
+    """Nonce state of one wallet"""
+    next: Optional[int] = None  # None until synced with the chain
+    in_flight: int = 0
+    synced_at: float = 0.0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+
+class NonceManager:
+    """Nonces of every wallet sending on one chain"""
+    
+    def __init__(self, chain: str, fetch_pending: Callable[[str], Awaitable[int]], nonce_lease: Optional[NonceLease] = None):
+        self.chain = chain
+        self.fetch_pending = fetch_pending
+        self.lease = nonce_lease or lease
+        self.wallets: Dict[str, WalletNonces] = {}
+        self.allocated = 0
+        self.syncs = 0
+        self.gaps = 0
+        self.failures = 0
+    
+    @asynccontextmanager
+    async def reserve(self, address: str) -> AsyncIterator[int]:
+        """Next nonce of `address`, for a transaction signed and broadcast inside the block
+        
+        Raising inside the block marks the wallet for a resync before its next send.
+        """
+        wallet = self.wallets.setdefault(address.lower(), WalletNonces())
+        async with wallet.lock:
+            if await self.lease.acquire(f"{self.chain}:{address.lower()}"):
+                # Another worker may have sent from the wallet since we last held it
+                wallet.next = None
+            idle_too_long = wallet.in_flight == 0 and time.monotonic() - wallet.synced_at >= settings.nonce_resync_seconds
+            if wallet.next is None or idle_too_long:
+                await self._sync(address, wallet)
+            nonce = wallet.next
+            wallet.next += 1
+            wallet.in_flight += 1
+            self.allocated += 1
+        
+        try:
+            yield nonce
+        except Exception:
+            self.failures += 1
+            wallet.next = None
+            raise
+        finally:
+            wallet.in_flight -= 1
+    
+    async def _sync(self, address: str, wallet: WalletNonces):
+        pending = await self.fetch_pending(address)
+        if wallet.next is not None and pending != wallet.next:
+            # Below ours: a transaction was dropped and later ones are stuck behind the gap
+            self.gaps += 1
+            logger.warning(f"Nonce of {address} on {self.chain} resynced from {wallet.next} to {pending}")
+        wallet.next = pending
+        wallet.synced_at = time.monotonic()
+        self.syncs += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "wallets": len(self.wallets),
+            "allocated": self.allocated,
+            "syncs": self.syncs,
+            "gaps": self.gaps,
+            "failures": self.failures,
+            "in_flight": sum(wallet.in_flight for wallet in self.wallets.values()),
+        }
@@ -0,0 +1,321 @@
+"""
+JSON-RPC plumbing for the EVM engine.
+
+RpcPool spreads a chain's calls over every configured endpoint: it tracks an
+EWMA of each endpoint's latency and error rate, routes to the healthiest one,
+fails over when a request errors, ejects an endpoint for a while after
+repeated failures and, with RPC_HEDGE_READS, fires an idempotent read at a
+second endpoint when the first has not answered within its p95 latency.
+
+PoolProvider plugs the pool into web3, and RpcTransport.batch() packs many
+calls into JSON-RPC batch arrays. Providers cap batch sizes differently (and
+some answer an oversized batch with a single error object or an HTTP error),
+so the batch size adapts: a rejected batch is split in half and retried, and
+the size creeps back up towards settings.rpc_batch_size after batches go through.
+"""
+
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+import asyncio
+import itertools
+import logging
+import time
+
+import aiohttp
+from web3.providers.async_base import AsyncJSONBaseProvider
+from web3.types import RPCEndpoint, RPCResponse
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+EWMA_ALPHA = 0.2  # weight of the newest sample in the latency and error averages
+ERROR_PENALTY = 10  # an endpoint failing every request scores as 11x slower
+LATENCY_SAMPLES = 100  # recent latencies kept per endpoint for the hedging p95
+
+# Sending these twice is not harmless, so they are never hedged and only retried
+# elsewhere when the first endpoint could not be reached at all
+NON_IDEMPOTENT = {"eth_sendRawTransaction", "eth_sendTransaction"}
+
+class RpcError(Exception):
+    """Error object returned for one call of a batch"""
+    
+    def __init__(self, method: str, error: Dict[str, Any]):
+        self.code = error.get("code")
+        super().__init__(f"{method}: {error.get('message', error)}")
+
+class BatchRejected(Exception):
+    """The provider refused the batch as a whole"""
+
+class EndpointError(Exception):
+    """The endpoint failed (unreachable, timed out, throttling or 5xx); another one may succeed"""
+    
+    def __init__(self, endpoint: "Endpoint", error: Exception, connected: bool):
+        self.endpoint = endpoint
+        self.connected = connected
+        super().__init__(f"{endpoint.name}: {type(error).__name__} {error}")
+
+class Endpoint:
+    """One RPC URL and its health"""
+    
+    def __init__(self, url: str):
+        self.url = url
+        # Provider URLs often embed an API key; only the host is ever reported
+        self.name = urlparse(url).netloc or url
+        self.latency: Optional[float] = None  # EWMA, seconds
+        self.error_rate = 0.0  # EWMA of failures
+        self.samples = deque(maxlen=LATENCY_SAMPLES)
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.ejections = 0
+    
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self.ejected_until
+    
+    def score(self) -> float:
+        """Expected cost of a request here; endpoints not yet measured score 0 so they get tried"""
+        return (self.latency or 0.0) * (1 + ERROR_PENALTY * self.error_rate)
+    
+    def p95(self) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    
+    def record_success(self, elapsed: float):
+        self.latency = elapsed if self.latency is None else EWMA_ALPHA * elapsed + (1 - EWMA_ALPHA) * self.latency
+        self.error_rate *= 1 - EWMA_ALPHA
+        self.samples.append(elapsed)
+        self.consecutive_failures = 0
+    
+    def record_failure(self):
+        self.failures += 1
+        self.error_rate = EWMA_ALPHA + (1 - EWMA_ALPHA) * self.error_rate
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= settings.rpc_eject_after_failures and self.available:
+            # Back in rotation after the cool-off; one more failure then ejects it again
+            # (requests already in flight when it was ejected do not extend the ejection)
+            self.ejected_until = time.monotonic() + settings.rpc_eject_seconds
+            self.ejections += 1
+            logger.warning(f"❌ RPC endpoint {self.name} ejected for {settings.rpc_eject_seconds}s after {self.consecutive_failures} failures")
+    
+    def stats(self) -> Dict[str, Any]:
+        p95 = self.p95()
+        return {
+            "endpoint": self.name,
+            "available": self.available,
+            "ewma_ms": round(self.latency * 1000, 2) if self.latency is not None else None,
+            "p95_ms": round(p95 * 1000, 2) if p95 is not None else None,
+            "error_rate": round(self.error_rate, 3),
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "failures": self.failures,
+            "ejections": self.ejections,
+        }
+
+class RpcPool:
+    """Latency-weighted routing, failover and optional hedging over a chain's RPC endpoints"""
+    
+    def __init__(self, urls: List[str], hedge: Optional[bool] = None):
+        self.endpoints = [Endpoint(url) for url in urls]
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.hedge = settings.rpc_hedge_reads if hedge is None else hedge
+        self.ids = itertools.count(1)
+        self.failovers = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+    
+    def pick(self, exclude: List[Endpoint] = (), available_only: bool = False) -> Optional[Endpoint]:
+        """Healthiest endpoint not in `exclude`; if all are ejected, the one due back first (unless `available_only`)"""
+        candidates = [endpoint for endpoint in self.endpoints if endpoint not in exclude]
+        available = [endpoint for endpoint in candidates if endpoint.available]
+        if not available:
+            if available_only or not candidates:
+                return None
+            return min(candidates, key=lambda endpoint: endpoint.ejected_until)
+        return min(available, key=lambda endpoint: (endpoint.score(), endpoint.in_flight))
+    
+    async def post(self, payload: Any, idempotent: bool = True) -> Any:
+        """Send a JSON-RPC request or batch and return the decoded response body"""
+        if not self.endpoints:
+            raise RuntimeError("No RPC endpoints configured")
+        
+        tried: List[Endpoint] = []
+        error: Optional[EndpointError] = None
+        while True:
+            endpoint = self.pick(exclude=tried)
+            if endpoint is None:
+                raise error
+            if tried:
+                self.failovers += 1
+            tried.append(endpoint)
+            try:
+                if idempotent and self.hedge and len(self.endpoints) > 1:
+                    return await self._hedged(endpoint, payload, tried)
+                return await self._send(endpoint, payload)
+            except EndpointError as e:
+                error = e
+                if not idempotent and e.connected:
+                    # The write may have gone through; do not repeat it elsewhere
+                    raise
+    
+    async def _hedged(self, primary: Endpoint, payload: Any, tried: List[Endpoint]) -> Any:
+        first = asyncio.create_task(self._send(primary, payload))
+        pending = {first}
+        try:
+            delay = max(settings.rpc_hedge_min_delay_ms / 1000, primary.p95() or 0.0)
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            backup = None if done else self.pick(exclude=tried, available_only=True)
+            if backup is None:
+                return await first
+            
+            tried.append(backup)
+            self.hedges += 1
+            second = asyncio.create_task(self._send(backup, payload))
+            pending = {first, second}
+            for task in pending:
+                # The loser's failure is of no interest once the other request has answered
+                task.add_done_callback(lambda task: task.cancelled() or task.exception())
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # The slower request is abandoned (and the pending one, if we were cancelled)
+            for task in pending:
+                task.cancel()
+    
+    async def _send(self, endpoint: Endpoint, payload: Any) -> Any:
+        if self.session is None:
+            raise RuntimeError("RPC pool is not open")
+        
+        endpoint.requests += 1
+        endpoint.in_flight += 1
+        started = time.perf_counter()
+        try:
+            async with self.session.post(endpoint.url, json=payload) as response:
+                body = await response.json(content_type=None)
+        except aiohttp.ClientResponseError as e:
+            if e.status == 429 or e.status >= 500:
+                endpoint.record_failure()
+                raise EndpointError(endpoint, e, connected=True)
+            # Any other 4xx is about the request itself, not the endpoint
+            endpoint.record_success(time.perf_counter() - started)
+            raise
+        except (aiohttp.ClientConnectorError, asyncio.TimeoutError) as e:
+            endpoint.record_failure()
+            raise EndpointError(endpoint, e, connected=not isinstance(e, aiohttp.ClientConnectorError))
+        except (aiohttp.ClientError, ValueError) as e:
+            endpoint.record_failure()
+            raise EndpointError(endpoint, e, connected=True)
+        finally:
+            endpoint.in_flight -= 1
+        
+        endpoint.record_success(time.perf_counter() - started)
+        return body
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "failovers": self.failovers,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "endpoints": [endpoint.stats() for endpoint in self.endpoints],
+        }
+
+class PoolProvider(AsyncJSONBaseProvider):
+    """web3 provider that sends every request through an RpcPool"""
+    
+    def __init__(self, pool: RpcPool):
+        super().__init__()
+        self.pool = pool
+    
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        payload = {"jsonrpc": "2.0", "id": next(self.pool.ids), "method": method, "params": params}
+        return await self.pool.post(payload, idempotent=method not in NON_IDEMPOTENT)
+    
+    async def is_connected(self, show_traceback: bool = False) -> bool:
+        return any(endpoint.available for endpoint in self.pool.endpoints)
+
+class RpcTransport:
+    """Sends JSON-RPC batches of read calls through an RpcPool"""
+    
+    def __init__(self, pool: RpcPool, max_batch_size: Optional[int] = None):
+        self.pool = pool
+        self.max_batch_size = max(1, max_batch_size or settings.rpc_batch_size)
+        self.batch_size = self.max_batch_size
+        self.batches = 0
+        self.calls = 0
+        self.rejections = 0
+    
+    async def batch(self, calls: List[Tuple[str, list]]) -> List[Any]:
+        """Results of (method, params) calls in order; a failed call's slot holds its exception"""
+        results: List[Any] = [None] * len(calls)
+        
+        async def send(indices: List[int]):
+            try:
+                responses = await self._post([calls[i] for i in indices])
+            except BatchRejected as e:
+                if len(indices) == 1:
+                    results[indices[0]] = e
+                    return
+                self.rejections += 1
+                half = len(indices) // 2
+                self.batch_size = max(1, min(self.batch_size, half))
+                await asyncio.gather(send(indices[:half]), send(indices[half:]))
+                return
+            
+            for i, response in zip(indices, responses):
+                results[i] = response
+            if len(indices) >= self.batch_size and self.batch_size < self.max_batch_size:
+                # The provider took a full batch; probe a slightly larger one next time
+                self.batch_size = min(self.max_batch_size, self.batch_size + max(1, self.batch_size // 10))
+        
+        size = self.batch_size
+        indices = list(range(len(calls)))
+        await asyncio.gather(*(send(indices[i:i + size]) for i in range(0, len(indices), size)))
+        return results
+    
+    async def _post(self, calls: List[Tuple[str, list]]) -> List[Any]:
+        payload = [{"jsonrpc": "2.0", "id": next(self.pool.ids), "method": method, "params": params} for method, params in calls]
+        self.batches += 1
+        self.calls += len(calls)
+        try:
+            body = await self.pool.post(payload)
+        except aiohttp.ClientResponseError as e:
+            # 413 and friends: the batch is too big
+            raise BatchRejected(f"HTTP {e.status} for a batch of {len(calls)}")
+        
+        if not isinstance(body, list):
+            # A single error object instead of one response per call
+            raise BatchRejected(str(body.get("error", body)) if isinstance(body, dict) else str(body))
+        
+        by_id = {response.get("id"): response for response in body if isinstance(response, dict)}
+        results = []
+        for request in payload:
+            response = by_id.get(request["id"])
+            if response is None:
+                results.append(RpcError(request["method"], {"message": "missing from batch response"}))
+            elif "error" in response:
+                results.append(RpcError(request["method"], response["error"]))
+            else:
+                results.append(response.get("result"))
+        return results
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batch_size": self.batch_size,
+            "batches": self.batches,
+            "batched_calls": self.calls,
+            "batch_rejections": self.rejections,
+        }
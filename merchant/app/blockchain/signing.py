@@ -0,0 +1,47 @@
+"""
+CPU-bound key generation and signing for the chain adapters.
+
+Everything here is a module-level function taking and returning plain,
+picklable values so it can run in the crypto executor's thread or process
+pool: `await crypto_executor.run(sign_evm_transaction, transaction, key)`.
+"""
+
+from typing import Dict, Tuple
+
+import base58
+from eth_account import Account
+from solana.transaction import Transaction
+from solders.keypair import Keypair
+from tronpy.keys import PrivateKey
+
+def create_evm_account() -> Tuple[str, str]:
+    """(address, private key hex) of a new EVM account"""
+    account = Account.create()
+    return account.address, account.key.hex()
+
+def sign_evm_transaction(transaction: Dict, private_key: str) -> bytes:
+    """Raw signed EVM transaction, ready for send_raw_transaction"""
+    return bytes(Account.sign_transaction(transaction, private_key).rawTransaction)
+
+def create_tron_account() -> Tuple[str, str]:
+    """(base58 address, private key hex) of a new Tron account"""
+    private_key = PrivateKey.random()
+    return private_key.public_key.to_base58check_address(), private_key.hex()
+
+def sign_tron_txid(private_key: str, txid: str) -> str:
+    """Hex signature of a Tron transaction id"""
+    return PrivateKey(bytes.fromhex(private_key)).sign_msg_hash(bytes.fromhex(txid)).hex()
+
+def create_solana_keypair() -> Tuple[str, str]:
+    """(public key, base58 secret key) of a new Solana keypair"""
+    keypair = Keypair()
+    return str(keypair.pubkey()), base58.b58encode(bytes(keypair)).decode()
+
+def solana_public_key(private_key: str) -> str:
+    """Public key of a base58 Solana secret key"""
+    return str(Keypair.from_bytes(base58.b58decode(private_key)).pubkey())
+
+def sign_solana_transaction(transaction: Transaction, private_key: str) -> Transaction:
+    """Solana transaction signed with a base58 secret key"""
+    transaction.sign(Keypair.from_bytes(base58.b58decode(private_key)))
+    return transaction
@@ -1,16 +1,16 @@
 from solana.rpc.api import Client
-from solders.keypair import Keypair
 from solders.pubkey import Pubkey as PublicKey
 from solana.transaction import Transaction
 from solders.system_program import TransferParams, transfer
 from typing import Dict, List, Optional, Tuple
 from decimal import Decimal
 import asyncio
-import base58
 
 from app.blockchain.base import BlockchainInterface
+from app.blockchain.signing import create_solana_keypair, sign_solana_transaction, solana_public_key
+from app.blockchain.tokens import token_registry
+from app.core.executor import crypto_executor
 from app.models import ChainType, TokenType
-from app.core.config import settings
 
 class SolanaBlockchain(BlockchainInterface):
     """Solana blockchain integration"""
@@ -42,8 +42,7 @@ class SolanaBlockchain(BlockchainInterface):
     
     async def create_wallet(self) -> Tuple[str, str]:
         """Create new Solana wallet"""
-        keypair = Keypair()
-        return str(keypair.pubkey()), base58.b58encode(bytes(keypair)).decode()
+        return await crypto_executor.run(create_solana_keypair)
     
     async def send_transaction(self, from_address: str, to_address: str, amount: Decimal, token: TokenType, private_key: str) -> str:
         """Send transaction - simplified implementation for SOL only"""
@@ -51,16 +50,15 @@ class SolanaBlockchain(BlockchainInterface):
             raise ValueError("Only SOL transfers are currently supported in this simplified implementation")
         
         try:
-            # Create keypair from private key
-            secret_key = base58.b58decode(private_key)
-            keypair = Keypair.from_bytes(secret_key)
+            # Derive the sender from the private key off the event loop
+            from_pubkey = PublicKey.from_string(await crypto_executor.run(solana_public_key, private_key))
             
             # Create transfer instruction for SOL
             amount_lamports = int(amount * Decimal(10 ** 9))  # SOL has 9 decimals
             
             transfer_ix = transfer(
                 TransferParams(
-                    from_pubkey=keypair.pubkey(),
+                    from_pubkey=from_pubkey,
                     to_pubkey=PublicKey(to_address),
                     lamports=amount_lamports
                 )
@@ -73,14 +71,14 @@ class SolanaBlockchain(BlockchainInterface):
             recent_blockhash = self.client.get_latest_blockhash()
             transaction.recent_blockhash = recent_blockhash.value.blockhash
             
-            # Sign transaction
-            transaction.sign(keypair)
+            # Sign transaction off the event loop
+            transaction = await crypto_executor.run(sign_solana_transaction, transaction, private_key)
             
             # Send transaction
             result = self.client.send_transaction(transaction)
             
             return result.value
-            
+        
         except Exception as e:
             raise ValueError(f"Failed to send transaction: {str(e)}")
     
@@ -104,7 +102,7 @@ class SolanaBlockchain(BlockchainInterface):
                 "fee": tx.meta.fee,
                 "error": tx.meta.err
             }
-            
+        
         except Exception as e:
             return {
                 "tx_hash": tx_hash,
@@ -114,7 +112,7 @@ class SolanaBlockchain(BlockchainInterface):
     
     async def get_token_contract_address(self, token: TokenType) -> str:
         """Get token mint address"""
-        return settings.supported_tokens["solana"][token.value]
+        return token_registry.get(self.chain, token).address
     
     async def estimate_gas(self, from_address: str, to_address: str, amount: Decimal, token: TokenType) -> int:
         """Estimate transaction fee (Solana uses fixed fees)"""
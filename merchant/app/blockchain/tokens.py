@@ -0,0 +1,99 @@
+"""
+Registry of the stablecoins each chain supports, built once from settings.
+
+Every adapter and router resolves tokens here instead of reading
+settings.supported_tokens: addresses are validated (and checksummed on EVM
+chains) at startup, and decimals come from settings.token_decimals, so balance
+reads and payouts need no decimals() call. A token without configured decimals
+is asked for them once, on first use, and the answer is kept for the life of
+the process.
+"""
+
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Awaitable, Callable, Dict, List, Optional
+import logging
+
+from eth_utils import to_checksum_address
+
+from app.core.config import settings
+from app.models import ChainType, TokenType
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class Token:
+    """A token contract on one chain, with its precomputed 10**decimals scale"""
+    chain: ChainType
+    symbol: TokenType
+    address: str
+    decimals: Optional[int] = None
+    scale: Optional[Decimal] = field(default=None, repr=False)
+    
+    def __post_init__(self):
+        if self.decimals is not None:
+            self.set_decimals(self.decimals)
+    
+    def set_decimals(self, decimals: int):
+        self.decimals = decimals
+        self.scale = Decimal(10 ** decimals)
+    
+    def to_units(self, amount: Decimal) -> int:
+        """Amount in the token's smallest unit"""
+        return int(amount * self.scale)
+    
+    def from_units(self, units: int) -> Decimal:
+        """Smallest-unit amount as a token amount"""
+        return Decimal(units) / self.scale
+
+class TokenRegistry:
+    """Supported tokens per chain"""
+    
+    def __init__(self, supported_tokens: Dict[str, Dict[str, str]], token_decimals: Dict[str, Dict[str, int]], evm_chains: List[str]):
+        self.tokens: Dict[ChainType, Dict[TokenType, Token]] = {}
+        self.fetched = 0
+        for chain_name, addresses in supported_tokens.items():
+            chain = ChainType(chain_name)
+            self.tokens[chain] = {}
+            for symbol, address in addresses.items():
+                try:
+                    if chain_name in evm_chains:
+                        address = to_checksum_address(address)
+                    elif not address:
+                        raise ValueError("no contract address")
+                except ValueError as e:
+                    logger.warning(f"❌ Skipping {symbol} on {chain_name}: {e}")
+                    continue
+                decimals = token_decimals.get(chain_name, {}).get(symbol)
+                self.tokens[chain][TokenType(symbol)] = Token(chain, TokenType(symbol), address, decimals)
+    
+    def get(self, chain: ChainType, token: TokenType) -> Token:
+        """Token entry, raising ValueError if `chain` does not support `token`"""
+        entry = self.tokens.get(chain, {}).get(token)
+        if entry is None:
+            raise ValueError(f"Unsupported token: {token}")
+        return entry
+    
+    def symbols(self, chain: ChainType) -> List[TokenType]:
+        """Tokens supported on `chain`, in configuration order"""
+        return list(self.tokens.get(chain, {}))
+    
+    async def resolve(self, chain: ChainType, token: TokenType, fetch_decimals: Callable[[str], Awaitable[int]]) -> Token:
+        """Token entry with decimals set, calling `fetch_decimals(address)` the first time they are unknown"""
+        entry = self.get(chain, token)
+        if entry.scale is None:
+            entry.set_decimals(await fetch_decimals(entry.address))
+            self.fetched += 1
+        return entry
+    
+    def stats(self) -> Dict[str, int]:
+        entries = [entry for tokens in self.tokens.values() for entry in tokens.values()]
+        return {
+            "tokens": len(entries),
+            "configured_decimals": sum(1 for entry in entries if entry.scale is not None) - self.fetched,
+            "fetched_decimals": self.fetched,
+            "unknown_decimals": sum(1 for entry in entries if entry.scale is None),
+        }
+
+# Shared by the chain adapters and the routers
+token_registry = TokenRegistry(settings.supported_tokens, settings.token_decimals, list(settings.evm_chains))
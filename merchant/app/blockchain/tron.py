@@ -1,13 +1,14 @@
 from tronpy import Tron
-from tronpy.keys import PrivateKey
 from typing import Dict, List, Optional, Tuple
 from decimal import Decimal
 import asyncio
 import json
 
 from app.blockchain.base import BlockchainInterface
+from app.blockchain.signing import create_tron_account, sign_tron_txid
+from app.blockchain.tokens import Token, token_registry
+from app.core.executor import crypto_executor
 from app.models import ChainType, TokenType
-from app.core.config import settings
 
 class TronBlockchain(BlockchainInterface):
     """Tron blockchain integration"""
@@ -16,24 +17,24 @@ class TronBlockchain(BlockchainInterface):
         super().__init__(rpc_url, ChainType.TRON)
         self.tron = Tron(network="mainnet")
     
+    async def _fetch_decimals(self, contract_address: str) -> int:
+        return self.tron.get_contract(contract_address).functions.decimals()
+    
+    async def _token(self, token: TokenType) -> Token:
+        """Registry entry for `token`; decimals come from config, or one RPC call the first time"""
+        return await token_registry.resolve(self.chain, token, self._fetch_decimals)
+    
     async def get_balance(self, address: str, token: TokenType) -> Decimal:
         """Get TRC-20 token balance"""
-        if token == TokenType.USDC:
-            contract_address = settings.supported_tokens["tron"]["USDC"]
-        elif token == TokenType.USDT:
-            contract_address = settings.supported_tokens["tron"]["USDT"]
-        else:
-            raise ValueError(f"Unsupported token: {token}")
+        token_registry.get(self.chain, token)  # Unsupported tokens raise before the try
         
         try:
             # Get TRC-20 token balance
-            contract = self.tron.get_contract(contract_address)
+            entry = await self._token(token)
+            contract = self.tron.get_contract(entry.address)
             balance = contract.functions.balanceOf(address)
             
-            # Get token decimals
-            decimals = contract.functions.decimals()
-            
-            return Decimal(balance) / Decimal(10 ** decimals)
+            return entry.from_units(balance)
             
         except Exception:
             return Decimal(0)
@@ -48,38 +49,26 @@ class TronBlockchain(BlockchainInterface):
     
     async def create_wallet(self) -> Tuple[str, str]:
         """Create new Tron wallet"""
-        private_key = PrivateKey.random()
-        address = private_key.public_key.to_base58check_address()
-        return address, private_key.hex()
+        return await crypto_executor.run(create_tron_account)
     
     async def send_transaction(self, from_address: str, to_address: str, amount: Decimal, token: TokenType, private_key: str) -> str:
         """Send TRC-20 token transaction"""
-        if token == TokenType.USDC:
-            contract_address = settings.supported_tokens["tron"]["USDC"]
-        elif token == TokenType.USDT:
-            contract_address = settings.supported_tokens["tron"]["USDT"]
-        else:
-            raise ValueError(f"Unsupported token: {token}")
+        token_registry.get(self.chain, token)  # Unsupported tokens raise before the try
         
         try:
-            # Create private key object
-            priv_key = PrivateKey(bytes.fromhex(private_key))
-            
             # Get contract
-            contract = self.tron.get_contract(contract_address)
-            
-            # Get token decimals
-            decimals = contract.functions.decimals()
+            entry = await self._token(token)
+            contract = self.tron.get_contract(entry.address)
             
             # Convert amount to smallest unit
-            amount_smallest = int(amount * Decimal(10 ** decimals))
+            amount_smallest = entry.to_units(amount)
             
             # Build transaction
             txn = contract.functions.transfer(to_address, amount_smallest).with_owner(from_address).build()
             
-            # Sign and broadcast transaction
-            signed_txn = txn.sign(priv_key)
-            result = signed_txn.broadcast()
+            # Sign off the event loop, then broadcast
+            signature = await crypto_executor.run(sign_tron_txid, private_key, txn.txid)
+            result = txn.set_signature([signature]).broadcast()
             
             return result.get('txid')
             
@@ -116,7 +105,7 @@ class TronBlockchain(BlockchainInterface):
     
     async def get_token_contract_address(self, token: TokenType) -> str:
         """Get token contract address"""
-        return settings.supported_tokens["tron"][token.value]
+        return token_registry.get(self.chain, token).address
     
     async def estimate_gas(self, from_address: str, to_address: str, amount: Decimal, token: TokenType) -> int:
         """Estimate energy cost for transaction"""
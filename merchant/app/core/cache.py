@@ -0,0 +1,152 @@
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+import copy
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Keep a slow or unreachable Redis from stalling the requests that consult it
+REDIS_TIMEOUT_SECONDS = 0.5
+
+class TTLCache:
+    """Bounded in-process cache: entries expire after `ttl` seconds and the least recently used is evicted first"""
+    
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: str) -> Optional[Any]:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self.entries[key]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def set(self, key: str, value: Any):
+        self.entries[key] = (time.monotonic() + self.ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+    
+    def delete(self, key: str):
+        self.entries.pop(key, None)
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "capacity": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0,
+            "evictions": self.evictions,
+        }
+
+class TieredCache:
+    """TTLCache in front of an optional shared Redis tier, filled from a loader on a miss.
+    
+    Invalidation clears both tiers in this process; other processes keep their local
+    copy for at most the local TTL, which bounds how long they can serve stale data.
+    """
+    
+    def __init__(self, namespace: str, max_entries: int, ttl: float, redis_url: str = "", redis_ttl: float = 0):
+        self.namespace = namespace
+        self.local = TTLCache(max_entries, ttl)
+        self.redis_ttl = redis_ttl
+        self.redis = None
+        if redis_url:
+            import redis.asyncio as redis
+            self.redis = redis.from_url(
+                redis_url,
+                decode_responses=True,
+                socket_timeout=REDIS_TIMEOUT_SECONDS,
+                socket_connect_timeout=REDIS_TIMEOUT_SECONDS
+            )
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.redis_errors = 0
+    
+    def _redis_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+    
+    async def get(self, key: str, loader: Callable[[], Awaitable[Optional[Any]]]) -> Optional[Any]:
+        """Return a copy of the cached value, loading and caching it on a miss (None is not cached)"""
+        value = self.local.get(key)
+        if value is not None:
+            self.local_hits += 1
+            return copy.copy(value)
+        
+        if self.redis is not None:
+            try:
+                raw = await self.redis.get(self._redis_key(key))
+                if raw is not None:
+                    value = json.loads(raw)
+                    self.local.set(key, value)
+                    self.redis_hits += 1
+                    return copy.copy(value)
+            except Exception as e:
+                self.redis_errors += 1
+                logger.warning(f"Redis cache read failed: {e}")
+        
+        self.misses += 1
+        value = await loader()
+        if value is None:
+            return None
+        await self.put(key, value)
+        return copy.copy(value)
+    
+    async def put(self, key: str, value: Any):
+        """Store a value loaded elsewhere in both tiers"""
+        self.local.set(key, value)
+        if self.redis is not None:
+            try:
+                await self.redis.set(self._redis_key(key), json.dumps(value, default=str), ex=int(self.redis_ttl))
+            except Exception as e:
+                self.redis_errors += 1
+                logger.warning(f"Redis cache write failed: {e}")
+    
+    async def invalidate(self, key: str):
+        """Drop a key from both tiers"""
+        self.invalidations += 1
+        self.local.delete(key)
+        if self.redis is not None:
+            try:
+                await self.redis.delete(self._redis_key(key))
+            except Exception as e:
+                self.redis_errors += 1
+                logger.warning(f"Redis cache invalidation failed: {e}")
+    
+    async def close(self):
+        if self.redis is not None:
+            await self.redis.aclose()
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.local_hits + self.redis_hits + self.misses
+        return {
+            "size": len(self.local.entries),
+            "capacity": self.local.max_entries,
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.local_hits + self.redis_hits) / lookups, 4) if lookups else 0,
+            "invalidations": self.invalidations,
+            "evictions": self.local.evictions,
+            "redis_enabled": self.redis is not None,
+            "redis_errors": self.redis_errors,
+        }
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Dict, List
+from typing import Any, Dict, List
 import os
 
 class Settings(BaseSettings):
@@ -7,31 +7,108 @@ class Settings(BaseSettings):
     supabase_url: str = os.getenv("SUPABASE_URL", "")
     supabase_key: str = os.getenv("SUPABASE_KEY", "")
     supabase_service_key: str = os.getenv("SUPABASE_SERVICE_KEY", "")
+    supabase_pool_size: int = int(os.getenv("SUPABASE_POOL_SIZE", "4"))
+    supabase_timeout_seconds: float = float(os.getenv("SUPABASE_TIMEOUT_SECONDS", "10"))
+    
+    # Storage backend: "supabase" (PostgREST over HTTP) or "postgres" (direct asyncpg)
+    database_backend: str = os.getenv("DATABASE_BACKEND", "supabase")
+    database_url: str = os.getenv("DATABASE_URL", "")
+    database_pool_min_size: int = int(os.getenv("DATABASE_POOL_MIN_SIZE", "2"))
+    database_pool_max_size: int = int(os.getenv("DATABASE_POOL_MAX_SIZE", "10"))
+    database_statement_cache_size: int = int(os.getenv("DATABASE_STATEMENT_CACHE_SIZE", "100"))
+    
+    # Monthly partitions of transactions and webhook_logs
+    partition_months_ahead: int = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+    partition_check_seconds: float = float(os.getenv("PARTITION_CHECK_SECONDS", "3600"))  # how often the API tops them up
+    webhook_log_retention_months: int = int(os.getenv("WEBHOOK_LOG_RETENTION_MONTHS", "3"))
+    transaction_retention_months: int = int(os.getenv("TRANSACTION_RETENTION_MONTHS", "0"))  # 0 keeps everything
+    archive_dir: str = os.getenv("ARCHIVE_DIR", "archive")
     
     # JWT Configuration
     secret_key: str = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
     algorithm: str = os.getenv("ALGORITHM", "HS256")
     access_token_expire_minutes: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    # Embed the merchant's profile in access tokens so requests authenticate without a lookup
+    jwt_claims_mode: bool = os.getenv("JWT_CLAIMS_MODE", "false").lower() == "true"
+    # Revoked tokens stop working within TOKEN_VERSION_REFRESH_SECONDS; past
+    # TOKEN_VERSION_MAX_STALENESS_SECONDS without a refresh, claims are checked against the database
+    token_version_refresh_seconds: float = float(os.getenv("TOKEN_VERSION_REFRESH_SECONDS", "10"))
+    token_version_max_staleness_seconds: float = float(os.getenv("TOKEN_VERSION_MAX_STALENESS_SECONDS", "60"))
+    
+    # API keys are stored as HMAC-SHA256(API_KEY_HASH_SECRET, secret); changing it invalidates every key
+    api_key_hash_secret: str = os.getenv("API_KEY_HASH_SECRET", os.getenv("SECRET_KEY", "your-secret-key-change-in-production"))
+    api_key_cache_ttl_seconds: float = float(os.getenv("API_KEY_CACHE_TTL_SECONDS", "60"))
+    api_key_cache_max_entries: int = int(os.getenv("API_KEY_CACHE_MAX_ENTRIES", "10000"))
+    
+    # Bearer token GET /metrics requires; empty disables the endpoint
+    metrics_token: str = os.getenv("METRICS_TOKEN", "")
     
-    # Blockchain RPC URLs
-    ethereum_rpc_url: str = os.getenv("ETHEREUM_RPC_URL", "")
-    polygon_rpc_url: str = os.getenv("POLYGON_RPC_URL", "")
-    bsc_rpc_url: str = os.getenv("BSC_RPC_URL", "")
-    avalanche_rpc_url: str = os.getenv("AVALANCHE_RPC_URL", "")
+    # Pool for CPU-bound crypto (bcrypt, key generation, transaction signing): thread or process
+    crypto_executor: str = os.getenv("CRYPTO_EXECUTOR", "thread")
+    crypto_executor_workers: int = int(os.getenv("CRYPTO_EXECUTOR_WORKERS", str(min(4, os.cpu_count() or 1))))
+    
+    # Blockchain RPC URLs (EVM chains are configured in evm_chains below)
     tron_rpc_url: str = os.getenv("TRON_RPC_URL", "")
     solana_rpc_url: str = os.getenv("SOLANA_RPC_URL", "")
+    rpc_max_connections: int = int(os.getenv("RPC_MAX_CONNECTIONS", "50"))  # per chain
+    rpc_timeout_seconds: float = float(os.getenv("RPC_TIMEOUT_SECONDS", "10"))
+    # EVM *_RPC_URL settings take a comma-separated list of endpoints; see RpcPool in app/blockchain/rpc.py
+    rpc_eject_after_failures: int = int(os.getenv("RPC_EJECT_AFTER_FAILURES", "3"))
+    rpc_eject_seconds: float = float(os.getenv("RPC_EJECT_SECONDS", "30"))
+    rpc_hedge_reads: bool = os.getenv("RPC_HEDGE_READS", "false").lower() == "true"
+    rpc_hedge_min_delay_ms: float = float(os.getenv("RPC_HEDGE_MIN_DELAY_MS", "50"))
+    rpc_batch_size: int = int(os.getenv("RPC_BATCH_SIZE", "100"))  # most calls per JSON-RPC batch; shrinks if the provider refuses
+    multicall_batch_size: int = int(os.getenv("MULTICALL_BATCH_SIZE", "100"))  # balance reads per aggregate3 call
+    # Chain head tracking, see app/blockchain/heads.py; <CHAIN>_WS_URL enables newHeads subscriptions
+    head_poll_min_seconds: float = float(os.getenv("HEAD_POLL_MIN_SECONDS", "0.5"))
+    head_ws_retry_seconds: float = float(os.getenv("HEAD_WS_RETRY_SECONDS", "60"))  # polling time before reconnecting
+    head_max_staleness_blocks: float = float(os.getenv("HEAD_MAX_STALENESS_BLOCKS", "3"))
+    # EVM nonce allocation, see app/blockchain/nonces.py
+    nonce_lease_backend: str = os.getenv("NONCE_LEASE_BACKEND", "memory")  # memory (single worker), redis or postgres
+    nonce_lease_seconds: float = float(os.getenv("NONCE_LEASE_SECONDS", "30"))
+    nonce_lease_wait_seconds: float = float(os.getenv("NONCE_LEASE_WAIT_SECONDS", "10"))
+    nonce_resync_seconds: float = float(os.getenv("NONCE_RESYNC_SECONDS", "60"))  # idle time before checking for gaps
+    # EVM fee suggestions, see app/blockchain/fees.py
+    fee_history_blocks: int = int(os.getenv("FEE_HISTORY_BLOCKS", "20"))
+    fee_max_age_blocks: float = float(os.getenv("FEE_MAX_AGE_BLOCKS", "3"))  # older suggestions are read again on use
     
     # Redis Configuration
     redis_url: str = os.getenv("REDIS_URL", "redis://localhost:6379")
     
+    # Merchant identity cache used by get_current_merchant
+    merchant_cache_ttl_seconds: float = float(os.getenv("MERCHANT_CACHE_TTL_SECONDS", "30"))
+    merchant_cache_max_entries: int = int(os.getenv("MERCHANT_CACHE_MAX_ENTRIES", "10000"))
+    merchant_cache_redis: bool = os.getenv("MERCHANT_CACHE_REDIS", "false").lower() == "true"
+    merchant_cache_redis_ttl_seconds: int = int(os.getenv("MERCHANT_CACHE_REDIS_TTL_SECONDS", "300"))
+    
+    # EVM RPC response cache keyed by block height, see app/blockchain/cache.py
+    rpc_cache_enabled: bool = os.getenv("RPC_CACHE_ENABLED", "true").lower() == "true"
+    rpc_cache_max_entries: int = int(os.getenv("RPC_CACHE_MAX_ENTRIES", "50000"))  # per chain and tier
+    rpc_cache_redis: bool = os.getenv("RPC_CACHE_REDIS", "false").lower() == "true"
+    rpc_cache_redis_ttl_seconds: int = int(os.getenv("RPC_CACHE_REDIS_TTL_SECONDS", "86400"))  # for finalized entries
+    
+    # Rate limiting per merchant (or client address) and route class, see app/core/rate_limit.py
+    rate_limit_enabled: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    rate_limit_backend: str = os.getenv("RATE_LIMIT_BACKEND", "memory")  # memory or redis
+    rate_limit_api_per_second: float = float(os.getenv("RATE_LIMIT_API_PER_SECOND", "20"))
+    rate_limit_api_burst: float = float(os.getenv("RATE_LIMIT_API_BURST", "100"))
+    rate_limit_chain_per_second: float = float(os.getenv("RATE_LIMIT_CHAIN_PER_SECOND", "20"))
+    rate_limit_chain_burst: float = float(os.getenv("RATE_LIMIT_CHAIN_BURST", "100"))
+    rate_limit_chain_concurrency: int = int(os.getenv("RATE_LIMIT_CHAIN_CONCURRENCY", "4"))
+    rate_limit_auth_per_second: float = float(os.getenv("RATE_LIMIT_AUTH_PER_SECOND", "0.2"))
+    rate_limit_auth_burst: float = float(os.getenv("RATE_LIMIT_AUTH_BURST", "10"))
+    
     # Webhook Configuration
     webhook_base_url: str = os.getenv("WEBHOOK_BASE_URL", "")
     webhook_secret: str = os.getenv("WEBHOOK_SECRET", "your-webhook-secret")
+    webhook_log_batch_size: int = int(os.getenv("WEBHOOK_LOG_BATCH_SIZE", "100"))
+    webhook_log_flush_interval_seconds: float = float(os.getenv("WEBHOOK_LOG_FLUSH_INTERVAL_SECONDS", "0.5"))
+    webhook_log_buffer_size: int = int(os.getenv("WEBHOOK_LOG_BUFFER_SIZE", "10000"))
     
     # Supported Stablecoins
     supported_tokens: Dict[str, Dict[str, str]] = {
         "ethereum": {
-            "USDC": os.getenv("USDC_ETH", "0xA0b86a33E6441b8c4C8C0e4b8b8b8b8b8b8b8b8b"),
+            "USDC": os.getenv("USDC_ETH", "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"),
             "USDT": os.getenv("USDT_ETH", "0xdAC17F958D2ee523a2206206994597C13D831ec7"),
             "DAI": os.getenv("DAI_ETH", "0x6B175474E89094C44Da98b954EedeAC495271d0F")
         },
@@ -48,7 +125,7 @@ class Settings(BaseSettings):
         "avalanche": {
             "USDC": os.getenv("USDC_AVALANCHE", "0xB97EF9Ef8734C71904D8002F8b6Bc66Dd9c48a6E"),
             "USDT": os.getenv("USDT_AVALANCHE", "0x9702230A8Ea53601f5cD2dc00fDBc13d4dF4A8c7"),
-            "DAI": os.getenv("DAI_AVALANCHE", "0xd586E7F844cEa2F87f5015260BC9602C7B7C8E5")
+            "DAI": os.getenv("DAI_AVALANCHE", "0xd586E7F844cEa2F87f50152665BCbc2C279D8d70")
         },
         "tron": {
             "USDC": os.getenv("USDC_TRON", "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t"),
@@ -60,6 +137,84 @@ class Settings(BaseSettings):
         }
     }
     
+    # Decimals of the tokens above, so balance reads and payouts skip the decimals() call; they match the
+    # default contracts, so set <TOKEN>_<CHAIN>_DECIMALS alongside any address override
+    token_decimals: Dict[str, Dict[str, int]] = {
+        "ethereum": {
+            "USDC": int(os.getenv("USDC_ETH_DECIMALS", "6")),
+            "USDT": int(os.getenv("USDT_ETH_DECIMALS", "6")),
+            "DAI": int(os.getenv("DAI_ETH_DECIMALS", "18"))
+        },
+        "polygon": {
+            "USDC": int(os.getenv("USDC_POLYGON_DECIMALS", "6")),
+            "USDT": int(os.getenv("USDT_POLYGON_DECIMALS", "6")),
+            "DAI": int(os.getenv("DAI_POLYGON_DECIMALS", "18"))
+        },
+        "bsc": {
+            "USDC": int(os.getenv("USDC_BSC_DECIMALS", "18")),
+            "USDT": int(os.getenv("USDT_BSC_DECIMALS", "18")),
+            "BUSD": int(os.getenv("BUSD_BSC_DECIMALS", "18"))
+        },
+        "avalanche": {
+            "USDC": int(os.getenv("USDC_AVALANCHE_DECIMALS", "6")),
+            "USDT": int(os.getenv("USDT_AVALANCHE_DECIMALS", "6")),
+            "DAI": int(os.getenv("DAI_AVALANCHE_DECIMALS", "18"))
+        },
+        "tron": {
+            "USDC": int(os.getenv("USDC_TRON_DECIMALS", "6")),
+            "USDT": int(os.getenv("USDT_TRON_DECIMALS", "6"))
+        },
+        "solana": {
+            "USDC": int(os.getenv("USDC_SOLANA_DECIMALS", "6")),
+            "USDT": int(os.getenv("USDT_SOLANA_DECIMALS", "6"))
+        }
+    }
+    
+    # EVM chains, all served by app/blockchain/evm.py. Adding one (e.g. Arbitrum or Base) takes an
+    # entry here, its tokens in supported_tokens/token_decimals and a ChainType member; no new adapter class
+    evm_chains: Dict[str, Dict[str, Any]] = {
+        "ethereum": {
+            "chain_id": 1,
+            "rpc_urls": [url.strip() for url in os.getenv("ETHEREUM_RPC_URL", "").split(",") if url.strip()],
+            "ws_url": os.getenv("ETHEREUM_WS_URL", ""),
+            "native_symbol": "ETH",
+            "poa": False,
+            "fee_model": "eip1559",
+            "block_time": 12.0,
+            "confirmations": int(os.getenv("ETHEREUM_CONFIRMATIONS", "12"))
+        },
+        "polygon": {
+            "chain_id": 137,
+            "rpc_urls": [url.strip() for url in os.getenv("POLYGON_RPC_URL", "").split(",") if url.strip()],
+            "ws_url": os.getenv("POLYGON_WS_URL", ""),
+            "native_symbol": "MATIC",
+            "poa": True,
+            "fee_model": "eip1559",
+            "block_time": 2.0,
+            "confirmations": int(os.getenv("POLYGON_CONFIRMATIONS", "64"))
+        },
+        "bsc": {
+            "chain_id": 56,
+            "rpc_urls": [url.strip() for url in os.getenv("BSC_RPC_URL", "").split(",") if url.strip()],
+            "ws_url": os.getenv("BSC_WS_URL", ""),
+            "native_symbol": "BNB",
+            "poa": True,
+            "fee_model": "legacy",
+            "block_time": 3.0,
+            "confirmations": int(os.getenv("BSC_CONFIRMATIONS", "15"))
+        },
+        "avalanche": {
+            "chain_id": 43114,
+            "rpc_urls": [url.strip() for url in os.getenv("AVALANCHE_RPC_URL", "").split(",") if url.strip()],
+            "ws_url": os.getenv("AVALANCHE_WS_URL", ""),
+            "native_symbol": "AVAX",
+            "poa": False,
+            "fee_model": "eip1559",
+            "block_time": 2.0,
+            "confirmations": int(os.getenv("AVALANCHE_CONFIRMATIONS", "1"))
+        }
+    }
+    
     # Supported chains
     supported_chains: List[str] = ["ethereum", "polygon", "bsc", "avalanche", "tron", "solana"]
     
@@ -0,0 +1,102 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import time
+
+from app.core.config import settings
+
+def _timed(fn: Callable, args: tuple) -> tuple:
+    """Run `fn` in a worker and report when it started and finished (wall clock, comparable across processes)"""
+    started = time.time()
+    result = fn(*args)
+    return started, time.time(), result
+
+class CryptoExecutor:
+    """Pool that runs CPU-bound crypto (hashing, key generation, signing) off the event loop.
+    
+    With `kind="process"`, functions and their arguments must be picklable, so pass
+    module-level functions (see app/blockchain/signing.py) rather than bound methods.
+    """
+    
+    def __init__(self, kind: str, workers: int):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unsupported crypto executor: {kind}")
+        self.kind = kind
+        self.workers = workers
+        self.pool: Optional[Executor] = None
+        self.submitted = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.max_queue_depth = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.run_seconds = 0.0
+        self.max_run_seconds = 0.0
+    
+    def start(self):
+        """Create the pool (called from the app lifespan; run() also starts it on first use)"""
+        if self.pool is not None:
+            return
+        if self.kind == "process":
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        else:
+            self.pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="crypto")
+    
+    async def stop(self):
+        """Wait for running jobs and shut the pool down (called from the app lifespan)"""
+        if self.pool is None:
+            return
+        pool, self.pool = self.pool, None
+        # shutdown(wait=True) blocks until running jobs finish, so it waits in a thread
+        await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
+    
+    async def run(self, fn: Callable, *args) -> Any:
+        """Run `fn(*args)` in the pool and return its result"""
+        self.start()
+        self.submitted += 1
+        self.in_flight += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        submitted_at = time.time()
+        try:
+            started_at, finished_at, result = await asyncio.get_running_loop().run_in_executor(
+                self.pool, _timed, fn, args
+            )
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+        
+        wait = max(0.0, started_at - submitted_at)
+        elapsed = finished_at - started_at
+        self.completed += 1
+        self.wait_seconds += wait
+        self.max_wait_seconds = max(self.max_wait_seconds, wait)
+        self.run_seconds += elapsed
+        self.max_run_seconds = max(self.max_run_seconds, elapsed)
+        return result
+    
+    @property
+    def queue_depth(self) -> int:
+        """Jobs waiting for a free worker"""
+        return max(0, self.in_flight - self.workers)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_wait_ms": round(self.wait_seconds * 1000 / self.completed, 2) if self.completed else 0,
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 2),
+            "avg_run_ms": round(self.run_seconds * 1000 / self.completed, 2) if self.completed else 0,
+            "max_run_ms": round(self.max_run_seconds * 1000, 2),
+        }
+
+# Shared by the security module and every chain adapter
+crypto_executor = CryptoExecutor(settings.crypto_executor, settings.crypto_executor_workers)
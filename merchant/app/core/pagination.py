@@ -0,0 +1,58 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+import base64
+import json
+
+from fastapi import HTTPException, Response, status
+
+# Response headers carrying the opaque cursors of the neighbouring pages
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+PREV_CURSOR_HEADER = "X-Prev-Cursor"
+
+@dataclass
+class Cursor:
+    """Keyset position: the (created_at, id) of a row plus the paging direction"""
+    created_at: str
+    id: str
+    backward: bool = False
+
+def encode_cursor(row: Dict[str, Any], backward: bool = False) -> str:
+    """Build an opaque cursor pointing at a row"""
+    raw = json.dumps({"t": row["created_at"], "id": row["id"], "b": backward}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Cursor]:
+    """Parse an opaque cursor, raising 400 if it is malformed"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        return Cursor(created_at=str(data["t"]), id=str(data["id"]), backward=bool(data.get("b", False)))
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+def set_page_headers(
+    response: Response,
+    rows: List[Dict[str, Any]],
+    has_more: bool,
+    cursor: Optional[Cursor] = None,
+    offset: int = 0
+):
+    """Expose next/previous page cursors for a newest-first page"""
+    if not rows:
+        return
+
+    if cursor and cursor.backward:
+        # We came from the following page, so it always exists
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, bool(cursor) or offset > 0
+
+    if has_next:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1])
+    if has_prev:
+        response.headers[PREV_CURSOR_HEADER] = encode_cursor(rows[0], backward=True)
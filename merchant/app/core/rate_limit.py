@@ -0,0 +1,241 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+import math
+import re
+import time
+
+from jose import JWTError, jwt
+from starlette.responses import JSONResponse
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Every request spends `cost` tokens from the bucket of its (client, route class).
+# First match wins; anything else is ("api", 1). Chain routes fan out to RPC providers.
+ROUTE_COSTS: List[Tuple[str, re.Pattern, str, int]] = [
+    ("POST", re.compile(r"^/api/v1/auth/(login|register)$"), "auth", 1),
+    ("GET", re.compile(r"^/api/v1/wallets/balances/all$"), "chain", 10),
+    ("GET", re.compile(r"^/api/v1/transactions/pending/check$"), "chain", 10),
+    ("POST", re.compile(r"^/api/v1/payouts/batch$"), "chain", 10),
+    ("GET", re.compile(r"^/api/v1/wallets/[^/]+/balances$"), "chain", 3),
+    ("POST", re.compile(r"^/api/v1/payouts/[^/]+/execute$"), "chain", 2),
+    ("GET", re.compile(r"^/api/v1/wallets/[^/]+/balance$"), "chain", 1),
+    ("POST", re.compile(r"^/api/v1/transactions/[^/]+/refresh$"), "chain", 1),
+    ("POST", re.compile(r"^/api/v1/payments/[^/]+/verify$"), "chain", 1),
+]
+
+def classify(method: str, path: str) -> Tuple[str, int]:
+    """(route class, cost) of a request"""
+    for route_method, pattern, route_class, cost in ROUTE_COSTS:
+        if method == route_method and pattern.match(path):
+            return route_class, cost
+    return "api", 1
+
+def route_limits() -> Dict[str, Tuple[float, float]]:
+    """(tokens per second, burst) per route class"""
+    return {
+        "api": (settings.rate_limit_api_per_second, settings.rate_limit_api_burst),
+        "chain": (settings.rate_limit_chain_per_second, settings.rate_limit_chain_burst),
+        "auth": (settings.rate_limit_auth_per_second, settings.rate_limit_auth_burst),
+    }
+
+class RateLimiter(ABC):
+    """Token buckets keyed by client and route class"""
+    
+    name = ""
+    
+    def __init__(self):
+        self.allowed: Dict[str, int] = {}
+        self.limited: Dict[str, int] = {}
+        self.concurrency_limited = 0
+    
+    @abstractmethod
+    async def take(self, key: str, cost: float, rate: float, burst: float) -> Tuple[bool, float]:
+        """Spend `cost` tokens; returns (allowed, seconds until they would be available)"""
+        pass
+    
+    async def close(self):
+        """Release connections (called from the app lifespan)"""
+        pass
+    
+    def record(self, route_class: str, allowed: bool):
+        counters = self.allowed if allowed else self.limited
+        counters[route_class] = counters.get(route_class, 0) + 1
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "allowed": dict(self.allowed),
+            "limited": dict(self.limited),
+            "concurrency_limited": self.concurrency_limited,
+        }
+
+class MemoryRateLimiter(RateLimiter):
+    """Per-process buckets; with N workers each client gets up to N times the configured rate"""
+    
+    name = "memory"
+    
+    def __init__(self, max_keys: int = 100_000):
+        super().__init__()
+        self.max_keys = max_keys
+        self.buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+    
+    async def take(self, key: str, cost: float, rate: float, burst: float) -> Tuple[bool, float]:
+        now = time.monotonic()
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = [burst, now]
+            # A forgotten bucket is simply full again
+            while len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(key)
+        
+        tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+        bucket[1] = now
+        if tokens >= cost:
+            bucket[0] = tokens - cost
+            return True, 0.0
+        bucket[0] = tokens
+        return False, (cost - tokens) / rate
+    
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "buckets": len(self.buckets)}
+
+# Refills and spends a bucket atomically on the Redis clock.
+# Numbers are returned as strings because Lua numbers are truncated to integers in replies.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(retry_after)}
+"""
+
+class RedisRateLimiter(RateLimiter):
+    """Buckets shared by every worker through Redis; requests are let through if Redis is unreachable"""
+    
+    name = "redis"
+    
+    def __init__(self, redis_url: str):
+        super().__init__()
+        import redis.asyncio as redis
+        from app.core.cache import REDIS_TIMEOUT_SECONDS
+        self.redis = redis.from_url(
+            redis_url,
+            socket_timeout=REDIS_TIMEOUT_SECONDS,
+            socket_connect_timeout=REDIS_TIMEOUT_SECONDS
+        )
+        self.script = self.redis.register_script(TOKEN_BUCKET_SCRIPT)
+        self.errors = 0
+    
+    async def take(self, key: str, cost: float, rate: float, burst: float) -> Tuple[bool, float]:
+        try:
+            allowed, retry_after = await self.script(keys=[f"rate_limit:{key}"], args=[rate, burst, cost])
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Redis rate limiter failed, allowing request: {e}")
+            return True, 0.0
+        return bool(allowed), float(retry_after)
+    
+    async def close(self):
+        await self.redis.aclose()
+    
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "redis_errors": self.errors}
+
+def create_limiter() -> RateLimiter:
+    """Create the rate limiter backend selected in settings"""
+    if settings.rate_limit_backend == "redis":
+        return RedisRateLimiter(settings.redis_url)
+    if settings.rate_limit_backend != "memory":
+        raise ValueError(f"Unsupported rate limit backend: {settings.rate_limit_backend}")
+    return MemoryRateLimiter()
+
+# Rate limiter shared by every request in this process
+limiter = create_limiter()
+
+def client_key(scope: Dict[str, Any]) -> str:
+    """Merchant id from a valid bearer token, otherwise the client address"""
+    for name, value in scope.get("headers") or []:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer":
+                try:
+                    payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+                    if payload.get("sub"):
+                        return f"merchant:{payload['sub']}"
+                except JWTError:
+                    pass
+            break
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+def too_many_requests(retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Rate limit exceeded"},
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+class RateLimitMiddleware:
+    """Admits each request against its client's bucket for the route class, and caps how
+    many chain requests one client may have in flight in this process"""
+    
+    def __init__(self, app, limiter: Optional[RateLimiter] = None, chain_concurrency: Optional[int] = None):
+        self.app = app
+        self.limiter = limiter
+        self.chain_concurrency = settings.rate_limit_chain_concurrency if chain_concurrency is None else chain_concurrency
+        self.in_flight: Dict[str, int] = {}
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        active_limiter = self.limiter or limiter
+        route_class, cost = classify(scope["method"], scope["path"])
+        rate, burst = route_limits()[route_class]
+        key = client_key(scope)
+        
+        if route_class == "chain" and self.in_flight.get(key, 0) >= self.chain_concurrency:
+            active_limiter.concurrency_limited += 1
+            active_limiter.record(route_class, False)
+            await too_many_requests(1)(scope, receive, send)
+            return
+        
+        allowed, retry_after = await active_limiter.take(f"{key}:{route_class}", min(cost, burst), rate, burst)
+        active_limiter.record(route_class, allowed)
+        if not allowed:
+            await too_many_requests(retry_after)(scope, receive, send)
+            return
+        
+        if route_class != "chain":
+            await self.app(scope, receive, send)
+            return
+        
+        self.in_flight[key] = self.in_flight.get(key, 0) + 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight[key] -= 1
+            if not self.in_flight[key]:
+                del self.in_flight[key]
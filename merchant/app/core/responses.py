@@ -0,0 +1,35 @@
+from decimal import Decimal
+from typing import Any
+import json
+import re
+
+from fastapi.responses import JSONResponse
+
+# Placeholder a Decimal is rendered as before being swapped for the bare number
+DECIMAL_PLACEHOLDER = re.compile(r'"\\u0000decimal:([-0-9.]+)\\u0000"')
+
+def _decimal_placeholder(value: Any) -> str:
+    if isinstance(value, Decimal) and value.is_finite():
+        # Fixed-point text keeps every digit (normalize() would round to the context precision)
+        text = f"{value:f}"
+        if "." in text:
+            text = text.rstrip("0").rstrip(".")
+        return f"\x00decimal:{text}\x00"
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class DecimalJSONResponse(JSONResponse):
+    """JSON response that writes Decimal values as exact JSON numbers instead of floats.
+    
+    Return an instance directly from the route: a plain dict would go through
+    jsonable_encoder first, which converts every Decimal to float.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        body = json.dumps(
+            content,
+            ensure_ascii=True,
+            allow_nan=False,
+            separators=(",", ":"),
+            default=_decimal_placeholder
+        )
+        return DECIMAL_PLACEHOLDER.sub(r"\1", body).encode("utf-8")
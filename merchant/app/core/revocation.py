@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+import asyncio
+import logging
+import time
+
+from app.core.config import settings
+from app.repositories.base import get_backend
+
+logger = logging.getLogger(__name__)
+
+# Re-read changes this far behind the last refresh, so updates committed after their
+# updated_at was stamped are still picked up
+REFRESH_OVERLAP = timedelta(minutes=1)
+
+class TokenVersions:
+    """Current token_version of every merchant that has revoked tokens, refreshed from the database.
+    
+    Merchants missing from the set are on version 1. A token whose `ver` claim is
+    below the merchant's current version has been revoked. If the set has not been
+    refreshed for `max_staleness` seconds it is not trusted and callers fall back to
+    the database.
+    """
+    
+    def __init__(self, refresh_interval: float, max_staleness: float):
+        self.refresh_interval = refresh_interval
+        self.max_staleness = max_staleness
+        self.versions: Dict[str, int] = {}
+        self.since: Optional[datetime] = None
+        self.refreshed_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.rejected = 0
+    
+    async def start(self):
+        """Load the set and keep refreshing it in the background (called from the app lifespan)"""
+        if self.task is not None:
+            return
+        try:
+            await self.refresh()
+        except Exception as e:
+            self.refresh_errors += 1
+            logger.error(f"❌ Could not load merchant token versions: {e}")
+        self.task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop the background refresh (called from the app lifespan)"""
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+    
+    async def refresh(self):
+        """Merge versions changed since the previous refresh"""
+        since = self.since - REFRESH_OVERLAP if self.since else None
+        result = await get_backend().rpc("merchant_token_versions", {"p_since": since})
+        for merchant_id, version in result["versions"].items():
+            self.observe(merchant_id, version)
+        self.since = datetime.fromisoformat(result["now"])
+        self.refreshed_at = time.monotonic()
+        self.refreshes += 1
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                self.refresh_errors += 1
+                logger.error(f"❌ Could not refresh merchant token versions: {e}")
+    
+    def observe(self, merchant_id: str, version: Optional[int]):
+        """Record a version seen on a merchant row (versions only move forward)"""
+        if version and version > self.versions.get(merchant_id, 1):
+            self.versions[merchant_id] = version
+    
+    @property
+    def fresh(self) -> bool:
+        return self.refreshed_at is not None and time.monotonic() - self.refreshed_at <= self.max_staleness
+    
+    def is_current(self, merchant_id: str, version: int) -> bool:
+        """Whether a token issued at `version` has not been revoked as far as this set knows"""
+        if version < self.versions.get(merchant_id, 1):
+            self.rejected += 1
+            return False
+        return True
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.task is not None,
+            "fresh": self.fresh,
+            "merchants": len(self.versions),
+            "age_seconds": round(time.monotonic() - self.refreshed_at, 1) if self.refreshed_at is not None else None,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "rejected": self.rejected,
+        }
+
+token_versions = TokenVersions(
+    settings.token_version_refresh_seconds,
+    settings.token_version_max_staleness_seconds
+)
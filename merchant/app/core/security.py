@@ -7,9 +7,13 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import secrets
 import string
 import hashlib
+import hmac
 
+from app.core.cache import TTLCache
 from app.core.config import settings
-from app.database import get_supabase
+from app.core.executor import crypto_executor
+from app.core.revocation import token_versions
+from app.repositories import merchants
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -17,18 +21,54 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # JWT token scheme
 security = HTTPBearer()
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
+# GET /metrics token scheme; a missing header is answered by verify_metrics_token
+metrics_security = HTTPBearer(auto_error=False)
+
+# API keys are issued as "<prefix>.<secret>"; keys issued before that format
+# are looked up by their first LEGACY_PREFIX_LENGTH characters
+LEGACY_PREFIX_LENGTH = 16
+
+# Merchant fields carried in access tokens in JWT claims mode (what routers read from current_merchant).
+# Profile fields can lag behind PUT /merchants/profile until the token expires.
+CLAIM_FIELDS = ("email", "company_name", "webhook_url", "is_active", "created_at")
+
+# API key prefix -> merchant id, for keys whose secret has been verified recently
+verified_api_keys = TTLCache(settings.api_key_cache_max_entries, settings.api_key_cache_ttl_seconds)
+
+def _verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
-def get_password_hash(password: str) -> str:
-    """Hash a password"""
+def _hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash (bcrypt runs in the crypto executor)"""
+    return await crypto_executor.run(_verify_password, plain_password, hashed_password)
+
+async def get_password_hash(password: str) -> str:
+    """Hash a password (bcrypt runs in the crypto executor)"""
+    return await crypto_executor.run(_hash_password, password)
+
 def generate_api_key() -> str:
     """Generate a secure API key"""
-    # Generate 32 random bytes and encode as hex
-    return secrets.token_hex(32)
+    # 8 random bytes of public prefix and 32 of secret, hex encoded
+    return f"{secrets.token_hex(8)}.{secrets.token_hex(32)}"
+
+def split_api_key(api_key: str) -> tuple:
+    """(prefix, secret) of an API key"""
+    prefix, dot, secret = api_key.partition(".")
+    if not dot:
+        return api_key[:LEGACY_PREFIX_LENGTH], api_key
+    return prefix, secret
+
+def hash_api_key_secret(secret: str) -> str:
+    """Keyed HMAC-SHA256 of an API key secret"""
+    return hmac.new(settings.api_key_hash_secret.encode(), secret.encode(), hashlib.sha256).hexdigest()
+
+def api_key_columns(api_key: str) -> dict:
+    """merchants columns stored for an API key (the key itself is never stored)"""
+    prefix, secret = split_api_key(api_key)
+    return {"api_key": None, "api_key_prefix": prefix, "api_key_hash": hash_api_key_secret(secret)}
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token"""
@@ -42,6 +82,16 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
+def access_token_claims(merchant: dict) -> dict:
+    """Access token claims for a merchant: id and token version, plus its profile in JWT claims mode"""
+    claims = {"sub": merchant["id"], "ver": merchant.get("token_version") or 1}
+    if settings.jwt_claims_mode:
+        profile = {field: merchant.get(field) for field in CLAIM_FIELDS}
+        if isinstance(profile["created_at"], datetime):
+            profile["created_at"] = profile["created_at"].isoformat()
+        claims["merchant"] = profile
+    return claims
+
 def verify_token(token: str) -> dict:
     """Verify and decode a JWT token"""
     try:
@@ -54,9 +104,8 @@ def verify_token(token: str) -> dict:
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-async def get_current_merchant(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Get current merchant from JWT token"""
-    token = credentials.credentials
+async def merchant_from_token(token: str) -> dict:
+    """Merchant a JWT token was issued to, active or not; raises 401 if the token is invalid or revoked"""
     payload = verify_token(token)
     
     merchant_id = payload.get("sub")
@@ -67,18 +116,43 @@ async def get_current_merchant(credentials: HTTPAuthorizationCredentials = Depen
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Get merchant from database
-    supabase = get_supabase()
-    result = supabase.table("merchants").select("*").eq("id", merchant_id).execute()
-    
-    if not result.data:
+    # Tokens issued before a deactivation or key rotation are revoked
+    version = payload.get("ver", 1)
+    if not token_versions.is_current(merchant_id, version):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Merchant not found",
+            detail="Token has been revoked",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    merchant = result.data[0]
+    if settings.jwt_claims_mode and "merchant" in payload and token_versions.fresh:
+        # Trust the claims; revocations reach this process within the refresh interval
+        merchant = {"id": merchant_id, "token_version": version, **payload["merchant"]}
+    else:
+        # Get merchant from the cache, falling back to the database
+        merchant = await merchants.get_cached(merchant_id)
+        
+        if not merchant:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Merchant not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        
+        token_versions.observe(merchant_id, merchant.get("token_version"))
+        if not token_versions.is_current(merchant_id, version):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+    
+    return merchant
+
+async def get_current_merchant(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Get current merchant from JWT token"""
+    merchant = await merchant_from_token(credentials.credentials)
+    
     if not merchant.get("is_active"):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -88,18 +162,61 @@ async def get_current_merchant(credentials: HTTPAuthorizationCredentials = Depen
     
     return merchant
 
+async def get_current_merchant_allow_inactive(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Get current merchant from JWT token, even if the account is inactive (only for reactivating it)"""
+    return await merchant_from_token(credentials.credentials)
+
+async def verify_metrics_token(credentials: Optional[HTTPAuthorizationCredentials] = Depends(metrics_security)):
+    """Allow GET /metrics only with METRICS_TOKEN; without one configured the endpoint does not exist"""
+    if not settings.metrics_token:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not Found"
+        )
+    
+    if credentials is None or not secrets.compare_digest(credentials.credentials.encode(), settings.metrics_token.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+async def authenticate_api_key(api_key: str) -> Optional[dict]:
+    """Merchant owning an API key, or None"""
+    prefix, secret = split_api_key(api_key)
+    merchant_id = verified_api_keys.get(prefix)
+    if merchant_id is not None:
+        merchant = await merchants.get_cached(merchant_id)
+    else:
+        merchant = await merchants.get_by_api_key_prefix(prefix)
+        if merchant is None and "." not in api_key:
+            # Legacy key that hash-api-keys has not migrated yet
+            legacy = await merchants.get_by_api_key(api_key)
+            return legacy if legacy and secrets.compare_digest(legacy["api_key"], api_key) else None
+        if merchant is not None:
+            await merchants.cache.put(merchant["id"], merchant)
+    
+    if not merchant or merchant.get("api_key_prefix") != prefix:
+        # The key was rotated or its merchant removed
+        verified_api_keys.delete(prefix)
+        return None
+    
+    if not secrets.compare_digest(merchant.get("api_key_hash") or "", hash_api_key_secret(secret)):
+        return None
+    
+    verified_api_keys.set(prefix, merchant["id"])
+    return merchant
+
 async def verify_api_key(api_key: str) -> dict:
     """Verify API key and return merchant data"""
-    supabase = get_supabase()
-    result = supabase.table("merchants").select("*").eq("api_key", api_key).execute()
+    merchant = await authenticate_api_key(api_key)
     
-    if not result.data:
+    if not merchant:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid API key"
         )
     
-    merchant = result.data[0]
     if not merchant.get("is_active"):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -1,143 +1,88 @@
-from supabase import create_client, Client
+from supabase import acreate_client, AsyncClient, AsyncClientOptions
+from typing import Dict, List
 from app.core.config import settings
+from app.migrations import load_schema
+import asyncio
+import itertools
 import logging
 
 logger = logging.getLogger(__name__)
 
-def init_supabase() -> Client:
-    """Initialize Supabase client"""
+async def init_supabase() -> AsyncClient:
+    """Initialize async Supabase client"""
     try:
-        supabase: Client = create_client(settings.supabase_url, settings.supabase_key)
+        options = AsyncClientOptions(postgrest_client_timeout=settings.supabase_timeout_seconds)
+        supabase: AsyncClient = await acreate_client(settings.supabase_url, settings.supabase_key, options)
         logger.info("✅ Supabase client initialized successfully")
         return supabase
     except Exception as e:
         logger.error(f"❌ Failed to initialize Supabase client: {e}")
         raise e
 
-def get_supabase() -> Client:
-    """Get Supabase client instance"""
-    return init_supabase()
-
-# Database schema creation SQL (run this in Supabase SQL editor)
-DATABASE_SCHEMA = """
--- Enable necessary extensions
-CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
-
--- Merchants table
-CREATE TABLE IF NOT EXISTS merchants (
-    id UUID DEFAULT uuid_generate_v4() PRIMARY KEY,
-    email VARCHAR(255) UNIQUE NOT NULL,
-    company_name VARCHAR(255) NOT NULL,
-    api_key VARCHAR(255) UNIQUE NOT NULL,
-    webhook_url VARCHAR(500),
-    is_active BOOLEAN DEFAULT true,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-);
-
--- Merchant wallets table
-CREATE TABLE IF NOT EXISTS merchant_wallets (
-    id UUID DEFAULT uuid_generate_v4() PRIMARY KEY,
-    merchant_id UUID REFERENCES merchants(id) ON DELETE CASCADE,
-    chain VARCHAR(50) NOT NULL,
-    address VARCHAR(255) NOT NULL,
-    private_key_encrypted TEXT, -- Only if custodial mode
-    is_active BOOLEAN DEFAULT true,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-    UNIQUE(merchant_id, chain)
-);
-
--- Payment requests table
-CREATE TABLE IF NOT EXISTS payment_requests (
-    id UUID DEFAULT uuid_generate_v4() PRIMARY KEY,
-    merchant_id UUID REFERENCES merchants(id) ON DELETE CASCADE,
-    payment_id VARCHAR(255) UNIQUE NOT NULL,
-    chain VARCHAR(50) NOT NULL,
-    token VARCHAR(20) NOT NULL,
-    amount DECIMAL(36, 18) NOT NULL,
-    recipient_address VARCHAR(255) NOT NULL,
-    status VARCHAR(50) DEFAULT 'pending',
-    expires_at TIMESTAMP WITH TIME ZONE,
-    metadata JSONB,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-);
-
--- Transactions table
-CREATE TABLE IF NOT EXISTS transactions (
-    id UUID DEFAULT uuid_generate_v4() PRIMARY KEY,
-    payment_request_id UUID REFERENCES payment_requests(id) ON DELETE CASCADE,
-    tx_hash VARCHAR(255) UNIQUE NOT NULL,
-    chain VARCHAR(50) NOT NULL,
-    token VARCHAR(20) NOT NULL,
-    amount DECIMAL(36, 18) NOT NULL,
-    from_address VARCHAR(255) NOT NULL,
-    to_address VARCHAR(255) NOT NULL,
-    block_number BIGINT,
-    confirmation_count INTEGER DEFAULT 0,
-    status VARCHAR(50) DEFAULT 'pending',
-    gas_used BIGINT,
-    gas_price BIGINT,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-);
-
--- Payouts table
-CREATE TABLE IF NOT EXISTS payouts (
-    id UUID DEFAULT uuid_generate_v4() PRIMARY KEY,
-    merchant_id UUID REFERENCES merchants(id) ON DELETE CASCADE,
-    payout_id VARCHAR(255) UNIQUE NOT NULL,
-    chain VARCHAR(50) NOT NULL,
-    token VARCHAR(20) NOT NULL,
-    amount DECIMAL(36, 18) NOT NULL,
-    recipient_address VARCHAR(255) NOT NULL,
-    status VARCHAR(50) DEFAULT 'pending',
-    tx_hash VARCHAR(255),
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-);
-
--- Webhook logs table
-CREATE TABLE IF NOT EXISTS webhook_logs (
-    id UUID DEFAULT uuid_generate_v4() PRIMARY KEY,
-    merchant_id UUID REFERENCES merchants(id) ON DELETE CASCADE,
-    event_type VARCHAR(100) NOT NULL,
-    payload JSONB NOT NULL,
-    response_status INTEGER,
-    response_body TEXT,
-    retry_count INTEGER DEFAULT 0,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-);
-
--- Create indexes for better performance
-CREATE INDEX IF NOT EXISTS idx_merchants_api_key ON merchants(api_key);
-CREATE INDEX IF NOT EXISTS idx_merchant_wallets_merchant_id ON merchant_wallets(merchant_id);
-CREATE INDEX IF NOT EXISTS idx_payment_requests_merchant_id ON payment_requests(merchant_id);
-CREATE INDEX IF NOT EXISTS idx_payment_requests_payment_id ON payment_requests(payment_id);
-CREATE INDEX IF NOT EXISTS idx_transactions_tx_hash ON transactions(tx_hash);
-CREATE INDEX IF NOT EXISTS idx_transactions_payment_request_id ON transactions(payment_request_id);
-CREATE INDEX IF NOT EXISTS idx_payouts_merchant_id ON payouts(merchant_id);
-CREATE INDEX IF NOT EXISTS idx_webhook_logs_merchant_id ON webhook_logs(merchant_id);
-
--- Create updated_at trigger function
-CREATE OR REPLACE FUNCTION update_updated_at_column()
-RETURNS TRIGGER AS $$
-BEGIN
-    NEW.updated_at = NOW();
-    RETURN NEW;
-END;
-$$ language 'plpgsql';
-
--- Create triggers for updated_at
-CREATE TRIGGER update_merchants_updated_at BEFORE UPDATE ON merchants
-    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
-
-CREATE TRIGGER update_payment_requests_updated_at BEFORE UPDATE ON payment_requests
-    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
-
-CREATE TRIGGER update_transactions_updated_at BEFORE UPDATE ON transactions
-    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
-
-CREATE TRIGGER update_payouts_updated_at BEFORE UPDATE ON payouts
-    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
-"""
+class SupabasePool:
+    """Bounded pool of long-lived Supabase clients shared by the whole process.
+
+    Each client keeps its own keep-alive HTTP session, so handing out an
+    existing client reuses the already-open connection instead of paying
+    for a new TLS handshake on every request.
+    """
+    
+    def __init__(self, size: int):
+        self.size = max(1, size)
+        self._clients: List[AsyncClient] = []
+        self._cycle = None
+        self._lock = asyncio.Lock()
+        self.opened = 0
+        self.reused = 0
+    
+    async def open(self):
+        """Create the pooled clients (idempotent)"""
+        async with self._lock:
+            if self._clients:
+                return
+            for _ in range(self.size):
+                client = await init_supabase()
+                # Build the PostgREST sub-client (and its HTTP session) up front
+                client.postgrest
+                self._clients.append(client)
+                self.opened += 1
+            self._cycle = itertools.cycle(self._clients)
+            logger.info(f"✅ Supabase pool opened with {self.size} client(s)")
+    
+    def acquire(self) -> AsyncClient:
+        """Return a pooled client; the pool must have been opened"""
+        if not self._clients:
+            raise RuntimeError("Supabase pool is not open")
+        self.reused += 1
+        return next(self._cycle)
+    
+    async def close(self):
+        """Close every pooled HTTP session"""
+        async with self._lock:
+            for client in self._clients:
+                try:
+                    await client.postgrest.aclose()
+                except Exception as e:
+                    logger.warning(f"Failed to close Supabase client: {e}")
+            self._clients = []
+            self._cycle = None
+            logger.info("🛑 Supabase pool closed")
+    
+    def stats(self) -> Dict[str, int]:
+        """Per-process counters for clients opened versus reused"""
+        return {
+            "pool_size": self.size,
+            "open_clients": len(self._clients),
+            "opened": self.opened,
+            "reused": self.reused,
+        }
+
+# Process-wide client pool, opened and closed by the app lifespan
+supabase_pool = SupabasePool(settings.supabase_pool_size)
+
+def get_supabase() -> AsyncClient:
+    """Get a pooled Supabase client instance (usable as a FastAPI dependency)"""
+    return supabase_pool.acquire()
+
+# Full schema for the Supabase SQL editor; prefer `python -m app.migrations upgrade`
+DATABASE_SCHEMA = load_schema()
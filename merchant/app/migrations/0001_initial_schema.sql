@@ -0,0 +1,126 @@
+-- 0001: initial schema
+
+-- Enable necessary extensions
+CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+
+-- Merchants table
+CREATE TABLE IF NOT EXISTS merchants (
+    id UUID DEFAULT uuid_generate_v4() PRIMARY KEY,
+    email VARCHAR(255) UNIQUE NOT NULL,
+    company_name VARCHAR(255) NOT NULL,
+    api_key VARCHAR(255) UNIQUE NOT NULL,
+    webhook_url VARCHAR(500),
+    is_active BOOLEAN DEFAULT true,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Merchant wallets table
+CREATE TABLE IF NOT EXISTS merchant_wallets (
+    id UUID DEFAULT uuid_generate_v4() PRIMARY KEY,
+    merchant_id UUID REFERENCES merchants(id) ON DELETE CASCADE,
+    chain VARCHAR(50) NOT NULL,
+    address VARCHAR(255) NOT NULL,
+    private_key_encrypted TEXT, -- Only if custodial mode
+    is_active BOOLEAN DEFAULT true,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE(merchant_id, chain)
+);
+
+-- Payment requests table
+CREATE TABLE IF NOT EXISTS payment_requests (
+    id UUID DEFAULT uuid_generate_v4() PRIMARY KEY,
+    merchant_id UUID REFERENCES merchants(id) ON DELETE CASCADE,
+    payment_id VARCHAR(255) UNIQUE NOT NULL,
+    chain VARCHAR(50) NOT NULL,
+    token VARCHAR(20) NOT NULL,
+    amount DECIMAL(36, 18) NOT NULL,
+    recipient_address VARCHAR(255) NOT NULL,
+    status VARCHAR(50) DEFAULT 'pending',
+    expires_at TIMESTAMP WITH TIME ZONE,
+    metadata JSONB,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Transactions table
+CREATE TABLE IF NOT EXISTS transactions (
+    id UUID DEFAULT uuid_generate_v4() PRIMARY KEY,
+    payment_request_id UUID REFERENCES payment_requests(id) ON DELETE CASCADE,
+    tx_hash VARCHAR(255) UNIQUE NOT NULL,
+    chain VARCHAR(50) NOT NULL,
+    token VARCHAR(20) NOT NULL,
+    amount DECIMAL(36, 18) NOT NULL,
+    from_address VARCHAR(255) NOT NULL,
+    to_address VARCHAR(255) NOT NULL,
+    block_number BIGINT,
+    confirmation_count INTEGER DEFAULT 0,
+    status VARCHAR(50) DEFAULT 'pending',
+    gas_used BIGINT,
+    gas_price BIGINT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Payouts table
+CREATE TABLE IF NOT EXISTS payouts (
+    id UUID DEFAULT uuid_generate_v4() PRIMARY KEY,
+    merchant_id UUID REFERENCES merchants(id) ON DELETE CASCADE,
+    payout_id VARCHAR(255) UNIQUE NOT NULL,
+    chain VARCHAR(50) NOT NULL,
+    token VARCHAR(20) NOT NULL,
+    amount DECIMAL(36, 18) NOT NULL,
+    recipient_address VARCHAR(255) NOT NULL,
+    status VARCHAR(50) DEFAULT 'pending',
+    tx_hash VARCHAR(255),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Webhook logs table
+CREATE TABLE IF NOT EXISTS webhook_logs (
+    id UUID DEFAULT uuid_generate_v4() PRIMARY KEY,
+    merchant_id UUID REFERENCES merchants(id) ON DELETE CASCADE,
+    event_type VARCHAR(100) NOT NULL,
+    payload JSONB NOT NULL,
+    response_status INTEGER,
+    response_body TEXT,
+    retry_count INTEGER DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Create indexes for better performance
+CREATE INDEX IF NOT EXISTS idx_merchants_api_key ON merchants(api_key);
+CREATE INDEX IF NOT EXISTS idx_merchant_wallets_merchant_id ON merchant_wallets(merchant_id);
+CREATE INDEX IF NOT EXISTS idx_payment_requests_merchant_id ON payment_requests(merchant_id);
+CREATE INDEX IF NOT EXISTS idx_payment_requests_payment_id ON payment_requests(payment_id);
+CREATE INDEX IF NOT EXISTS idx_transactions_tx_hash ON transactions(tx_hash);
+CREATE INDEX IF NOT EXISTS idx_transactions_payment_request_id ON transactions(payment_request_id);
+CREATE INDEX IF NOT EXISTS idx_payouts_merchant_id ON payouts(merchant_id);
+CREATE INDEX IF NOT EXISTS idx_webhook_logs_merchant_id ON webhook_logs(merchant_id);
+
+-- Create updated_at trigger function
+CREATE OR REPLACE FUNCTION update_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+-- Create triggers for updated_at
+DROP TRIGGER IF EXISTS update_merchants_updated_at ON merchants;
+CREATE TRIGGER update_merchants_updated_at BEFORE UPDATE ON merchants
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+DROP TRIGGER IF EXISTS update_payment_requests_updated_at ON payment_requests;
+CREATE TRIGGER update_payment_requests_updated_at BEFORE UPDATE ON payment_requests
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+DROP TRIGGER IF EXISTS update_transactions_updated_at ON transactions;
+CREATE TRIGGER update_transactions_updated_at BEFORE UPDATE ON transactions
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+DROP TRIGGER IF EXISTS update_payouts_updated_at ON payouts;
+CREATE TRIGGER update_payouts_updated_at BEFORE UPDATE ON payouts
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
@@ -0,0 +1,38 @@
+-- 0002: composite and partial indexes matching the repository query shapes
+
+-- Lists are "WHERE merchant_id = ? [AND status = ?] ORDER BY created_at DESC LIMIT ?"
+CREATE INDEX IF NOT EXISTS idx_payment_requests_merchant_created
+    ON payment_requests(merchant_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_payment_requests_merchant_status_created
+    ON payment_requests(merchant_id, status, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_payouts_merchant_created
+    ON payouts(merchant_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_payouts_merchant_status_created
+    ON payouts(merchant_id, status, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_webhook_logs_merchant_created
+    ON webhook_logs(merchant_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_webhook_logs_merchant_event_created
+    ON webhook_logs(merchant_id, event_type, created_at DESC);
+
+-- Transactions of a payment request, newest first
+CREATE INDEX IF NOT EXISTS idx_transactions_payment_request_created
+    ON transactions(payment_request_id, created_at DESC);
+
+-- Pending rows are a small, hot subset: keep them in their own partial indexes
+CREATE INDEX IF NOT EXISTS idx_transactions_pending
+    ON transactions(payment_request_id) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_payment_requests_pending
+    ON payment_requests(merchant_id, expires_at) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_payouts_pending
+    ON payouts(merchant_id, created_at) WHERE status = 'pending';
+
+-- Superseded by the unique constraints or by the composites above
+DROP INDEX IF EXISTS idx_merchants_api_key;
+DROP INDEX IF EXISTS idx_payment_requests_payment_id;
+DROP INDEX IF EXISTS idx_transactions_tx_hash;
+DROP INDEX IF EXISTS idx_payment_requests_merchant_id;
+DROP INDEX IF EXISTS idx_transactions_payment_request_id;
+DROP INDEX IF EXISTS idx_payouts_merchant_id;
+DROP INDEX IF EXISTS idx_webhook_logs_merchant_id;
@@ -0,0 +1,30 @@
+-- 0003: extend the list indexes with id so keyset pages seek on (created_at, id)
+
+-- Lists are "WHERE merchant_id = ? [AND status = ?] AND (created_at, id) < (?, ?)
+-- ORDER BY created_at DESC, id DESC LIMIT ?"
+CREATE INDEX IF NOT EXISTS idx_payment_requests_merchant_created_id
+    ON payment_requests(merchant_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_payment_requests_merchant_status_created_id
+    ON payment_requests(merchant_id, status, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_payouts_merchant_created_id
+    ON payouts(merchant_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_payouts_merchant_status_created_id
+    ON payouts(merchant_id, status, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_webhook_logs_merchant_created_id
+    ON webhook_logs(merchant_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_webhook_logs_merchant_event_created_id
+    ON webhook_logs(merchant_id, event_type, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_transactions_payment_request_created_id
+    ON transactions(payment_request_id, created_at DESC, id DESC);
+
+-- Superseded by the indexes above
+DROP INDEX IF EXISTS idx_payment_requests_merchant_created;
+DROP INDEX IF EXISTS idx_payment_requests_merchant_status_created;
+DROP INDEX IF EXISTS idx_payouts_merchant_created;
+DROP INDEX IF EXISTS idx_payouts_merchant_status_created;
+DROP INDEX IF EXISTS idx_webhook_logs_merchant_created;
+DROP INDEX IF EXISTS idx_webhook_logs_merchant_event_created;
+DROP INDEX IF EXISTS idx_transactions_payment_request_created;
@@ -0,0 +1,32 @@
+-- 0004: store merchant_id on transactions so tenant scoping needs no join
+
+ALTER TABLE transactions ADD COLUMN IF NOT EXISTS merchant_id UUID REFERENCES merchants(id) ON DELETE CASCADE;
+
+UPDATE transactions t
+SET merchant_id = pr.merchant_id
+FROM payment_requests pr
+WHERE pr.id = t.payment_request_id AND t.merchant_id IS NULL;
+
+-- Writers that only know the payment request still get the column filled in
+CREATE OR REPLACE FUNCTION set_transaction_merchant_id()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.merchant_id IS NULL AND NEW.payment_request_id IS NOT NULL THEN
+        SELECT merchant_id INTO NEW.merchant_id FROM payment_requests WHERE id = NEW.payment_request_id;
+    END IF;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS set_transactions_merchant_id ON transactions;
+CREATE TRIGGER set_transactions_merchant_id BEFORE INSERT ON transactions
+    FOR EACH ROW EXECUTE FUNCTION set_transaction_merchant_id();
+
+-- Lists, pending checks and stats are "WHERE merchant_id = ? [AND status = ?] ..."
+CREATE INDEX IF NOT EXISTS idx_transactions_merchant_created_id
+    ON transactions(merchant_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_transactions_merchant_status_created_id
+    ON transactions(merchant_id, status, created_at DESC, id DESC);
+
+-- Pending lookups now go through merchant_id, covered by the status index above
+DROP INDEX IF EXISTS idx_transactions_pending;
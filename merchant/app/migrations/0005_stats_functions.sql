@@ -0,0 +1,49 @@
+-- 0005: grouped stats computed in the database instead of shipping every row to the API
+
+-- Each function returns {"status_breakdown", "chain_breakdown", "token_volumes"} for one
+-- merchant since p_since. Volumes are summed as exact numerics and returned as strings
+-- so they survive JSON decoding without going through a float.
+
+CREATE OR REPLACE FUNCTION transaction_stats(p_merchant_id UUID, p_since TIMESTAMP WITH TIME ZONE)
+RETURNS JSONB AS $$
+    WITH scoped AS (
+        SELECT status, chain, token, amount FROM transactions
+        WHERE merchant_id = p_merchant_id AND created_at >= p_since
+    )
+    SELECT jsonb_build_object(
+        'status_breakdown', COALESCE(
+            (SELECT jsonb_object_agg(status, total) FROM (SELECT COALESCE(status, 'null') AS status, count(*) AS total FROM scoped GROUP BY 1) s),
+            '{}'::jsonb
+        ),
+        'chain_breakdown', COALESCE(
+            (SELECT jsonb_object_agg(chain, total) FROM (SELECT chain, count(*) AS total FROM scoped GROUP BY chain) c),
+            '{}'::jsonb
+        ),
+        'token_volumes', COALESCE(
+            (SELECT jsonb_object_agg(token, volume::text) FROM (SELECT token, sum(amount) AS volume FROM scoped WHERE status = 'confirmed' GROUP BY token) v),
+            '{}'::jsonb
+        )
+    );
+$$ language 'sql' STABLE;
+
+CREATE OR REPLACE FUNCTION payout_stats(p_merchant_id UUID, p_since TIMESTAMP WITH TIME ZONE)
+RETURNS JSONB AS $$
+    WITH scoped AS (
+        SELECT status, chain, token, amount FROM payouts
+        WHERE merchant_id = p_merchant_id AND created_at >= p_since
+    )
+    SELECT jsonb_build_object(
+        'status_breakdown', COALESCE(
+            (SELECT jsonb_object_agg(status, total) FROM (SELECT COALESCE(status, 'null') AS status, count(*) AS total FROM scoped GROUP BY 1) s),
+            '{}'::jsonb
+        ),
+        'chain_breakdown', COALESCE(
+            (SELECT jsonb_object_agg(chain, total) FROM (SELECT chain, count(*) AS total FROM scoped GROUP BY chain) c),
+            '{}'::jsonb
+        ),
+        'token_volumes', COALESCE(
+            (SELECT jsonb_object_agg(token, volume::text) FROM (SELECT token, sum(amount) AS volume FROM scoped WHERE status = 'completed' GROUP BY token) v),
+            '{}'::jsonb
+        )
+    );
+$$ language 'sql' STABLE;
@@ -0,0 +1,148 @@
+-- 0006: per-merchant daily rollups of payment requests, transactions and payouts
+
+-- One row per (merchant, source table, UTC day, chain, token, status) with the row count
+-- and the exact amount sum. Triggers keep it current; rebuild_daily_rollups() recomputes
+-- a date range from the source tables.
+CREATE TABLE IF NOT EXISTS daily_rollups (
+    merchant_id UUID NOT NULL REFERENCES merchants(id) ON DELETE CASCADE,
+    source VARCHAR(32) NOT NULL,
+    day DATE NOT NULL,
+    chain VARCHAR(50) NOT NULL,
+    token VARCHAR(20) NOT NULL,
+    status VARCHAR(50) NOT NULL,
+    count BIGINT NOT NULL DEFAULT 0,
+    amount DECIMAL(54, 18) NOT NULL DEFAULT 0,
+    PRIMARY KEY (merchant_id, source, day, chain, token, status)
+);
+
+CREATE OR REPLACE FUNCTION apply_daily_rollup(
+    p_merchant_id UUID,
+    p_source TEXT,
+    p_created_at TIMESTAMP WITH TIME ZONE,
+    p_chain TEXT,
+    p_token TEXT,
+    p_status TEXT,
+    p_count BIGINT,
+    p_amount NUMERIC
+)
+RETURNS VOID AS $$
+BEGIN
+    IF p_merchant_id IS NULL THEN
+        RETURN;
+    END IF;
+    INSERT INTO daily_rollups (merchant_id, source, day, chain, token, status, count, amount)
+    VALUES (
+        p_merchant_id,
+        p_source,
+        (COALESCE(p_created_at, NOW()) AT TIME ZONE 'UTC')::date,
+        p_chain,
+        p_token,
+        COALESCE(p_status, 'null'),
+        p_count,
+        COALESCE(p_amount, 0)
+    )
+    ON CONFLICT (merchant_id, source, day, chain, token, status) DO UPDATE
+    SET count = daily_rollups.count + EXCLUDED.count,
+        amount = daily_rollups.amount + EXCLUDED.amount;
+END;
+$$ language 'plpgsql';
+
+-- Move a row out of its old bucket and into its new one
+CREATE OR REPLACE FUNCTION maintain_daily_rollups()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM apply_daily_rollup(OLD.merchant_id, TG_TABLE_NAME, OLD.created_at, OLD.chain, OLD.token, OLD.status, -1, -OLD.amount);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM apply_daily_rollup(NEW.merchant_id, TG_TABLE_NAME, NEW.created_at, NEW.chain, NEW.token, NEW.status, 1, NEW.amount);
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS maintain_payment_requests_rollups ON payment_requests;
+CREATE TRIGGER maintain_payment_requests_rollups
+    AFTER INSERT OR DELETE OR UPDATE OF merchant_id, chain, token, status, amount, created_at ON payment_requests
+    FOR EACH ROW EXECUTE FUNCTION maintain_daily_rollups();
+
+DROP TRIGGER IF EXISTS maintain_transactions_rollups ON transactions;
+CREATE TRIGGER maintain_transactions_rollups
+    AFTER INSERT OR DELETE OR UPDATE OF merchant_id, chain, token, status, amount, created_at ON transactions
+    FOR EACH ROW EXECUTE FUNCTION maintain_daily_rollups();
+
+DROP TRIGGER IF EXISTS maintain_payouts_rollups ON payouts;
+CREATE TRIGGER maintain_payouts_rollups
+    AFTER INSERT OR DELETE OR UPDATE OF merchant_id, chain, token, status, amount, created_at ON payouts
+    FOR EACH ROW EXECUTE FUNCTION maintain_daily_rollups();
+
+-- Recompute [p_from, p_to] (UTC days, NULL = unbounded) from the source tables.
+-- Writers are blocked for the duration so no change lands between the delete and the insert.
+CREATE OR REPLACE FUNCTION rebuild_daily_rollups(p_from DATE, p_to DATE)
+RETURNS BIGINT AS $$
+DECLARE
+    lower_bound TIMESTAMP WITH TIME ZONE := COALESCE(p_from::timestamp AT TIME ZONE 'UTC', '-infinity');
+    upper_bound TIMESTAMP WITH TIME ZONE := COALESCE((p_to + 1)::timestamp AT TIME ZONE 'UTC', 'infinity');
+    rebuilt BIGINT;
+BEGIN
+    LOCK TABLE payment_requests, transactions, payouts IN SHARE MODE;
+
+    DELETE FROM daily_rollups
+    WHERE (p_from IS NULL OR day >= p_from) AND (p_to IS NULL OR day <= p_to);
+
+    INSERT INTO daily_rollups (merchant_id, source, day, chain, token, status, count, amount)
+    SELECT merchant_id, source, day, chain, token, status, count(*), COALESCE(sum(amount), 0)
+    FROM (
+        SELECT merchant_id, 'payment_requests' AS source, (created_at AT TIME ZONE 'UTC')::date AS day,
+               chain, token, COALESCE(status, 'null') AS status, amount
+        FROM payment_requests WHERE created_at >= lower_bound AND created_at < upper_bound
+        UNION ALL
+        SELECT merchant_id, 'transactions', (created_at AT TIME ZONE 'UTC')::date,
+               chain, token, COALESCE(status, 'null'), amount
+        FROM transactions WHERE created_at >= lower_bound AND created_at < upper_bound
+        UNION ALL
+        SELECT merchant_id, 'payouts', (created_at AT TIME ZONE 'UTC')::date,
+               chain, token, COALESCE(status, 'null'), amount
+        FROM payouts WHERE created_at >= lower_bound AND created_at < upper_bound
+    ) source_rows
+    WHERE merchant_id IS NOT NULL
+    GROUP BY merchant_id, source, day, chain, token, status;
+
+    GET DIAGNOSTICS rebuilt = ROW_COUNT;
+    RETURN rebuilt;
+END;
+$$ language 'plpgsql';
+
+-- Counts and exact amounts per (period, chain, token, status), bucketed by day, week or month
+CREATE OR REPLACE FUNCTION rollup_series(p_merchant_id UUID, p_source TEXT, p_bucket TEXT, p_from DATE, p_to DATE)
+RETURNS JSONB AS $$
+    SELECT COALESCE(jsonb_agg(to_jsonb(buckets) ORDER BY buckets.period), '[]'::jsonb)
+    FROM (
+        SELECT date_trunc(p_bucket, day::timestamp)::date AS period, chain, token, status,
+               sum(count) AS count, sum(amount)::text AS amount
+        FROM daily_rollups
+        WHERE merchant_id = p_merchant_id AND source = p_source AND day >= p_from AND day <= p_to
+        GROUP BY 1, chain, token, status
+        HAVING sum(count) <> 0
+    ) buckets;
+$$ language 'sql' STABLE;
+
+-- All-time status counts per source table: {"payouts": {"completed": 3, ...}, ...}
+CREATE OR REPLACE FUNCTION rollup_totals(p_merchant_id UUID)
+RETURNS JSONB AS $$
+    SELECT COALESCE(jsonb_object_agg(source, statuses), '{}'::jsonb)
+    FROM (
+        SELECT source, jsonb_object_agg(status, total) AS statuses
+        FROM (
+            SELECT source, status, sum(count) AS total
+            FROM daily_rollups
+            WHERE merchant_id = p_merchant_id
+            GROUP BY source, status
+            HAVING sum(count) <> 0
+        ) counts
+        GROUP BY source
+    ) sources;
+$$ language 'sql' STABLE;
+
+-- Populate from existing rows (only the first time: a rebuild would drop the history of archived partitions)
+SELECT rebuild_daily_rollups(NULL, NULL) WHERE NOT EXISTS (SELECT 1 FROM daily_rollups);
@@ -0,0 +1,182 @@
+-- 0007: monthly range partitions on created_at for transactions and webhook_logs
+
+-- Creates <table>_YYYY_MM partitions from the month of p_from through p_months_ahead
+-- months past the current (UTC) month. Safe to call repeatedly and concurrently.
+-- Runs as the table owner so the API's database role can call it at startup.
+CREATE OR REPLACE FUNCTION ensure_monthly_partitions(p_table TEXT, p_from DATE, p_months_ahead INTEGER)
+RETURNS INTEGER AS $$
+DECLARE
+    month DATE := date_trunc('month', p_from)::date;
+    last_month DATE := (date_trunc('month', NOW() AT TIME ZONE 'UTC') + make_interval(months => p_months_ahead))::date;
+    partition_name TEXT;
+    created INTEGER := 0;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('ensure_monthly_partitions:' || p_table));
+    WHILE month <= last_month LOOP
+        partition_name := format('%s_%s', p_table, to_char(month, 'YYYY_MM'));
+        IF to_regclass(partition_name) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                partition_name,
+                p_table,
+                month::timestamp AT TIME ZONE 'UTC',
+                (month + INTERVAL '1 month')::timestamp AT TIME ZONE 'UTC'
+            );
+            created := created + 1;
+        END IF;
+        month := (month + INTERVAL '1 month')::date;
+    END LOOP;
+    RETURN created;
+END;
+$$ language 'plpgsql' SECURITY DEFINER SET search_path = public;
+
+-- Transactions ---------------------------------------------------------------
+
+-- A partitioned table cannot enforce UNIQUE(tx_hash) without created_at, so every
+-- hash is claimed in a small side table instead
+CREATE TABLE IF NOT EXISTS transaction_hashes (
+    tx_hash VARCHAR(255) PRIMARY KEY,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+-- Skipped once transactions is partitioned, so the file can be run again
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('transactions')) THEN
+        RETURN;
+    END IF;
+
+    ALTER TABLE transactions RENAME TO transactions_unpartitioned;
+    ALTER INDEX transactions_pkey RENAME TO transactions_unpartitioned_pkey;
+    ALTER INDEX transactions_tx_hash_key RENAME TO transactions_unpartitioned_tx_hash_key;
+    DROP INDEX IF EXISTS idx_transactions_payment_request_created_id;
+    DROP INDEX IF EXISTS idx_transactions_merchant_created_id;
+    DROP INDEX IF EXISTS idx_transactions_merchant_status_created_id;
+
+    -- The primary key has to include the partition key
+    CREATE TABLE transactions (
+        id UUID DEFAULT uuid_generate_v4(),
+        payment_request_id UUID REFERENCES payment_requests(id) ON DELETE CASCADE,
+        tx_hash VARCHAR(255) NOT NULL,
+        chain VARCHAR(50) NOT NULL,
+        token VARCHAR(20) NOT NULL,
+        amount DECIMAL(36, 18) NOT NULL,
+        from_address VARCHAR(255) NOT NULL,
+        to_address VARCHAR(255) NOT NULL,
+        block_number BIGINT,
+        confirmation_count INTEGER DEFAULT 0,
+        status VARCHAR(50) DEFAULT 'pending',
+        gas_used BIGINT,
+        gas_price BIGINT,
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+        merchant_id UUID REFERENCES merchants(id) ON DELETE CASCADE,
+        PRIMARY KEY (id, created_at)
+    ) PARTITION BY RANGE (created_at);
+
+    PERFORM ensure_monthly_partitions(
+        'transactions',
+        COALESCE((SELECT (min(created_at) AT TIME ZONE 'UTC')::date FROM transactions_unpartitioned), CURRENT_DATE),
+        3
+    );
+
+    INSERT INTO transactions (
+        id, payment_request_id, tx_hash, chain, token, amount, from_address, to_address, block_number,
+        confirmation_count, status, gas_used, gas_price, created_at, updated_at, merchant_id
+    )
+    SELECT
+        id, payment_request_id, tx_hash, chain, token, amount, from_address, to_address, block_number,
+        confirmation_count, status, gas_used, gas_price, COALESCE(created_at, NOW()), updated_at, merchant_id
+    FROM transactions_unpartitioned;
+
+    INSERT INTO transaction_hashes (tx_hash, created_at)
+    SELECT tx_hash, created_at FROM transactions;
+
+    DROP TABLE transactions_unpartitioned;
+END;
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_transactions_tx_hash
+    ON transactions(tx_hash);
+CREATE INDEX IF NOT EXISTS idx_transactions_payment_request_created_id
+    ON transactions(payment_request_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_transactions_merchant_created_id
+    ON transactions(merchant_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_transactions_merchant_status_created_id
+    ON transactions(merchant_id, status, created_at DESC, id DESC);
+
+CREATE OR REPLACE FUNCTION claim_transaction_hash()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM transaction_hashes WHERE tx_hash = OLD.tx_hash;
+    END IF;
+    IF TG_OP = 'DELETE' THEN
+        RETURN OLD;
+    END IF;
+    INSERT INTO transaction_hashes (tx_hash, created_at) VALUES (NEW.tx_hash, NEW.created_at);
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+-- Triggers are created after the copy so it is not counted twice in daily_rollups
+DROP TRIGGER IF EXISTS claim_transactions_tx_hash ON transactions;
+CREATE TRIGGER claim_transactions_tx_hash BEFORE INSERT OR DELETE OR UPDATE OF tx_hash ON transactions
+    FOR EACH ROW EXECUTE FUNCTION claim_transaction_hash();
+
+DROP TRIGGER IF EXISTS update_transactions_updated_at ON transactions;
+CREATE TRIGGER update_transactions_updated_at BEFORE UPDATE ON transactions
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+DROP TRIGGER IF EXISTS set_transactions_merchant_id ON transactions;
+CREATE TRIGGER set_transactions_merchant_id BEFORE INSERT ON transactions
+    FOR EACH ROW EXECUTE FUNCTION set_transaction_merchant_id();
+
+DROP TRIGGER IF EXISTS maintain_transactions_rollups ON transactions;
+CREATE TRIGGER maintain_transactions_rollups
+    AFTER INSERT OR DELETE OR UPDATE OF merchant_id, chain, token, status, amount, created_at ON transactions
+    FOR EACH ROW EXECUTE FUNCTION maintain_daily_rollups();
+
+-- Webhook logs ---------------------------------------------------------------
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('webhook_logs')) THEN
+        RETURN;
+    END IF;
+
+    ALTER TABLE webhook_logs RENAME TO webhook_logs_unpartitioned;
+    ALTER INDEX webhook_logs_pkey RENAME TO webhook_logs_unpartitioned_pkey;
+    DROP INDEX IF EXISTS idx_webhook_logs_merchant_created_id;
+    DROP INDEX IF EXISTS idx_webhook_logs_merchant_event_created_id;
+
+    CREATE TABLE webhook_logs (
+        id UUID DEFAULT uuid_generate_v4(),
+        merchant_id UUID REFERENCES merchants(id) ON DELETE CASCADE,
+        event_type VARCHAR(100) NOT NULL,
+        payload JSONB NOT NULL,
+        response_status INTEGER,
+        response_body TEXT,
+        retry_count INTEGER DEFAULT 0,
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+        PRIMARY KEY (id, created_at)
+    ) PARTITION BY RANGE (created_at);
+
+    PERFORM ensure_monthly_partitions(
+        'webhook_logs',
+        COALESCE((SELECT (min(created_at) AT TIME ZONE 'UTC')::date FROM webhook_logs_unpartitioned), CURRENT_DATE),
+        3
+    );
+
+    INSERT INTO webhook_logs (id, merchant_id, event_type, payload, response_status, response_body, retry_count, created_at)
+    SELECT id, merchant_id, event_type, payload, response_status, response_body, retry_count, COALESCE(created_at, NOW())
+    FROM webhook_logs_unpartitioned;
+
+    DROP TABLE webhook_logs_unpartitioned;
+END;
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_webhook_logs_merchant_created_id
+    ON webhook_logs(merchant_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_webhook_logs_merchant_event_created_id
+    ON webhook_logs(merchant_id, event_type, created_at DESC, id DESC);
@@ -0,0 +1,10 @@
+-- 0008: API keys stored as a keyed hash, looked up by a short public prefix
+
+ALTER TABLE merchants ADD COLUMN IF NOT EXISTS api_key_prefix VARCHAR(32);
+ALTER TABLE merchants ADD COLUMN IF NOT EXISTS api_key_hash VARCHAR(64);
+
+-- Plaintext keys are kept until `python -m app.migrations hash-api-keys` moves them
+ALTER TABLE merchants ALTER COLUMN api_key DROP NOT NULL;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_merchants_api_key_prefix
+    ON merchants(api_key_prefix);
@@ -0,0 +1,35 @@
+-- 0009: token versions so access tokens can be revoked without a lookup per request
+
+-- Bumped on deactivation/activation and API key rotation, revoking every token issued before
+ALTER TABLE merchants ADD COLUMN IF NOT EXISTS token_version INTEGER NOT NULL DEFAULT 1;
+
+CREATE OR REPLACE FUNCTION bump_merchant_token_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF (NEW.is_active, NEW.api_key_hash) IS DISTINCT FROM (OLD.is_active, OLD.api_key_hash) THEN
+        NEW.token_version := OLD.token_version + 1;
+    END IF;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS bump_merchants_token_version ON merchants;
+CREATE TRIGGER bump_merchants_token_version BEFORE UPDATE ON merchants
+    FOR EACH ROW EXECUTE FUNCTION bump_merchant_token_version();
+
+CREATE INDEX IF NOT EXISTS idx_merchants_revoked_updated_at
+    ON merchants(updated_at) WHERE token_version > 1;
+
+-- {"now": <database time>, "versions": {merchant_id: token_version}} for every merchant
+-- whose version has moved past 1 and that changed at or after p_since (NULL = all)
+CREATE OR REPLACE FUNCTION merchant_token_versions(p_since TIMESTAMP WITH TIME ZONE)
+RETURNS JSONB AS $$
+    SELECT jsonb_build_object(
+        'now', NOW(),
+        'versions', COALESCE(
+            (SELECT jsonb_object_agg(id, token_version) FROM merchants
+             WHERE token_version > 1 AND (p_since IS NULL OR updated_at >= p_since)),
+            '{}'::jsonb
+        )
+    );
+$$ language 'sql' STABLE;
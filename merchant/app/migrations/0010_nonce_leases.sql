@@ -0,0 +1,28 @@
+-- 0010: per-wallet leases so only one worker at a time hands out a wallet's nonces (NONCE_LEASE_BACKEND=postgres)
+
+CREATE TABLE IF NOT EXISTS nonce_leases (
+    key VARCHAR(128) PRIMARY KEY,  -- <chain>:<wallet address>
+    owner VARCHAR(255) NOT NULL,
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+-- Takes the lease on p_key for p_ttl_ms milliseconds, or renews it if p_owner already holds it.
+-- Returns 1 if it was free (or expired), 0 if renewed, -1 if another owner holds it
+CREATE OR REPLACE FUNCTION acquire_nonce_lease(p_key VARCHAR, p_owner VARCHAR, p_ttl_ms INTEGER)
+RETURNS INTEGER AS $$
+DECLARE
+    held_by VARCHAR;
+BEGIN
+    SELECT owner INTO held_by FROM nonce_leases WHERE key = p_key AND expires_at > NOW();
+
+    INSERT INTO nonce_leases AS lease (key, owner, expires_at)
+    VALUES (p_key, p_owner, NOW() + p_ttl_ms * INTERVAL '1 millisecond')
+    ON CONFLICT (key) DO UPDATE SET owner = EXCLUDED.owner, expires_at = EXCLUDED.expires_at
+        WHERE lease.owner = EXCLUDED.owner OR lease.expires_at <= NOW();
+
+    IF NOT FOUND THEN
+        RETURN -1;
+    END IF;
+    RETURN CASE WHEN held_by = p_owner THEN 0 ELSE 1 END;
+END;
+$$ language 'plpgsql';
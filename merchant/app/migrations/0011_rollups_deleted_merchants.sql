@@ -0,0 +1,39 @@
+-- 0011: deleting a merchant no longer trips the daily_rollups foreign key
+
+-- Deleting a merchant cascades to its payment requests, transactions and payouts,
+-- whose rollup triggers then subtract from buckets of a merchant that is already
+-- gone. Those rollup rows are removed by their own cascade, so the update is skipped
+CREATE OR REPLACE FUNCTION apply_daily_rollup(
+    p_merchant_id UUID,
+    p_source TEXT,
+    p_created_at TIMESTAMP WITH TIME ZONE,
+    p_chain TEXT,
+    p_token TEXT,
+    p_status TEXT,
+    p_count BIGINT,
+    p_amount NUMERIC
+)
+RETURNS VOID AS $$
+BEGIN
+    IF p_merchant_id IS NULL THEN
+        RETURN;
+    END IF;
+    IF p_count < 0 AND NOT EXISTS (SELECT 1 FROM merchants WHERE id = p_merchant_id) THEN
+        RETURN;
+    END IF;
+    INSERT INTO daily_rollups (merchant_id, source, day, chain, token, status, count, amount)
+    VALUES (
+        p_merchant_id,
+        p_source,
+        (COALESCE(p_created_at, NOW()) AT TIME ZONE 'UTC')::date,
+        p_chain,
+        p_token,
+        COALESCE(p_status, 'null'),
+        p_count,
+        COALESCE(p_amount, 0)
+    )
+    ON CONFLICT (merchant_id, source, day, chain, token, status) DO UPDATE
+    SET count = daily_rollups.count + EXCLUDED.count,
+        amount = daily_rollups.amount + EXCLUDED.amount;
+END;
+$$ language 'plpgsql';
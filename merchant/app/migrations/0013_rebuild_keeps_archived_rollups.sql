@@ -0,0 +1,51 @@
+-- 0013: keep the rollups of archived transactions months when rebuilding
+
+-- Retention drops whole transactions partitions, which fires no row triggers, so their
+-- rollups are all that is left of those months. The transactions part of a rebuild now
+-- starts at the earliest partition still attached; older rollup rows are left as they are
+CREATE OR REPLACE FUNCTION rebuild_daily_rollups(p_from DATE, p_to DATE)
+RETURNS BIGINT AS $$
+DECLARE
+    lower_bound TIMESTAMP WITH TIME ZONE := COALESCE(p_from::timestamp AT TIME ZONE 'UTC', '-infinity');
+    upper_bound TIMESTAMP WITH TIME ZONE := COALESCE((p_to + 1)::timestamp AT TIME ZONE 'UTC', 'infinity');
+    transactions_from DATE;
+    transactions_bound TIMESTAMP WITH TIME ZONE;
+    rebuilt BIGINT;
+BEGIN
+    LOCK TABLE payment_requests, transactions, payouts IN SHARE MODE;
+
+    -- First month still held by a transactions_YYYY_MM partition ('infinity' when there is none)
+    SELECT COALESCE(min(to_date(substring(partition.relname FROM '([0-9]{4}_[0-9]{2})$'), 'YYYY_MM')), 'infinity')
+    INTO transactions_from
+    FROM pg_inherits
+    JOIN pg_class partition ON partition.oid = pg_inherits.inhrelid
+    WHERE pg_inherits.inhparent = 'transactions'::regclass
+      AND partition.relname ~ '^transactions_[0-9]{4}_[0-9]{2}$';
+    transactions_bound := GREATEST(lower_bound, transactions_from::timestamp AT TIME ZONE 'UTC');
+
+    DELETE FROM daily_rollups
+    WHERE (p_from IS NULL OR day >= p_from) AND (p_to IS NULL OR day <= p_to)
+      AND (source <> 'transactions' OR day >= transactions_from);
+
+    INSERT INTO daily_rollups (merchant_id, source, day, chain, token, status, count, amount)
+    SELECT merchant_id, source, day, chain, token, status, count(*), COALESCE(sum(amount), 0)
+    FROM (
+        SELECT merchant_id, 'payment_requests' AS source, (created_at AT TIME ZONE 'UTC')::date AS day,
+               chain, token, COALESCE(status, 'null') AS status, amount
+        FROM payment_requests WHERE created_at >= lower_bound AND created_at < upper_bound
+        UNION ALL
+        SELECT merchant_id, 'transactions', (created_at AT TIME ZONE 'UTC')::date,
+               chain, token, COALESCE(status, 'null'), amount
+        FROM transactions WHERE created_at >= transactions_bound AND created_at < upper_bound
+        UNION ALL
+        SELECT merchant_id, 'payouts', (created_at AT TIME ZONE 'UTC')::date,
+               chain, token, COALESCE(status, 'null'), amount
+        FROM payouts WHERE created_at >= lower_bound AND created_at < upper_bound
+    ) source_rows
+    WHERE merchant_id IS NOT NULL
+    GROUP BY merchant_id, source, day, chain, token, status;
+
+    GET DIAGNOSTICS rebuilt = ROW_COUNT;
+    RETURN rebuilt;
+END;
+$$ language 'plpgsql';
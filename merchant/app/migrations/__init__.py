@@ -0,0 +1,32 @@
+# Versioned schema migrations
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+import re
+
+MIGRATIONS_DIR = Path(__file__).parent
+
+MIGRATION_FILE = re.compile(r"^(\d{4})_(\w+)\.sql$")
+
+@dataclass
+class Migration:
+    version: str
+    name: str
+    path: Path
+    
+    @property
+    def sql(self) -> str:
+        return self.path.read_text()
+
+def discover() -> List[Migration]:
+    """Return all migration files in version order"""
+    migrations = []
+    for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        match = MIGRATION_FILE.match(path.name)
+        if match:
+            migrations.append(Migration(version=match.group(1), name=match.group(2), path=path))
+    return migrations
+
+def load_schema() -> str:
+    """Concatenate every migration into one script (e.g. for the Supabase SQL editor)"""
+    return "\n".join(migration.sql for migration in discover())
@@ -0,0 +1,83 @@
+"""
+Schema migration CLI.
+
+    python -m app.migrations upgrade [--to VERSION]
+    python -m app.migrations status
+    python -m app.migrations check     # EXPLAIN repository reads, fail on sequential scans
+    python -m app.migrations rebuild-rollups [--from YYYY-MM-DD] [--to YYYY-MM-DD]
+    python -m app.migrations retention [--dry-run]   # archive and drop expired monthly partitions
+    python -m app.migrations hash-api-keys           # move plaintext API keys to api_key_hash (after 0008)
+"""
+
+from datetime import date
+import argparse
+import asyncio
+import sys
+
+from app.core.config import settings
+from app.migrations import runner
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.migrations", description="Manage the database schema")
+    parser.add_argument("--database-url", default=settings.database_url, help="defaults to DATABASE_URL")
+    commands = parser.add_subparsers(dest="command", required=True)
+    upgrade_parser = commands.add_parser("upgrade", help="apply pending migrations")
+    upgrade_parser.add_argument("--to", dest="target", help="stop after this version")
+    commands.add_parser("status", help="list applied and pending migrations")
+    commands.add_parser("check", help="fail if a repository query falls back to a sequential scan")
+    rebuild_parser = commands.add_parser("rebuild-rollups", help="recompute daily rollups from the source tables")
+    rebuild_parser.add_argument("--from", dest="start", type=date.fromisoformat, help="first UTC day (default: all)")
+    rebuild_parser.add_argument("--to", dest="end", type=date.fromisoformat, help="last UTC day (default: all)")
+    retention_parser = commands.add_parser("retention", help="create future partitions, archive and drop expired ones")
+    retention_parser.add_argument("--archive-dir", default=settings.archive_dir, help="defaults to ARCHIVE_DIR")
+    retention_parser.add_argument("--dry-run", action="store_true", help="only list the partitions that would be archived")
+    commands.add_parser("hash-api-keys", help="replace plaintext API keys with their prefix and keyed hash")
+    args = parser.parse_args()
+    
+    if not args.database_url:
+        parser.error("DATABASE_URL is not set")
+    
+    if args.command == "upgrade":
+        applied = asyncio.run(runner.upgrade(args.database_url, args.target))
+        for migration in applied:
+            print(f"✅ {migration.version}_{migration.name}")
+        if not applied:
+            print("Schema is up to date")
+        return 0
+    
+    if args.command == "status":
+        for migration in asyncio.run(runner.status(args.database_url)):
+            mark = "applied" if migration["applied"] else "pending"
+            print(f"{migration['version']}_{migration['name']}: {mark}")
+        return 0
+    
+    if args.command == "rebuild-rollups":
+        rebuilt = asyncio.run(runner.rebuild_rollups(args.database_url, args.start, args.end))
+        print(f"✅ Rebuilt {rebuilt} rollup rows")
+        return 0
+    
+    if args.command == "retention":
+        from app.migrations.partitions import apply_retention
+        archived = asyncio.run(apply_retention(args.database_url, args.archive_dir, args.dry_run))
+        for line in archived:
+            print(f"✅ {line}")
+        if not archived:
+            print("No expired partitions")
+        return 0
+    
+    if args.command == "hash-api-keys":
+        hashed = asyncio.run(runner.hash_api_keys(args.database_url))
+        print(f"✅ Hashed {hashed} API keys")
+        return 0
+    
+    from app.migrations.explain import check
+    failures = asyncio.run(check(args.database_url))
+    for name, sql, tables in failures:
+        print(f"❌ {name}: sequential scan on {', '.join(tables)}\n   {sql}")
+    if failures:
+        return 1
+    print("✅ Every repository query is served by an index")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+EXPLAIN every repository read against a local Postgres and report the ones
+that fall back to a sequential scan.
+
+Sequential scans are disabled for the session, so a "Seq Scan" node in the
+plan means no index can serve the query at all, regardless of table size.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+import json
+import uuid
+
+from app.core.pagination import Cursor
+from app.repositories import base, merchant_wallets, merchants, payment_requests, payouts, transactions, webhook_logs
+from app.repositories.postgres import PostgresBackend
+
+SAMPLE_ID = str(uuid.uuid4())
+SAMPLE_SINCE = datetime.utcnow() - timedelta(days=30)
+SAMPLE_CURSOR = Cursor(created_at=SAMPLE_SINCE.isoformat(), id=SAMPLE_ID)
+
+# Every repository read, called with representative arguments
+REPOSITORY_QUERIES: List[Tuple[str, Callable[[], Awaitable[Any]]]] = [
+    ("merchants.get_by_id", lambda: merchants.get_by_id(SAMPLE_ID)),
+    ("merchants.get_by_email", lambda: merchants.get_by_email("merchant@example.com")),
+    ("merchants.get_by_api_key_prefix", lambda: merchants.get_by_api_key_prefix("0123456789abcdef")),
+    ("merchants.get_by_api_key", lambda: merchants.get_by_api_key("key")),
+    ("merchant_wallets.get", lambda: merchant_wallets.get(SAMPLE_ID, SAMPLE_ID)),
+    ("merchant_wallets.get_for_chain", lambda: merchant_wallets.get_for_chain(SAMPLE_ID, "ethereum", active_only=True)),
+    ("merchant_wallets.list_for_merchant", lambda: merchant_wallets.list_for_merchant(SAMPLE_ID)),
+    ("payment_requests.get", lambda: payment_requests.get("pay_0", SAMPLE_ID)),
+    ("payment_requests.list_for_merchant", lambda: payment_requests.list_for_merchant(SAMPLE_ID)),
+    ("payment_requests.list_for_merchant(cursor)", lambda: payment_requests.list_for_merchant(SAMPLE_ID, cursor=SAMPLE_CURSOR)),
+    ("payment_requests.list_for_merchant(status)", lambda: payment_requests.list_for_merchant(SAMPLE_ID, status="pending")),
+    ("transactions.get_by_hash", lambda: transactions.get_by_hash("0x0", SAMPLE_ID)),
+    ("transactions.list_for_merchant", lambda: transactions.list_for_merchant(SAMPLE_ID)),
+    ("transactions.list_for_merchant(cursor)", lambda: transactions.list_for_merchant(SAMPLE_ID, cursor=SAMPLE_CURSOR)),
+    ("transactions.list_for_payment_request", lambda: transactions.list_for_payment_request(SAMPLE_ID)),
+    ("transactions.list_pending", lambda: transactions.list_pending(SAMPLE_ID)),
+    ("payouts.get", lambda: payouts.get("payout_0", SAMPLE_ID)),
+    ("payouts.list_for_merchant", lambda: payouts.list_for_merchant(SAMPLE_ID)),
+    ("payouts.list_for_merchant(cursor)", lambda: payouts.list_for_merchant(SAMPLE_ID, cursor=SAMPLE_CURSOR)),
+    ("payouts.list_for_merchant(status)", lambda: payouts.list_for_merchant(SAMPLE_ID, status="pending")),
+    ("webhook_logs.get", lambda: webhook_logs.get(SAMPLE_ID, SAMPLE_ID)),
+    ("webhook_logs.list_for_merchant", lambda: webhook_logs.list_for_merchant(SAMPLE_ID)),
+    ("webhook_logs.list_for_merchant(cursor)", lambda: webhook_logs.list_for_merchant(SAMPLE_ID, cursor=SAMPLE_CURSOR)),
+    ("webhook_logs.list_for_merchant(event_type)", lambda: webhook_logs.list_for_merchant(SAMPLE_ID, event_type="test")),
+]
+
+class ExplainBackend(PostgresBackend):
+    """Postgres backend that returns nothing and records the plan of every query instead"""
+    
+    def __init__(self, dsn: str):
+        super().__init__(dsn)
+        self.plans: List[Tuple[str, Dict[str, Any]]] = []
+    
+    async def _fetch(self, sql: str, args: List[Any]) -> List[Dict[str, Any]]:
+        async with self.pool.acquire() as conn:
+            await conn.execute("SET enable_seqscan = off")
+            result = await conn.fetchval(f"EXPLAIN (FORMAT JSON) {sql}", *args)
+            await conn.execute("RESET enable_seqscan")
+        plan = json.loads(result) if isinstance(result, str) else result
+        self.plans.append((sql, plan[0]["Plan"]))
+        return []
+
+def sequential_scans(plan: Dict[str, Any]) -> List[str]:
+    """Relations read with a Seq Scan anywhere in the plan tree"""
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan.get("Relation Name", "?"))
+    for child in plan.get("Plans", []):
+        found += sequential_scans(child)
+    return found
+
+async def check(dsn: str) -> List[Tuple[str, str, List[str]]]:
+    """Return (query name, sql, seq-scanned tables) for every failing repository read"""
+    backend = ExplainBackend(dsn)
+    await backend.open()
+    previous, base.backend = base.backend, backend
+    failures = []
+    try:
+        for name, call in REPOSITORY_QUERIES:
+            backend.plans = []
+            await call()
+            for sql, plan in backend.plans:
+                tables = sequential_scans(plan)
+                if tables:
+                    failures.append((name, sql, tables))
+    finally:
+        base.backend = previous
+        await backend.close()
+    return failures
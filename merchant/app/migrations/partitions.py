@@ -0,0 +1,178 @@
+"""
+Monthly partition maintenance for transactions and webhook_logs.
+
+Future partitions are created by ensure_monthly_partitions() (see migration 0007)
+at startup, every PARTITION_CHECK_SECONDS while the API runs, and on every
+retention run. Expired partitions are detached, exported to gzipped CSV under
+ARCHIVE_DIR and dropped.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import asyncio
+import gzip
+import logging
+import os
+import re
+
+import asyncpg
+
+from app.core.config import settings
+from app.repositories.base import get_backend
+
+logger = logging.getLogger(__name__)
+
+def retention_months() -> Dict[str, int]:
+    """Months of data kept per partitioned table (0 keeps everything)"""
+    return {
+        "transactions": settings.transaction_retention_months,
+        "webhook_logs": settings.webhook_log_retention_months,
+    }
+
+@dataclass
+class Partition:
+    table: str
+    name: str
+    month: date
+    attached: bool
+
+async def ensure_future_partitions() -> int:
+    """Create next months' partitions through the active storage backend"""
+    total = 0
+    for table in retention_months():
+        created = await get_backend().rpc("ensure_monthly_partitions", {
+            "p_table": table,
+            "p_from": datetime.utcnow().date(),
+            "p_months_ahead": settings.partition_months_ahead
+        })
+        if created:
+            logger.info(f"✅ Created {created} {table} partitions")
+            total += created
+    return total
+
+class PartitionMaintainer:
+    """Keeps PARTITION_MONTHS_AHEAD months of partitions ahead of a long-running process.
+    
+    Inserts into a month without a partition fail, so this cannot be left to
+    startup alone.
+    """
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.created = 0
+        self.errors = 0
+    
+    async def start(self):
+        """Create the partitions now and keep checking in the background (called from the app lifespan)"""
+        if self.task is not None:
+            return
+        await self.run()
+        self.task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop the background checks (called from the app lifespan)"""
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+    
+    async def run(self):
+        try:
+            self.created += await ensure_future_partitions()
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"❌ Could not create future partitions: {e}")
+        self.runs += 1
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.run()
+    
+    def stats(self) -> Dict[str, Any]:
+        return {"running": self.task is not None, "runs": self.runs, "created": self.created, "errors": self.errors}
+
+maintainer = PartitionMaintainer(settings.partition_check_seconds)
+
+def month_offset(month: date, months: int) -> date:
+    """First day of the month `months` before/after `month`"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+async def list_partitions(conn: asyncpg.Connection, table: str) -> List[Partition]:
+    """Monthly partitions of a table, including ones detached by an interrupted run"""
+    pattern = re.compile(rf"^{table}_(\d{{4}})_(\d{{2}})$")
+    rows = await conn.fetch(
+        "SELECT relname, relispartition FROM pg_class "
+        "WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace AND starts_with(relname, $1)",
+        f"{table}_"
+    )
+    partitions = []
+    for row in rows:
+        match = pattern.match(row["relname"])
+        if match:
+            month = date(int(match.group(1)), int(match.group(2)), 1)
+            partitions.append(Partition(table, row["relname"], month, row["relispartition"]))
+    return sorted(partitions, key=lambda partition: partition.month)
+
+def expired(partitions: List[Partition], months: int, today: date) -> List[Partition]:
+    """Partitions whose whole month is older than the retention window"""
+    if months <= 0:
+        return []
+    cutoff = month_offset(today.replace(day=1), -months)
+    return [partition for partition in partitions if partition.month < cutoff]
+
+async def archive(conn: asyncpg.Connection, partition: Partition, archive_dir: Path) -> Path:
+    """Detach a partition, export it to <archive_dir>/<name>.csv.gz and drop it"""
+    if partition.attached:
+        await conn.execute(f'ALTER TABLE "{partition.table}" DETACH PARTITION "{partition.name}"')
+    
+    # Write to a temporary name so a half-written export is never mistaken for a finished one
+    path = archive_dir / f"{partition.name}.csv.gz"
+    partial = archive_dir / f"{partition.name}.csv.gz.partial"
+    with gzip.open(partial, "wb") as output:
+        await conn.copy_from_table(partition.name, output=output, format="csv", header=True)
+    os.replace(partial, path)
+    
+    async with conn.transaction():
+        await conn.execute(f'DROP TABLE "{partition.name}"')
+        if partition.table == "transactions":
+            # Release the tx_hash claims of the dropped rows
+            await conn.execute(
+                "DELETE FROM transaction_hashes WHERE created_at >= $1 AND created_at < $2",
+                datetime.combine(partition.month, datetime.min.time(), timezone.utc),
+                datetime.combine(month_offset(partition.month, 1), datetime.min.time(), timezone.utc)
+            )
+    return path
+
+async def apply_retention(dsn: str, archive_dir: str, dry_run: bool = False) -> List[str]:
+    """Create future partitions, then archive and drop every expired one (with `dry_run`, only list them)"""
+    directory = Path(archive_dir)
+    if not dry_run:
+        directory.mkdir(parents=True, exist_ok=True)
+    today = datetime.utcnow().date()
+    done = []
+    
+    conn = await asyncpg.connect(dsn)
+    try:
+        for table, months in retention_months().items():
+            if not dry_run:
+                await conn.execute("SELECT ensure_monthly_partitions($1, $2, $3)", table, today, settings.partition_months_ahead)
+            for partition in expired(await list_partitions(conn, table), months, today):
+                if dry_run:
+                    done.append(f"{partition.name} (dry run)")
+                    continue
+                path = await archive(conn, partition, directory)
+                logger.info(f"✅ Archived {partition.name} to {path}")
+                done.append(f"{partition.name} -> {path}")
+    finally:
+        await conn.close()
+    return done
@@ -0,0 +1,91 @@
+from datetime import date
+from typing import List, Optional
+import logging
+
+import asyncpg
+
+from app.migrations import Migration, discover
+
+logger = logging.getLogger(__name__)
+
+# Serializes concurrent runners (e.g. several workers starting at once)
+ADVISORY_LOCK_ID = 7_240_512
+
+CREATE_MIGRATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version VARCHAR(16) PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    applied_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+)
+"""
+
+async def applied_versions(conn: asyncpg.Connection) -> List[str]:
+    """Versions already recorded in schema_migrations"""
+    await conn.execute(CREATE_MIGRATIONS_TABLE)
+    rows = await conn.fetch("SELECT version FROM schema_migrations ORDER BY version")
+    return [row["version"] for row in rows]
+
+async def pending(conn: asyncpg.Connection) -> List[Migration]:
+    """Migrations that have not been applied yet"""
+    applied = set(await applied_versions(conn))
+    return [migration for migration in discover() if migration.version not in applied]
+
+async def upgrade(dsn: str, target: Optional[str] = None) -> List[Migration]:
+    """Apply pending migrations in order, each in its own transaction"""
+    conn = await asyncpg.connect(dsn)
+    applied = []
+    try:
+        await conn.execute("SELECT pg_advisory_lock($1)", ADVISORY_LOCK_ID)
+        for migration in await pending(conn):
+            if target and migration.version > target:
+                break
+            async with conn.transaction():
+                await conn.execute(migration.sql)
+                await conn.execute(
+                    "INSERT INTO schema_migrations (version, name) VALUES ($1, $2)",
+                    migration.version, migration.name
+                )
+            logger.info(f"✅ Applied migration {migration.version}_{migration.name}")
+            applied.append(migration)
+    finally:
+        await conn.execute("SELECT pg_advisory_unlock($1)", ADVISORY_LOCK_ID)
+        await conn.close()
+    return applied
+
+async def status(dsn: str) -> List[dict]:
+    """Applied/pending state of every migration"""
+    conn = await asyncpg.connect(dsn)
+    try:
+        applied = set(await applied_versions(conn))
+    finally:
+        await conn.close()
+    return [
+        {"version": migration.version, "name": migration.name, "applied": migration.version in applied}
+        for migration in discover()
+    ]
+
+async def rebuild_rollups(dsn: str, start: Optional[date] = None, end: Optional[date] = None) -> int:
+    """Recompute daily_rollups for [start, end] (UTC days, None = unbounded) from the source tables"""
+    conn = await asyncpg.connect(dsn)
+    try:
+        return await conn.fetchval("SELECT rebuild_daily_rollups($1, $2)", start, end)
+    finally:
+        await conn.close()
+
+async def hash_api_keys(dsn: str) -> int:
+    """Replace remaining plaintext merchants.api_key values with api_key_prefix/api_key_hash"""
+    from app.core.security import api_key_columns
+    
+    conn = await asyncpg.connect(dsn)
+    try:
+        rows = await conn.fetch("SELECT id, api_key FROM merchants WHERE api_key IS NOT NULL")
+        async with conn.transaction():
+            for row in rows:
+                columns = api_key_columns(row["api_key"])
+                await conn.execute(
+                    "UPDATE merchants SET api_key = NULL, api_key_prefix = $2, api_key_hash = $3 WHERE id = $1",
+                    row["id"], columns["api_key_prefix"], columns["api_key_hash"]
+                )
+        return len(rows)
+    finally:
+        await conn.close()
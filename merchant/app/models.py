@@ -42,7 +42,7 @@ class MerchantResponse(BaseModel):
     id: str
     email: str
     company_name: str
-    api_key: str
+    api_key: Optional[str] = None  # Only returned when a key is issued
     webhook_url: Optional[str]
     is_active: bool
     created_at: datetime
@@ -98,6 +98,7 @@ class PaymentRequestUpdate(BaseModel):
 class TransactionResponse(BaseModel):
     id: str
     payment_request_id: str
+    merchant_id: Optional[str] = None
     tx_hash: str
     chain: str
     token: str
@@ -0,0 +1 @@
+# Async data-access layer, one module per table
@@ -0,0 +1,211 @@
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.pagination import Cursor
+from app.database import get_supabase, supabase_pool
+
+# Filter keys are "column" (equality) or "column__op", e.g. "created_at__gte".
+# A dotted column ("payment_requests.merchant_id") filters on an inner-joined table.
+FILTER_OPERATORS = {"eq", "neq", "gt", "gte", "lt", "lte", "in"}
+
+def split_filter(key: str) -> Tuple[str, str]:
+    """Split a filter key into (column, operator)"""
+    column, _, operator = key.partition("__")
+    operator = operator or "eq"
+    if operator not in FILTER_OPERATORS:
+        raise ValueError(f"Unsupported filter operator: {operator}")
+    return column, operator
+
+class StorageBackend(ABC):
+    """Base interface for repository storage backends"""
+    
+    name = ""
+    
+    @abstractmethod
+    async def open(self):
+        """Open connections (called from the app lifespan)"""
+        pass
+    
+    @abstractmethod
+    async def close(self):
+        """Close connections (called from the app lifespan)"""
+        pass
+    
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Per-process connection counters"""
+        pass
+    
+    @abstractmethod
+    async def select(
+        self,
+        table: str,
+        columns: str = "*",
+        filters: Optional[Dict[str, Any]] = None,
+        order_by: Optional[str] = None,
+        desc: bool = True,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        after: Optional[Tuple[Any, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Select rows matching all filters.
+        
+        Ordered rows are tie-broken on id. `after` is an (order_by value, id)
+        keyset: only rows strictly past it in the sort direction are returned.
+        """
+        pass
+    
+    @abstractmethod
+    async def insert(self, table: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert one or more rows and return them; a column a row leaves out gets its default"""
+        pass
+    
+    @abstractmethod
+    async def update(self, table: str, values: Dict[str, Any], filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Update rows matching all filters and return them"""
+        pass
+    
+    @abstractmethod
+    async def rpc(self, function: str, params: Dict[str, Any]) -> Any:
+        """Call a database function with named arguments and return its result"""
+        pass
+
+class SupabaseBackend(StorageBackend):
+    """Runs repository queries through the async PostgREST client"""
+    
+    name = "supabase"
+    
+    async def open(self):
+        await supabase_pool.open()
+    
+    async def close(self):
+        await supabase_pool.close()
+    
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, **supabase_pool.stats()}
+    
+    def _columns(self, columns: str, filters: Dict[str, Any]) -> str:
+        """Add an inner-join embed for every joined table referenced by a filter"""
+        embeds = {}
+        for key in filters:
+            column, _ = split_filter(key)
+            if "." in column:
+                table, joined_column = column.split(".", 1)
+                embeds.setdefault(table, []).append(joined_column)
+        for table, joined_columns in embeds.items():
+            columns += f", {table}!inner({', '.join(joined_columns)})"
+        return columns
+    
+    def _apply_filters(self, query, filters: Dict[str, Any]):
+        for key, value in filters.items():
+            column, operator = split_filter(key)
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            if operator == "in":
+                query = query.in_(column, value)
+            else:
+                query = getattr(query, operator)(column, value)
+        return query
+    
+    async def select(
+        self,
+        table: str,
+        columns: str = "*",
+        filters: Optional[Dict[str, Any]] = None,
+        order_by: Optional[str] = None,
+        desc: bool = True,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        after: Optional[Tuple[Any, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Select rows matching all filters"""
+        filters = filters or {}
+        query = get_supabase().table(table).select(self._columns(columns, filters))
+        query = self._apply_filters(query, filters)
+        
+        if order_by and after:
+            value, row_id = after
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            op = "lt" if desc else "gt"
+            query = query.or_(f'{order_by}.{op}."{value}",and({order_by}.eq."{value}",id.{op}.{row_id})')
+            # The redundant bound on order_by alone lets the planner prune monthly partitions
+            query = query.lte(order_by, value) if desc else query.gte(order_by, value)
+        if order_by:
+            query = query.order(order_by, desc=desc).order("id", desc=desc)
+        if limit is not None:
+            query = query.range(offset, offset + limit - 1)
+        
+        result = await query.execute()
+        return result.data
+    
+    async def insert(self, table: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert one or more rows and return them"""
+        # missing=default: PostgREST would otherwise write NULL where a row lacks another row's column
+        result = await get_supabase().table(table).insert(rows, default_to_null=False).execute()
+        return result.data
+    
+    async def update(self, table: str, values: Dict[str, Any], filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Update rows matching all filters and return them"""
+        query = self._apply_filters(get_supabase().table(table).update(values), filters)
+        result = await query.execute()
+        return result.data
+    
+    async def rpc(self, function: str, params: Dict[str, Any]) -> Any:
+        """Call a database function with named arguments and return its result"""
+        params = {key: value.isoformat() if isinstance(value, date) else value for key, value in params.items()}
+        result = await get_supabase().rpc(function, params).execute()
+        return result.data
+
+def create_backend() -> StorageBackend:
+    """Create the storage backend selected in settings"""
+    if settings.database_backend == "postgres":
+        from app.repositories.postgres import PostgresBackend
+        return PostgresBackend(settings.database_url)
+    if settings.database_backend != "supabase":
+        raise ValueError(f"Unsupported database backend: {settings.database_backend}")
+    return SupabaseBackend()
+
+# Storage backend shared by all repositories
+backend = create_backend()
+
+def get_backend() -> StorageBackend:
+    """Get the active storage backend"""
+    return backend
+
+async def select_page(
+    table: str,
+    filters: Dict[str, Any],
+    limit: int,
+    offset: int = 0,
+    cursor: Optional[Cursor] = None,
+    columns: str = "*"
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """Fetch one newest-first page keyed on (created_at, id).
+    
+    With a cursor the page starts right after (or, paging backward, right
+    before) the cursor row and `offset` is ignored. Returns the rows in
+    newest-first order and whether more rows exist in the paging direction.
+    """
+    backward = bool(cursor and cursor.backward)
+    rows = await get_backend().select(
+        table,
+        columns,
+        filters,
+        order_by="created_at",
+        desc=not backward,
+        limit=limit + 1,
+        offset=0 if cursor else offset,
+        after=(cursor.created_at, cursor.id) if cursor else None
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backward:
+        rows.reverse()
+    return rows, has_more
+
+def first(rows: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Return the first row or None"""
+    return rows[0] if rows else None
@@ -0,0 +1,38 @@
+from typing import Any, Dict, List, Optional
+
+from app.repositories.base import get_backend, first
+
+TABLE = "merchant_wallets"
+
+async def create(wallet: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Insert a wallet"""
+    return first(await get_backend().insert(TABLE, [wallet]))
+
+async def get(wallet_id: str, merchant_id: str, columns: str = "*") -> Optional[Dict[str, Any]]:
+    """Get a merchant's wallet by id"""
+    return first(await get_backend().select(TABLE, columns, {"id": wallet_id, "merchant_id": merchant_id}))
+
+async def get_for_chain(merchant_id: str, chain: str, active_only: bool = False, columns: str = "*") -> Optional[Dict[str, Any]]:
+    """Get a merchant's wallet on a chain"""
+    filters = {"merchant_id": merchant_id, "chain": chain}
+    if active_only:
+        filters["is_active"] = True
+    return first(await get_backend().select(TABLE, columns, filters))
+
+async def list_for_merchant(
+    merchant_id: str,
+    chain: Optional[str] = None,
+    active_only: bool = True,
+    columns: str = "*"
+) -> List[Dict[str, Any]]:
+    """List a merchant's wallets, newest first"""
+    filters = {"merchant_id": merchant_id}
+    if chain:
+        filters["chain"] = chain
+    if active_only:
+        filters["is_active"] = True
+    return await get_backend().select(TABLE, columns, filters, order_by="created_at")
+
+async def update(wallet_id: str, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Update a wallet"""
+    return first(await get_backend().update(TABLE, values, {"id": wallet_id}))
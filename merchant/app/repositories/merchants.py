@@ -0,0 +1,51 @@
+from typing import Any, Dict, Optional
+
+from app.core.cache import TieredCache
+from app.core.config import settings
+from app.core.revocation import token_versions
+from app.repositories.base import get_backend, first
+
+TABLE = "merchants"
+
+# Full merchant rows by id; update() invalidates, so only other processes can
+# see a stale row, for at most MERCHANT_CACHE_TTL_SECONDS
+cache = TieredCache(
+    "merchant",
+    settings.merchant_cache_max_entries,
+    settings.merchant_cache_ttl_seconds,
+    redis_url=settings.redis_url if settings.merchant_cache_redis else "",
+    redis_ttl=settings.merchant_cache_redis_ttl_seconds
+)
+
+async def get_by_id(merchant_id: str, columns: str = "*") -> Optional[Dict[str, Any]]:
+    """Get merchant by id"""
+    return first(await get_backend().select(TABLE, columns, {"id": merchant_id}))
+
+async def get_cached(merchant_id: str) -> Optional[Dict[str, Any]]:
+    """Get merchant by id through the merchant cache"""
+    return await cache.get(merchant_id, lambda: get_by_id(merchant_id))
+
+async def get_by_email(email: str, columns: str = "*") -> Optional[Dict[str, Any]]:
+    """Get merchant by email"""
+    return first(await get_backend().select(TABLE, columns, {"email": email}))
+
+async def get_by_api_key_prefix(prefix: str) -> Optional[Dict[str, Any]]:
+    """Get merchant by the public prefix of its API key"""
+    return first(await get_backend().select(TABLE, "*", {"api_key_prefix": prefix}))
+
+async def get_by_api_key(api_key: str) -> Optional[Dict[str, Any]]:
+    """Get merchant by a plaintext API key not yet moved to api_key_hash (see `hash-api-keys`)"""
+    return first(await get_backend().select(TABLE, "*", {"api_key": api_key}))
+
+async def create(merchant: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Insert a merchant"""
+    return first(await get_backend().insert(TABLE, [merchant]))
+
+async def update(merchant_id: str, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Update a merchant, drop its cached copy and record its new token version"""
+    merchant = first(await get_backend().update(TABLE, values, {"id": merchant_id}))
+    await cache.invalidate(merchant_id)
+    if merchant:
+        # Revoke this process's copies of older tokens right away; other processes follow on their next refresh
+        token_versions.observe(merchant_id, merchant.get("token_version"))
+    return merchant
@@ -0,0 +1,37 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.pagination import Cursor
+from app.repositories.base import get_backend, first, select_page
+
+TABLE = "payment_requests"
+
+async def create(payment: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Insert a payment request"""
+    return first(await get_backend().insert(TABLE, [payment]))
+
+async def get(payment_id: str, merchant_id: str, columns: str = "*") -> Optional[Dict[str, Any]]:
+    """Get a merchant's payment request by payment_id"""
+    return first(await get_backend().select(TABLE, columns, {"payment_id": payment_id, "merchant_id": merchant_id}))
+
+async def list_for_merchant(
+    merchant_id: str,
+    status: Optional[str] = None,
+    chain: Optional[str] = None,
+    token: Optional[str] = None,
+    limit: int = 50,
+    offset: int = 0,
+    cursor: Optional[Cursor] = None
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """Page through a merchant's payment requests, newest first (see select_page)"""
+    filters = {"merchant_id": merchant_id}
+    if status:
+        filters["status"] = status
+    if chain:
+        filters["chain"] = chain
+    if token:
+        filters["token"] = token
+    return await select_page(TABLE, filters, limit, offset=offset, cursor=cursor)
+
+async def update(payment_request_id: str, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Update a payment request by row id"""
+    return first(await get_backend().update(TABLE, values, {"id": payment_request_id}))
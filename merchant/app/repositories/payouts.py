@@ -0,0 +1,48 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.pagination import Cursor
+from app.repositories.base import get_backend, first, select_page
+
+TABLE = "payouts"
+
+async def create(payout: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Insert a payout"""
+    return first(await get_backend().insert(TABLE, [payout]))
+
+async def get(payout_id: str, merchant_id: str) -> Optional[Dict[str, Any]]:
+    """Get a merchant's payout by payout_id"""
+    return first(await get_backend().select(TABLE, "*", {"payout_id": payout_id, "merchant_id": merchant_id}))
+
+async def list_for_merchant(
+    merchant_id: str,
+    chain: Optional[str] = None,
+    token: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = 50,
+    offset: int = 0,
+    cursor: Optional[Cursor] = None
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """Page through a merchant's payouts, newest first (see select_page)"""
+    filters = {"merchant_id": merchant_id}
+    if chain:
+        filters["chain"] = chain
+    if token:
+        filters["token"] = token
+    if status:
+        filters["status"] = status
+    return await select_page(TABLE, filters, limit, offset=offset, cursor=cursor)
+
+async def summarize(merchant_id: str, since: datetime) -> Dict[str, Any]:
+    """Grouped status/chain counts and exact token volumes, computed by the payout_stats() SQL function"""
+    stats = await get_backend().rpc("payout_stats", {"p_merchant_id": merchant_id, "p_since": since}) or {}
+    return {
+        "status_breakdown": stats.get("status_breakdown", {}),
+        "chain_breakdown": stats.get("chain_breakdown", {}),
+        "token_volumes": {token: Decimal(volume) for token, volume in stats.get("token_volumes", {}).items()}
+    }
+
+async def update(payout_row_id: str, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Update a payout by row id"""
+    return first(await get_backend().update(TABLE, values, {"id": payout_row_id}))
@@ -0,0 +1,259 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import json
+import logging
+import re
+import uuid
+
+import asyncpg
+
+from app.core.config import settings
+from app.repositories.base import StorageBackend, split_filter
+
+logger = logging.getLogger(__name__)
+
+IDENTIFIER = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+SQL_OPERATORS = {"eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+# Foreign keys used to resolve dotted filters ("payment_requests.merchant_id")
+# as EXISTS sub-queries, mirroring PostgREST's !inner embeds
+JOIN_KEYS = {
+    ("transactions", "payment_requests"): "payment_request_id",
+}
+
+def utc_aware(value: datetime) -> datetime:
+    """Treat naive datetimes (from utcnow()) as UTC rather than local time"""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+def quote(identifier: str) -> str:
+    """Quote a validated SQL identifier"""
+    if not IDENTIFIER.match(identifier):
+        raise ValueError(f"Invalid identifier: {identifier}")
+    return f'"{identifier}"'
+
+class PostgresBackend(StorageBackend):
+    """Runs repository queries directly against Postgres over a pooled asyncpg connection set"""
+    
+    name = "postgres"
+    
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self.pool: Optional[asyncpg.Pool] = None
+        self.column_types: Dict[Tuple[str, str], str] = {}
+        self.connections_opened = 0
+        self.queries = 0
+    
+    async def open(self):
+        """Create the connection pool and load column types"""
+        if self.pool is not None:
+            return
+        if not self.dsn:
+            raise ValueError("DATABASE_URL is required for the postgres backend")
+        
+        # Column types are needed to coerce PostgREST-style (string) values
+        conn = await asyncpg.connect(self.dsn)
+        try:
+            rows = await conn.fetch(
+                "SELECT table_name, column_name, data_type FROM information_schema.columns WHERE table_schema = 'public'"
+            )
+        finally:
+            await conn.close()
+        self.column_types = {(row["table_name"], row["column_name"]): row["data_type"] for row in rows}
+        
+        self.pool = await asyncpg.create_pool(
+            self.dsn,
+            min_size=settings.database_pool_min_size,
+            max_size=settings.database_pool_max_size,
+            statement_cache_size=settings.database_statement_cache_size,
+            init=self._init_connection
+        )
+        logger.info("✅ Postgres pool opened")
+    
+    async def close(self):
+        """Close the connection pool"""
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+            logger.info("🛑 Postgres pool closed")
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "pool_size": self.pool.get_size() if self.pool else 0,
+            "idle_connections": self.pool.get_idle_size() if self.pool else 0,
+            "opened": self.connections_opened,
+            "queries": self.queries,
+            "statement_cache_size": settings.database_statement_cache_size,
+        }
+    
+    async def _init_connection(self, conn: asyncpg.Connection):
+        """Register JSON codecs"""
+        for json_type in ("json", "jsonb"):
+            await conn.set_type_codec(
+                json_type,
+                encoder=lambda value: json.dumps(value, default=str),
+                decoder=json.loads,
+                schema="pg_catalog"
+            )
+        self.connections_opened += 1
+    
+    def _coerce(self, table: str, column: str, value: Any) -> Any:
+        """Convert JSON-style values to the Python types asyncpg expects"""
+        if value is None:
+            return value
+        if isinstance(value, (list, tuple)):
+            return [self._coerce(table, column, item) for item in value]
+        if "." in column:
+            table, column = column.split(".", 1)
+        data_type = self.column_types.get((table, column), "")
+        if data_type.startswith("timestamp") and isinstance(value, str):
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if data_type == "timestamp with time zone" and isinstance(value, datetime):
+            return utc_aware(value)
+        if data_type == "numeric" and not isinstance(value, Decimal):
+            return Decimal(str(value))
+        if data_type in ("bigint", "integer", "smallint") and isinstance(value, str):
+            return int(value)
+        return value
+    
+    def _row(self, record: asyncpg.Record) -> Dict[str, Any]:
+        """Convert a record to the JSON-like dict shape PostgREST returns"""
+        row = {}
+        for key, value in record.items():
+            if isinstance(value, uuid.UUID):
+                value = str(value)
+            elif isinstance(value, datetime):
+                value = value.isoformat()
+            row[key] = value
+        return row
+    
+    def _columns_sql(self, columns: str) -> str:
+        if columns.strip() == "*":
+            return "*"
+        return ", ".join(quote(column.strip()) for column in columns.split(","))
+    
+    def _where_sql(self, table: str, keys: Sequence[str], start: int = 1) -> str:
+        """Build a WHERE clause with positional parameters starting at $start"""
+        clauses = []
+        joins: Dict[str, List[str]] = {}
+        index = start
+        for key in keys:
+            column, operator = split_filter(key)
+            if "." in column:
+                joined_table, joined_column = column.split(".", 1)
+                condition = self._condition(joined_table, joined_column, operator, index)
+                joins.setdefault(joined_table, []).append(condition)
+            else:
+                clauses.append(self._condition(table, column, operator, index))
+            index += 1
+        for joined_table, conditions in joins.items():
+            foreign_key = JOIN_KEYS[(table, joined_table)]
+            clauses.append(
+                f"EXISTS (SELECT 1 FROM {quote(joined_table)} WHERE {quote(joined_table)}.\"id\" = {quote(table)}.{quote(foreign_key)}"
+                f" AND {' AND '.join(conditions)})"
+            )
+        return f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    
+    def _condition(self, table: str, column: str, operator: str, index: int) -> str:
+        target = f"{quote(table)}.{quote(column)}"
+        if operator == "in":
+            return f"{target} = ANY(${index})"
+        return f"{target} {SQL_OPERATORS[operator]} ${index}"
+    
+    def _select_sql(
+        self,
+        table: str,
+        columns: str,
+        keys: Sequence[str],
+        order_by: Optional[str],
+        desc: bool,
+        paginated: bool,
+        keyset: bool = False
+    ) -> str:
+        where = self._where_sql(table, keys)
+        index = len(keys) + 1
+        direction = "DESC" if desc else "ASC"
+        if keyset:
+            # Row comparison so the (…, created_at, id) indexes can seek straight to the cursor
+            comparison = f"({quote(table)}.{quote(order_by)}, {quote(table)}.\"id\") {'<' if desc else '>'} (${index}, ${index + 1})"
+            # The redundant bound on order_by alone lets the planner prune monthly partitions
+            comparison += f" AND {quote(table)}.{quote(order_by)} {'<=' if desc else '>='} ${index}"
+            where += f" AND {comparison}" if where else f" WHERE {comparison}"
+            index += 2
+        sql = f"SELECT {self._columns_sql(columns)} FROM {quote(table)}{where}"
+        if order_by:
+            sql += f" ORDER BY {quote(order_by)} {direction}, \"id\" {direction}"
+        if paginated:
+            sql += f" LIMIT ${index} OFFSET ${index + 1}"
+        return sql
+    
+    async def _fetch(self, sql: str, args: List[Any]) -> List[Dict[str, Any]]:
+        if self.pool is None:
+            raise RuntimeError("Postgres pool is not open")
+        self.queries += 1
+        # Every query is prepared once per connection and reused from asyncpg's statement cache
+        async with self.pool.acquire() as conn:
+            records = await conn.fetch(sql, *args)
+        return [self._row(record) for record in records]
+    
+    async def select(
+        self,
+        table: str,
+        columns: str = "*",
+        filters: Optional[Dict[str, Any]] = None,
+        order_by: Optional[str] = None,
+        desc: bool = True,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        after: Optional[Tuple[Any, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        filters = filters or {}
+        keys = list(filters)
+        args = [self._coerce(table, split_filter(key)[0], filters[key]) for key in keys]
+        keyset = bool(order_by and after)
+        if keyset:
+            args += [self._coerce(table, order_by, after[0]), self._coerce(table, "id", after[1])]
+        sql = self._select_sql(table, columns, keys, order_by, desc, limit is not None, keyset)
+        if limit is not None:
+            args += [limit, offset]
+        return await self._fetch(sql, args)
+    
+    async def insert(self, table: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not rows:
+            return []
+        # Every column any row sets; a row without one gets the column's default, not NULL
+        columns = list(dict.fromkeys(column for row in rows for column in row))
+        placeholders = []
+        args = []
+        for row in rows:
+            values = []
+            for column in columns:
+                if column in row:
+                    args.append(self._coerce(table, column, row[column]))
+                    values.append(f"${len(args)}")
+                else:
+                    values.append("DEFAULT")
+            placeholders.append("(" + ", ".join(values) + ")")
+        sql = (
+            f"INSERT INTO {quote(table)} ({', '.join(quote(column) for column in columns)}) "
+            f"VALUES {', '.join(placeholders)} RETURNING *"
+        )
+        return await self._fetch(sql, args)
+    
+    async def update(self, table: str, values: Dict[str, Any], filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        columns = list(values)
+        assignments = ", ".join(f"{quote(column)} = ${i + 1}" for i, column in enumerate(columns))
+        keys = list(filters)
+        args = [self._coerce(table, column, values[column]) for column in columns]
+        args += [self._coerce(table, split_filter(key)[0], filters[key]) for key in keys]
+        sql = f"UPDATE {quote(table)} SET {assignments}{self._where_sql(table, keys, start=len(columns) + 1)} RETURNING *"
+        return await self._fetch(sql, args)
+    
+    async def rpc(self, function: str, params: Dict[str, Any]) -> Any:
+        names = list(params)
+        arguments = ", ".join(f"{quote(name)} => ${i + 1}" for i, name in enumerate(names))
+        args = [utc_aware(params[name]) if isinstance(params[name], datetime) else params[name] for name in names]
+        rows = await self._fetch(f"SELECT {quote(function)}({arguments}) AS result", args)
+        return rows[0]["result"] if rows else None
@@ -0,0 +1,36 @@
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, List
+
+from app.repositories.base import get_backend
+
+TABLE = "daily_rollups"
+
+# Source tables rolled up by the maintain_daily_rollups() trigger
+SOURCES = ("payment_requests", "transactions", "payouts")
+
+BUCKETS = ("day", "week", "month")
+
+# Status whose amounts count as settled volume, per source table
+SETTLED_STATUS = {
+    "payment_requests": "completed",
+    "transactions": "confirmed",
+    "payouts": "completed",
+}
+
+async def series(merchant_id: str, source: str, bucket: str, start: date, end: date) -> List[Dict[str, Any]]:
+    """(period, chain, token, status) counts and exact amounts between two days, oldest first"""
+    rows = await get_backend().rpc("rollup_series", {
+        "p_merchant_id": merchant_id,
+        "p_source": source,
+        "p_bucket": bucket,
+        "p_from": start,
+        "p_to": end
+    }) or []
+    for row in rows:
+        row["amount"] = Decimal(row["amount"])
+    return rows
+
+async def totals(merchant_id: str) -> Dict[str, Dict[str, int]]:
+    """All-time status counts per source table"""
+    return await get_backend().rpc("rollup_totals", {"p_merchant_id": merchant_id}) or {}
@@ -0,0 +1,59 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.pagination import Cursor
+from app.repositories.base import get_backend, first, select_page
+
+TABLE = "transactions"
+
+async def create(transaction: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Insert a transaction"""
+    return first(await get_backend().insert(TABLE, [transaction]))
+
+async def get_by_hash(tx_hash: str, merchant_id: str) -> Optional[Dict[str, Any]]:
+    """Get a merchant's transaction by hash"""
+    return first(await get_backend().select(TABLE, "*", {"tx_hash": tx_hash, "merchant_id": merchant_id}))
+
+async def list_for_merchant(
+    merchant_id: str,
+    chain: Optional[str] = None,
+    token: Optional[str] = None,
+    status: Optional[str] = None,
+    tx_hash: Optional[str] = None,
+    limit: int = 50,
+    offset: int = 0,
+    cursor: Optional[Cursor] = None
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """Page through a merchant's transactions, newest first (see select_page)"""
+    filters = {"merchant_id": merchant_id}
+    if chain:
+        filters["chain"] = chain
+    if token:
+        filters["token"] = token
+    if status:
+        filters["status"] = status
+    if tx_hash:
+        filters["tx_hash"] = tx_hash
+    return await select_page(TABLE, filters, limit, offset=offset, cursor=cursor)
+
+async def list_for_payment_request(payment_request_id: str) -> List[Dict[str, Any]]:
+    """List the transactions of a payment request, newest first"""
+    return await get_backend().select(TABLE, "*", {"payment_request_id": payment_request_id}, order_by="created_at")
+
+async def list_pending(merchant_id: str) -> List[Dict[str, Any]]:
+    """List a merchant's pending transactions"""
+    return await get_backend().select(TABLE, "*", {"merchant_id": merchant_id, "status": "pending"})
+
+async def summarize(merchant_id: str, since: datetime) -> Dict[str, Any]:
+    """Grouped status/chain counts and exact token volumes, computed by the transaction_stats() SQL function"""
+    stats = await get_backend().rpc("transaction_stats", {"p_merchant_id": merchant_id, "p_since": since}) or {}
+    return {
+        "status_breakdown": stats.get("status_breakdown", {}),
+        "chain_breakdown": stats.get("chain_breakdown", {}),
+        "token_volumes": {token: Decimal(volume) for token, volume in stats.get("token_volumes", {}).items()}
+    }
+
+async def update(transaction_id: str, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Update a transaction"""
+    return first(await get_backend().update(TABLE, values, {"id": transaction_id}))
@@ -0,0 +1,42 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.pagination import Cursor
+from app.repositories.base import get_backend, first, select_page
+from app.repositories.write_behind import WriteBehindWriter
+
+TABLE = "webhook_logs"
+
+# Delivery and inbound logs are written off the request path in batches
+writer = WriteBehindWriter(
+    TABLE,
+    batch_size=settings.webhook_log_batch_size,
+    flush_interval=settings.webhook_log_flush_interval_seconds,
+    max_buffered=settings.webhook_log_buffer_size
+)
+
+async def record(log: Dict[str, Any]):
+    """Queue a webhook log for a batched insert, stamped with the time of the event"""
+    await writer.put({**log, "created_at": datetime.now(timezone.utc).isoformat()})
+
+async def get(log_id: str, merchant_id: str) -> Optional[Dict[str, Any]]:
+    """Get a merchant's webhook log by id"""
+    return first(await get_backend().select(TABLE, "*", {"id": log_id, "merchant_id": merchant_id}))
+
+async def list_for_merchant(
+    merchant_id: str,
+    event_type: Optional[str] = None,
+    limit: int = 50,
+    offset: int = 0,
+    cursor: Optional[Cursor] = None
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """Page through a merchant's webhook logs, newest first (see select_page)"""
+    filters = {"merchant_id": merchant_id}
+    if event_type:
+        filters["event_type"] = event_type
+    return await select_page(TABLE, filters, limit, offset=offset, cursor=cursor)
+
+async def update(log_id: str, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Update a webhook log"""
+    return first(await get_backend().update(TABLE, values, {"id": log_id}))
@@ -0,0 +1,126 @@
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import time
+
+from app.repositories.base import get_backend
+
+logger = logging.getLogger(__name__)
+
+# Queued by stop() so the flusher drains everything ahead of it and exits
+_STOP = object()
+
+class WriteBehindWriter:
+    """Buffers rows for one table and inserts them in multi-row batches from a background task.
+    
+    A batch is flushed once it reaches `batch_size` rows or `flush_interval` seconds after its
+    first row arrived. At most `max_buffered` rows wait in memory; beyond that `put()` blocks
+    until the flusher catches up. While the writer is not running, rows are inserted directly.
+    """
+    
+    def __init__(self, table: str, batch_size: int, flush_interval: float, max_buffered: int):
+        self.table = table
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffered = max_buffered
+        self.queue: Optional[asyncio.Queue] = None
+        self.task: Optional[asyncio.Task] = None
+        self.accepting = False
+        self.enqueued = 0
+        self.backpressure_waits = 0
+        self.batches = 0
+        self.flushed_rows = 0
+        self.failed_rows = 0
+        self.max_batch_size = 0
+        self.flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+    
+    async def start(self):
+        """Start the background flusher (called from the app lifespan)"""
+        if self.task is not None:
+            return
+        self.queue = asyncio.Queue(maxsize=self.max_buffered)
+        self.task = asyncio.create_task(self._run())
+        self.accepting = True
+    
+    async def stop(self):
+        """Flush every buffered row and stop the flusher (called from the app lifespan)"""
+        if self.task is None:
+            return
+        self.accepting = False
+        await self.queue.put(_STOP)
+        await self.task
+        self.task = None
+    
+    async def put(self, row: Dict[str, Any]):
+        """Queue a row for insertion, waiting while the buffer is full"""
+        if not self.accepting:
+            await get_backend().insert(self.table, [row])
+            return
+        if self.queue.full():
+            self.backpressure_waits += 1
+        await self.queue.put(row)
+        self.enqueued += 1
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            row = await self.queue.get()
+            if row is _STOP:
+                break
+            batch = [row]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    row = self.queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        row = await asyncio.wait_for(self.queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if row is _STOP:
+                    stopping = True
+                    break
+                batch.append(row)
+            await self._flush(batch)
+    
+    async def _flush(self, batch: List[Dict[str, Any]]):
+        # One insert per set of columns, so each statement has a single column list
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for row in batch:
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+        
+        started = time.perf_counter()
+        for rows in groups.values():
+            try:
+                await get_backend().insert(self.table, rows)
+                self.flushed_rows += len(rows)
+            except Exception as e:
+                self.failed_rows += len(rows)
+                logger.error(f"❌ Failed to write {len(rows)} {self.table} rows: {e}")
+        elapsed = time.perf_counter() - started
+        
+        self.batches += 1
+        self.max_batch_size = max(self.max_batch_size, len(batch))
+        self.flush_seconds += elapsed
+        self.max_flush_seconds = max(self.max_flush_seconds, elapsed)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.task is not None,
+            "buffered": self.queue.qsize() if self.queue else 0,
+            "capacity": self.max_buffered,
+            "enqueued": self.enqueued,
+            "backpressure_waits": self.backpressure_waits,
+            "batches": self.batches,
+            "flushed_rows": self.flushed_rows,
+            "failed_rows": self.failed_rows,
+            "avg_batch_size": round(self.flushed_rows / self.batches, 2) if self.batches else 0,
+            "max_batch_size": self.max_batch_size,
+            "avg_flush_ms": round(self.flush_seconds * 1000 / self.batches, 2) if self.batches else 0,
+            "max_flush_ms": round(self.max_flush_seconds * 1000, 2),
+        }
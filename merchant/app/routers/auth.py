@@ -1,24 +1,24 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import HTTPBearer
 from datetime import timedelta
 import secrets
 
 from app.models import MerchantCreate, MerchantResponse, LoginRequest, TokenResponse
-from app.core.security import get_password_hash, create_access_token, verify_password, generate_api_key
+from app.core.security import (
+    get_password_hash, create_access_token, verify_password, generate_api_key,
+    api_key_columns, authenticate_api_key, get_current_merchant, get_current_merchant_allow_inactive,
+    access_token_claims
+)
 from app.core.config import settings
-from app.database import get_supabase
+from app.repositories import merchants
 
 router = APIRouter()
-security = HTTPBearer()
 
 @router.post("/register", response_model=MerchantResponse)
 async def register_merchant(merchant_data: MerchantCreate):
     """Register a new merchant"""
-    supabase = get_supabase()
-    
     # Check if merchant already exists
-    existing = supabase.table("merchants").select("id").eq("email", merchant_data.email).execute()
-    if existing.data:
+    existing = await merchants.get_by_email(merchant_data.email, columns="id")
+    if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Merchant with this email already exists"
@@ -31,85 +31,76 @@ async def register_merchant(merchant_data: MerchantCreate):
     merchant = {
         "email": merchant_data.email,
         "company_name": merchant_data.company_name,
-        "api_key": api_key,
+        **api_key_columns(api_key),
         "webhook_url": merchant_data.webhook_url,
         "is_active": True
     }
     
-    result = supabase.table("merchants").insert(merchant).execute()
+    created_merchant = await merchants.create(merchant)
     
-    if not result.data:
+    if not created_merchant:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to create merchant"
         )
     
-    created_merchant = result.data[0]
-    return MerchantResponse(**created_merchant)
+    # The plaintext key is only ever shown here
+    return MerchantResponse(**{**created_merchant, "api_key": api_key})
 
 @router.post("/login", response_model=TokenResponse)
 async def login_merchant(login_data: LoginRequest):
     """Login merchant and get access token"""
-    supabase = get_supabase()
-    
-    # Find merchant by email and API key
-    result = supabase.table("merchants").select("*").eq("email", login_data.email).eq("api_key", login_data.api_key).execute()
+    # Find merchant by API key, then check it belongs to the email
+    merchant = await authenticate_api_key(login_data.api_key)
     
-    if not result.data:
+    if not merchant or merchant.get("email") != login_data.email:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or API key"
         )
     
-    merchant = result.data[0]
-    if not merchant.get("is_active"):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Merchant account is inactive"
-        )
+    # Inactive merchants still get a token, but it is only accepted by /activate
+    # (deactivation revokes every token issued before it)
     
     # Create access token
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
     access_token = create_access_token(
-        data={"sub": merchant["id"]}, 
+        data=access_token_claims(merchant),
         expires_delta=access_token_expires
     )
     
     return TokenResponse(access_token=access_token, token_type="bearer")
 
 @router.post("/refresh-api-key", response_model=MerchantResponse)
-async def refresh_api_key(current_merchant: dict = Depends(security)):
+async def refresh_api_key(current_merchant: dict = Depends(get_current_merchant)):
     """Generate a new API key for the merchant"""
-    supabase = get_supabase()
-    
     # Generate new API key
     new_api_key = generate_api_key()
     
-    # Update merchant with new API key
-    result = supabase.table("merchants").update({"api_key": new_api_key}).eq("id", current_merchant["id"]).execute()
+    # Update merchant with new API key; the old prefix stops verifying once the cached record is dropped
+    updated_merchant = await merchants.update(current_merchant["id"], api_key_columns(new_api_key))
     
-    if not result.data:
+    if not updated_merchant:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to refresh API key"
         )
     
-    updated_merchant = result.data[0]
-    return MerchantResponse(**updated_merchant)
+    return MerchantResponse(**{**updated_merchant, "api_key": new_api_key})
 
 @router.get("/me", response_model=MerchantResponse)
-async def get_current_merchant_info(current_merchant: dict = Depends(security)):
+async def get_current_merchant_info(current_merchant: dict = Depends(get_current_merchant)):
     """Get current merchant information"""
-    return MerchantResponse(**current_merchant)
+    # Claims tokens may carry an older profile
+    merchant = await merchants.get_cached(current_merchant["id"]) or current_merchant
+    return MerchantResponse(**merchant)
 
 @router.post("/deactivate")
-async def deactivate_merchant(current_merchant: dict = Depends(security)):
+async def deactivate_merchant(current_merchant: dict = Depends(get_current_merchant)):
     """Deactivate merchant account"""
-    supabase = get_supabase()
+    result = await merchants.update(current_merchant["id"], {"is_active": False})
     
-    result = supabase.table("merchants").update({"is_active": False}).eq("id", current_merchant["id"]).execute()
-    
-    if not result.data:
+    if not result:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to deactivate merchant account"
@@ -118,13 +109,11 @@ async def deactivate_merchant(current_merchant: dict = Depends(security)):
     return {"message": "Merchant account deactivated successfully"}
 
 @router.post("/activate")
-async def activate_merchant(current_merchant: dict = Depends(security)):
+async def activate_merchant(current_merchant: dict = Depends(get_current_merchant_allow_inactive)):
     """Activate merchant account"""
-    supabase = get_supabase()
-    
-    result = supabase.table("merchants").update({"is_active": True}).eq("id", current_merchant["id"]).execute()
+    result = await merchants.update(current_merchant["id"], {"is_active": True})
     
-    if not result.data:
+    if not result:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to activate merchant account"
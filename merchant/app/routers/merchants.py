@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import Dict, List
+from datetime import date, datetime, timedelta
+import asyncio
 
 from app.models import MerchantResponse
 from app.core.security import get_current_merchant
-from app.database import get_supabase
+from app.core.responses import DecimalJSONResponse
+from app.repositories import merchants, merchant_wallets, rollups
 
 router = APIRouter()
 
@@ -12,7 +15,9 @@ async def get_merchant_profile(
     current_merchant: dict = Depends(get_current_merchant)
 ):
     """Get merchant profile information"""
-    return MerchantResponse(**current_merchant)
+    # Claims tokens may carry an older profile
+    merchant = await merchants.get_cached(current_merchant["id"]) or current_merchant
+    return MerchantResponse(**merchant)
 
 @router.put("/profile", response_model=MerchantResponse)
 async def update_merchant_profile(
@@ -21,8 +26,6 @@ async def update_merchant_profile(
     current_merchant: dict = Depends(get_current_merchant)
 ):
     """Update merchant profile information"""
-    supabase = get_supabase()
-    
     update_data = {}
     if company_name is not None:
         update_data["company_name"] = company_name
@@ -35,15 +38,14 @@ async def update_merchant_profile(
             detail="No fields to update"
         )
     
-    result = supabase.table("merchants").update(update_data).eq("id", current_merchant["id"]).execute()
+    updated_merchant = await merchants.update(current_merchant["id"], update_data)
     
-    if not result.data:
+    if not updated_merchant:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to update merchant profile"
         )
     
-    updated_merchant = result.data[0]
     return MerchantResponse(**updated_merchant)
 
 @router.get("/stats")
@@ -51,36 +53,17 @@ async def get_merchant_stats(
     current_merchant: dict = Depends(get_current_merchant)
 ):
     """Get merchant statistics"""
-    supabase = get_supabase()
-    
-    # Get payment request counts
-    payment_counts = supabase.table("payment_requests").select("status").select("count", count="exact").eq("merchant_id", current_merchant["id"]).execute()
-    
-    # Get transaction counts
-    transaction_counts = supabase.table("transactions").select("status").select("count", count="exact").eq("payment_requests.merchant_id", current_merchant["id"]).execute()
-    
-    # Get payout counts
-    payout_counts = supabase.table("payouts").select("status").select("count", count="exact").eq("merchant_id", current_merchant["id"]).execute()
-    
-    # Get wallet counts
-    wallet_counts = supabase.table("merchant_wallets").select("chain").select("count", count="exact").eq("merchant_id", current_merchant["id"]).eq("is_active", True).execute()
+    merchant_id = current_merchant["id"]
     
-    # Process results
-    payment_stats = {}
-    for row in payment_counts.data:
-        payment_stats[row["status"]] = row["count"]
-    
-    transaction_stats = {}
-    for row in transaction_counts.data:
-        transaction_stats[row["status"]] = row["count"]
-    
-    payout_stats = {}
-    for row in payout_counts.data:
-        payout_stats[row["status"]] = row["count"]
+    # Status counts come from the daily rollups; wallets are few enough to count directly
+    totals, wallet_rows = await asyncio.gather(
+        rollups.totals(merchant_id),
+        merchant_wallets.list_for_merchant(merchant_id, columns="chain")
+    )
     
     wallet_stats = {}
-    for row in wallet_counts.data:
-        wallet_stats[row["chain"]] = row["count"]
+    for row in wallet_rows:
+        wallet_stats[row["chain"]] = wallet_stats.get(row["chain"], 0) + 1
     
     return {
         "merchant_id": current_merchant["id"],
@@ -88,9 +71,71 @@ async def get_merchant_stats(
         "is_active": current_merchant["is_active"],
         "created_at": current_merchant["created_at"],
         "statistics": {
-            "payments": payment_stats,
-            "transactions": transaction_stats,
-            "payouts": payout_stats,
+            "payments": totals.get("payment_requests", {}),
+            "transactions": totals.get("transactions", {}),
+            "payouts": totals.get("payouts", {}),
             "wallets": wallet_stats
         }
     }
+
+def bucket_start(day: date, bucket: str) -> date:
+    """First day of the day/week/month bucket containing `day` (weeks start on Monday)"""
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+def next_bucket(start: date, bucket: str) -> date:
+    if bucket == "week":
+        return start + timedelta(days=7)
+    if bucket == "month":
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
+
+@router.get("/stats/timeseries")
+async def get_merchant_timeseries(
+    current_merchant: dict = Depends(get_current_merchant),
+    source: str = Query("transactions", pattern="^(payment_requests|transactions|payouts)$"),
+    bucket: str = Query("day", pattern="^(day|week|month)$"),
+    days: int = Query(30, ge=1, le=730)
+):
+    """Get bucketed counts and settled volumes from the daily rollups"""
+    end_date = datetime.utcnow().date()
+    start_date = bucket_start(end_date - timedelta(days=days - 1), bucket)
+    
+    rows = await rollups.series(current_merchant["id"], source, bucket, start_date, end_date)
+    
+    # Emit every bucket in range, including empty ones, so charts get a continuous axis
+    periods: Dict[str, dict] = {}
+    period = start_date
+    while period <= end_date:
+        periods[period.isoformat()] = {
+            "period": period.isoformat(),
+            "count": 0,
+            "status_breakdown": {},
+            "chain_breakdown": {},
+            "token_volumes": {}
+        }
+        period = next_bucket(period, bucket)
+    
+    settled_status = rollups.SETTLED_STATUS[source]
+    for row in rows:
+        entry = periods.get(row["period"])
+        if entry is None:
+            continue
+        entry["count"] += row["count"]
+        entry["status_breakdown"][row["status"]] = entry["status_breakdown"].get(row["status"], 0) + row["count"]
+        entry["chain_breakdown"][row["chain"]] = entry["chain_breakdown"].get(row["chain"], 0) + row["count"]
+        if row["status"] == settled_status:
+            entry["token_volumes"][row["token"]] = entry["token_volumes"].get(row["token"], 0) + row["amount"]
+    
+    return DecimalJSONResponse({
+        "source": source,
+        "bucket": bucket,
+        "series": list(periods.values()),
+        "date_range": {
+            "start": start_date.isoformat(),
+            "end": end_date.isoformat()
+        }
+    })
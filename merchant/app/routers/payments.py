@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from typing import List, Optional
 from datetime import datetime, timedelta
 import uuid
@@ -9,7 +9,8 @@ from app.models import (
     PaymentStatus, TransactionResponse, ChainType, TokenType
 )
 from app.core.security import get_current_merchant
-from app.database import get_supabase
+from app.core.pagination import decode_cursor, set_page_headers
+from app.repositories import payment_requests, transactions
 from app.blockchain.manager import blockchain_manager
 
 router = APIRouter()
@@ -20,8 +21,6 @@ async def create_payment_request(
     current_merchant: dict = Depends(get_current_merchant)
 ):
     """Create a new payment request"""
-    supabase = get_supabase()
-    
     # Generate unique payment ID
     payment_id = f"pay_{uuid.uuid4().hex[:16]}"
     
@@ -43,15 +42,14 @@ async def create_payment_request(
         "metadata": payment_data.metadata or {}
     }
     
-    result = supabase.table("payment_requests").insert(payment_request).execute()
+    created_payment = await payment_requests.create(payment_request)
     
-    if not result.data:
+    if not created_payment:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to create payment request"
         )
     
-    created_payment = result.data[0]
     return PaymentRequestResponse(**created_payment)
 
 @router.get("/{payment_id}", response_model=PaymentRequestResponse)
@@ -60,45 +58,41 @@ async def get_payment_request(
     current_merchant: dict = Depends(get_current_merchant)
 ):
     """Get payment request details"""
-    supabase = get_supabase()
-    
-    result = supabase.table("payment_requests").select("*").eq("payment_id", payment_id).eq("merchant_id", current_merchant["id"]).execute()
+    payment = await payment_requests.get(payment_id, current_merchant["id"])
     
-    if not result.data:
+    if not payment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Payment request not found"
         )
     
-    payment = result.data[0]
     return PaymentRequestResponse(**payment)
 
 @router.get("/", response_model=List[PaymentRequestResponse])
 async def list_payment_requests(
+    response: Response,
     current_merchant: dict = Depends(get_current_merchant),
     status: Optional[PaymentStatus] = Query(None),
     chain: Optional[ChainType] = Query(None),
     token: Optional[TokenType] = Query(None),
     limit: int = Query(50, le=100),
-    offset: int = Query(0, ge=0)
+    offset: int = Query(0, ge=0, deprecated=True),
+    cursor: Optional[str] = Query(None)
 ):
     """List payment requests with optional filters"""
-    supabase = get_supabase()
-    
-    query = supabase.table("payment_requests").select("*").eq("merchant_id", current_merchant["id"])
-    
-    if status:
-        query = query.eq("status", status.value)
-    if chain:
-        query = query.eq("chain", chain.value)
-    if token:
-        query = query.eq("token", token.value)
-    
-    query = query.order("created_at", desc=True).range(offset, offset + limit - 1)
-    
-    result = query.execute()
-    
-    return [PaymentRequestResponse(**payment) for payment in result.data]
+    page_cursor = decode_cursor(cursor)
+    payments, has_more = await payment_requests.list_for_merchant(
+        current_merchant["id"],
+        status=status.value if status else None,
+        chain=chain.value if chain else None,
+        token=token.value if token else None,
+        limit=limit,
+        offset=offset,
+        cursor=page_cursor
+    )
+    set_page_headers(response, payments, has_more, page_cursor, offset)
+    
+    return [PaymentRequestResponse(**payment) for payment in payments]
 
 @router.put("/{payment_id}", response_model=PaymentRequestResponse)
 async def update_payment_request(
@@ -107,12 +101,10 @@ async def update_payment_request(
     current_merchant: dict = Depends(get_current_merchant)
 ):
     """Update payment request"""
-    supabase = get_supabase()
-    
     # Check if payment request exists and belongs to merchant
-    existing = supabase.table("payment_requests").select("id").eq("payment_id", payment_id).eq("merchant_id", current_merchant["id"]).execute()
+    existing = await payment_requests.get(payment_id, current_merchant["id"], columns="id")
     
-    if not existing.data:
+    if not existing:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Payment request not found"
@@ -126,15 +118,14 @@ async def update_payment_request(
         update_dict["metadata"] = update_data.metadata
     
     # Update payment request
-    result = supabase.table("payment_requests").update(update_dict).eq("payment_id", payment_id).execute()
+    updated_payment = await payment_requests.update(existing["id"], update_dict)
     
-    if not result.data:
+    if not updated_payment:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to update payment request"
         )
     
-    updated_payment = result.data[0]
     return PaymentRequestResponse(**updated_payment)
 
 @router.get("/{payment_id}/transactions", response_model=List[TransactionResponse])
@@ -143,23 +134,19 @@ async def get_payment_transactions(
     current_merchant: dict = Depends(get_current_merchant)
 ):
     """Get all transactions for a payment request"""
-    supabase = get_supabase()
-    
     # First verify payment request belongs to merchant
-    payment_result = supabase.table("payment_requests").select("id").eq("payment_id", payment_id).eq("merchant_id", current_merchant["id"]).execute()
+    payment = await payment_requests.get(payment_id, current_merchant["id"], columns="id")
     
-    if not payment_result.data:
+    if not payment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Payment request not found"
         )
     
-    payment_request_id = payment_result.data[0]["id"]
-    
     # Get transactions
-    result = supabase.table("transactions").select("*").eq("payment_request_id", payment_request_id).order("created_at", desc=True).execute()
+    txs = await transactions.list_for_payment_request(payment["id"])
     
-    return [TransactionResponse(**tx) for tx in result.data]
+    return [TransactionResponse(**tx) for tx in txs]
 
 @router.post("/{payment_id}/verify")
 async def verify_payment(
@@ -168,18 +155,15 @@ async def verify_payment(
     current_merchant: dict = Depends(get_current_merchant)
 ):
     """Verify a payment transaction"""
-    supabase = get_supabase()
-    
     # Get payment request
-    payment_result = supabase.table("payment_requests").select("*").eq("payment_id", payment_id).eq("merchant_id", current_merchant["id"]).execute()
+    payment = await payment_requests.get(payment_id, current_merchant["id"])
     
-    if not payment_result.data:
+    if not payment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Payment request not found"
         )
     
-    payment = payment_result.data[0]
     
     # Get transaction status from blockchain
     try:
@@ -188,11 +172,12 @@ async def verify_payment(
         
         if tx_status["status"] == "confirmed":
             # Update payment status
-            supabase.table("payment_requests").update({"status": PaymentStatus.COMPLETED.value}).eq("id", payment["id"]).execute()
+            await payment_requests.update(payment["id"], {"status": PaymentStatus.COMPLETED.value})
             
             # Create transaction record
             transaction_data = {
                 "payment_request_id": payment["id"],
+                "merchant_id": current_merchant["id"],
                 "tx_hash": tx_hash,
                 "chain": payment["chain"],
                 "token": payment["token"],
@@ -200,13 +185,13 @@ async def verify_payment(
                 "from_address": tx_status.get("from", ""),
                 "to_address": payment["recipient_address"],
                 "block_number": tx_status.get("block_number"),
-                "confirmation_count": 1,
+                "confirmation_count": await blockchain_manager.get_confirmations(chain, tx_status.get("block_number")),
                 "status": "confirmed",
                 "gas_used": tx_status.get("gas_used"),
                 "gas_price": tx_status.get("gas_price")
             }
             
-            supabase.table("transactions").insert(transaction_data).execute()
+            await transactions.create(transaction_data)
             
             return {"message": "Payment verified successfully", "status": "confirmed"}
         else:
@@ -224,18 +209,15 @@ async def refund_payment(
     current_merchant: dict = Depends(get_current_merchant)
 ):
     """Refund a payment (mark as refunded)"""
-    supabase = get_supabase()
-    
     # Get payment request
-    payment_result = supabase.table("payment_requests").select("*").eq("payment_id", payment_id).eq("merchant_id", current_merchant["id"]).execute()
+    payment = await payment_requests.get(payment_id, current_merchant["id"])
     
-    if not payment_result.data:
+    if not payment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Payment request not found"
         )
     
-    payment = payment_result.data[0]
     
     # Check if payment can be refunded
     if payment["status"] != PaymentStatus.COMPLETED.value:
@@ -245,9 +227,9 @@ async def refund_payment(
         )
     
     # Update payment status
-    result = supabase.table("payment_requests").update({"status": PaymentStatus.REFUNDED.value}).eq("id", payment["id"]).execute()
+    result = await payment_requests.update(payment["id"], {"status": PaymentStatus.REFUNDED.value})
     
-    if not result.data:
+    if not result:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to refund payment"
@@ -261,24 +243,21 @@ async def get_payment_status(
     current_merchant: dict = Depends(get_current_merchant)
 ):
     """Get current payment status"""
-    supabase = get_supabase()
-    
-    result = supabase.table("payment_requests").select("status, created_at, expires_at").eq("payment_id", payment_id).eq("merchant_id", current_merchant["id"]).execute()
+    payment = await payment_requests.get(payment_id, current_merchant["id"], columns="id, status, created_at, expires_at")
     
-    if not result.data:
+    if not payment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Payment request not found"
         )
     
-    payment = result.data[0]
     
     # Check if payment has expired
     if payment["status"] == PaymentStatus.PENDING.value:
         expires_at = datetime.fromisoformat(payment["expires_at"].replace('Z', '+00:00'))
         if datetime.utcnow().replace(tzinfo=expires_at.tzinfo) > expires_at:
             # Update status to expired
-            supabase.table("payment_requests").update({"status": PaymentStatus.EXPIRED.value}).eq("payment_id", payment_id).execute()
+            await payment_requests.update(payment["id"], {"status": PaymentStatus.EXPIRED.value})
             payment["status"] = PaymentStatus.EXPIRED.value
     
     return {
@@ -1,11 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from typing import List, Optional
 from decimal import Decimal
 import uuid
 
 from app.models import PayoutCreate, PayoutResponse, ChainType, TokenType
 from app.core.security import get_current_merchant
-from app.database import get_supabase
+from app.core.responses import DecimalJSONResponse
+from app.core.pagination import decode_cursor, set_page_headers
+from app.repositories import merchant_wallets, payouts as payouts_repo
 from app.blockchain.manager import blockchain_manager
 from app.routers.webhooks import send_webhook
 
@@ -17,18 +19,15 @@ async def create_payout(
     current_merchant: dict = Depends(get_current_merchant)
 ):
     """Create a new payout request"""
-    supabase = get_supabase()
-    
     # Check if merchant has sufficient balance
-    merchant_wallets = supabase.table("merchant_wallets").select("*").eq("merchant_id", current_merchant["id"]).eq("chain", payout_data.chain.value).eq("is_active", True).execute()
+    wallet = await merchant_wallets.get_for_chain(current_merchant["id"], payout_data.chain.value, active_only=True)
     
-    if not merchant_wallets.data:
+    if not wallet:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"No active wallet found for {payout_data.chain.value}"
         )
     
-    wallet = merchant_wallets.data[0]
     
     # Check balance
     try:
@@ -58,15 +57,14 @@ async def create_payout(
         "status": "pending"
     }
     
-    result = supabase.table("payouts").insert(payout).execute()
+    created_payout = await payouts_repo.create(payout)
     
-    if not result.data:
+    if not created_payout:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to create payout"
         )
     
-    created_payout = result.data[0]
     
     # Send webhook notification
     await send_webhook(
@@ -89,18 +87,15 @@ async def execute_payout(
     current_merchant: dict = Depends(get_current_merchant)
 ):
     """Execute a payout transaction"""
-    supabase = get_supabase()
-    
     # Get payout details
-    payout_result = supabase.table("payouts").select("*").eq("payout_id", payout_id).eq("merchant_id", current_merchant["id"]).execute()
+    payout = await payouts_repo.get(payout_id, current_merchant["id"])
     
-    if not payout_result.data:
+    if not payout:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Payout not found"
         )
     
-    payout = payout_result.data[0]
     
     if payout["status"] != "pending":
         raise HTTPException(
@@ -109,15 +104,14 @@ async def execute_payout(
         )
     
     # Get merchant wallet
-    wallet_result = supabase.table("merchant_wallets").select("*").eq("merchant_id", current_merchant["id"]).eq("chain", payout["chain"]).eq("is_active", True).execute()
+    wallet = await merchant_wallets.get_for_chain(current_merchant["id"], payout["chain"], active_only=True)
     
-    if not wallet_result.data:
+    if not wallet:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No active wallet found for this chain"
         )
     
-    wallet = wallet_result.data[0]
     
     if not wallet.get("private_key_encrypted"):
         raise HTTPException(
@@ -141,10 +135,10 @@ async def execute_payout(
         )
         
         # Update payout status
-        supabase.table("payouts").update({
+        await payouts_repo.update(payout["id"], {
             "status": "completed",
             "tx_hash": tx_hash
-        }).eq("id", payout["id"]).execute()
+        })
         
         # Send webhook notification
         await send_webhook(
@@ -169,9 +163,9 @@ async def execute_payout(
         
     except Exception as e:
         # Update payout status to failed
-        supabase.table("payouts").update({
+        await payouts_repo.update(payout["id"], {
             "status": "failed"
-        }).eq("id", payout["id"]).execute()
+        })
         
         # Send webhook notification
         await send_webhook(
@@ -194,30 +188,52 @@ async def execute_payout(
 
 @router.get("/", response_model=List[PayoutResponse])
 async def list_payouts(
+    response: Response,
     current_merchant: dict = Depends(get_current_merchant),
     chain: Optional[ChainType] = Query(None),
     token: Optional[TokenType] = Query(None),
     status: Optional[str] = Query(None),
     limit: int = Query(50, le=100),
-    offset: int = Query(0, ge=0)
+    offset: int = Query(0, ge=0, deprecated=True),
+    cursor: Optional[str] = Query(None)
 ):
     """List payouts with optional filters"""
-    supabase = get_supabase()
-    
-    query = supabase.table("payouts").select("*").eq("merchant_id", current_merchant["id"])
-    
-    if chain:
-        query = query.eq("chain", chain.value)
-    if token:
-        query = query.eq("token", token.value)
-    if status:
-        query = query.eq("status", status)
-    
-    query = query.order("created_at", desc=True).range(offset, offset + limit - 1)
+    page_cursor = decode_cursor(cursor)
+    payouts, has_more = await payouts_repo.list_for_merchant(
+        current_merchant["id"],
+        chain=chain.value if chain else None,
+        token=token.value if token else None,
+        status=status,
+        limit=limit,
+        offset=offset,
+        cursor=page_cursor
+    )
+    set_page_headers(response, payouts, has_more, page_cursor, offset)
     
-    result = query.execute()
+    return [PayoutResponse(**payout) for payout in payouts]
+
+@router.get("/quote")
+async def quote_payout(
+    chain: ChainType = Query(...),
+    token: TokenType = Query(...),
+    urgency: Optional[str] = Query(None, description="slow, standard or fast; all three if omitted"),
+    current_merchant: dict = Depends(get_current_merchant)
+):
+    """Get fee options for a payout (served from the cached fee suggestions, no RPC call while they are fresh)"""
+    try:
+        quote = await blockchain_manager.get_fee_quote(chain, token, urgency)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get fee quote: {str(e)}"
+        )
     
-    return [PayoutResponse(**payout) for payout in result.data]
+    return DecimalJSONResponse(quote)
 
 @router.get("/{payout_id}", response_model=PayoutResponse)
 async def get_payout(
@@ -225,17 +241,14 @@ async def get_payout(
     current_merchant: dict = Depends(get_current_merchant)
 ):
     """Get payout details"""
-    supabase = get_supabase()
+    payout = await payouts_repo.get(payout_id, current_merchant["id"])
     
-    result = supabase.table("payouts").select("*").eq("payout_id", payout_id).eq("merchant_id", current_merchant["id"]).execute()
-    
-    if not result.data:
+    if not payout:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Payout not found"
         )
     
-    payout = result.data[0]
     return PayoutResponse(**payout)
 
 @router.post("/batch")
@@ -275,57 +288,27 @@ async def get_payout_stats(
     days: int = Query(30, ge=1, le=365)
 ):
     """Get payout statistics summary"""
-    supabase = get_supabase()
-    
     from datetime import datetime, timedelta
     
     # Calculate date range
     end_date = datetime.utcnow()
     start_date = end_date - timedelta(days=days)
     
-    # Get payout counts by status
-    status_query = supabase.table("payouts").select("status").select("count", count="exact").eq("merchant_id", current_merchant["id"]).gte("created_at", start_date.isoformat())
-    
-    # Get total volume by token
-    volume_query = supabase.table("payouts").select("token, amount").eq("merchant_id", current_merchant["id"]).eq("status", "completed").gte("created_at", start_date.isoformat())
-    
-    # Get payouts by chain
-    chain_query = supabase.table("payouts").select("chain").select("count", count="exact").eq("merchant_id", current_merchant["id"]).gte("created_at", start_date.isoformat())
-    
     try:
-        # Execute queries
-        status_result = status_query.execute()
-        volume_result = volume_query.execute()
-        chain_result = chain_query.execute()
-        
-        # Process results
-        status_counts = {}
-        for row in status_result.data:
-            status_counts[row["status"]] = row["count"]
-        
-        token_volumes = {}
-        for row in volume_result.data:
-            token = row["token"]
-            amount = float(row["amount"])
-            if token not in token_volumes:
-                token_volumes[token] = 0
-            token_volumes[token] += amount
+        # Grouped counts and exact volumes come back from the database in one round trip
+        stats = await payouts_repo.summarize(current_merchant["id"], since=start_date)
         
-        chain_counts = {}
-        for row in chain_result.data:
-            chain_counts[row["chain"]] = row["count"]
-        
-        return {
+        return DecimalJSONResponse({
             "period_days": days,
-            "total_payouts": sum(status_counts.values()),
-            "status_breakdown": status_counts,
-            "token_volumes": token_volumes,
-            "chain_breakdown": chain_counts,
+            "total_payouts": sum(stats["status_breakdown"].values()),
+            "status_breakdown": stats["status_breakdown"],
+            "token_volumes": stats["token_volumes"],
+            "chain_breakdown": stats["chain_breakdown"],
             "date_range": {
                 "start": start_date.isoformat(),
                 "end": end_date.isoformat()
             }
-        }
+        })
         
     except Exception as e:
         raise HTTPException(
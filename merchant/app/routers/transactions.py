@@ -1,47 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
+import asyncio
 
 from app.models import TransactionResponse, ChainType, TokenType, TransactionStatus
 from app.core.security import get_current_merchant
-from app.database import get_supabase
+from app.core.responses import DecimalJSONResponse
+from app.core.pagination import decode_cursor, set_page_headers
+from app.repositories import transactions
 from app.blockchain.manager import blockchain_manager
+from app.blockchain.heads import confirmation_count
 
 router = APIRouter()
 
 @router.get("/", response_model=List[TransactionResponse])
 async def list_transactions(
+    response: Response,
     current_merchant: dict = Depends(get_current_merchant),
     chain: Optional[ChainType] = Query(None),
     token: Optional[TokenType] = Query(None),
     status: Optional[TransactionStatus] = Query(None),
     tx_hash: Optional[str] = Query(None),
     limit: int = Query(50, le=100),
-    offset: int = Query(0, ge=0)
+    offset: int = Query(0, ge=0, deprecated=True),
+    cursor: Optional[str] = Query(None)
 ):
     """List transactions with optional filters"""
-    supabase = get_supabase()
-    
-    # Build query with joins to get merchant's transactions
-    query = supabase.table("transactions").select("""
-        *,
-        payment_requests!inner(merchant_id)
-    """).eq("payment_requests.merchant_id", current_merchant["id"])
-    
-    if chain:
-        query = query.eq("chain", chain.value)
-    if token:
-        query = query.eq("token", token.value)
-    if status:
-        query = query.eq("status", status.value)
-    if tx_hash:
-        query = query.eq("tx_hash", tx_hash)
-    
-    query = query.order("created_at", desc=True).range(offset, offset + limit - 1)
-    
-    result = query.execute()
-    
-    return [TransactionResponse(**tx) for tx in result.data]
+    page_cursor = decode_cursor(cursor)
+    txs, has_more = await transactions.list_for_merchant(
+        current_merchant["id"],
+        chain=chain.value if chain else None,
+        token=token.value if token else None,
+        status=status.value if status else None,
+        tx_hash=tx_hash,
+        limit=limit,
+        offset=offset,
+        cursor=page_cursor
+    )
+    set_page_headers(response, txs, has_more, page_cursor, offset)
+    
+    return [TransactionResponse(**tx) for tx in txs]
 
 @router.get("/{tx_hash}", response_model=TransactionResponse)
 async def get_transaction(
@@ -49,20 +47,14 @@ async def get_transaction(
     current_merchant: dict = Depends(get_current_merchant)
 ):
     """Get transaction details by hash"""
-    supabase = get_supabase()
-    
-    result = supabase.table("transactions").select("""
-        *,
-        payment_requests!inner(merchant_id)
-    """).eq("tx_hash", tx_hash).eq("payment_requests.merchant_id", current_merchant["id"]).execute()
+    tx = await transactions.get_by_hash(tx_hash, current_merchant["id"])
     
-    if not result.data:
+    if not tx:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Transaction not found"
         )
     
-    tx = result.data[0]
     return TransactionResponse(**tx)
 
 @router.post("/{tx_hash}/refresh")
@@ -71,21 +63,15 @@ async def refresh_transaction_status(
     current_merchant: dict = Depends(get_current_merchant)
 ):
     """Refresh transaction status from blockchain"""
-    supabase = get_supabase()
-    
     # Get transaction details
-    tx_result = supabase.table("transactions").select("""
-        *,
-        payment_requests!inner(merchant_id)
-    """).eq("tx_hash", tx_hash).eq("payment_requests.merchant_id", current_merchant["id"]).execute()
+    tx = await transactions.get_by_hash(tx_hash, current_merchant["id"])
     
-    if not tx_result.data:
+    if not tx:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Transaction not found"
         )
     
-    tx = tx_result.data[0]
     
     try:
         # Get updated status from blockchain
@@ -101,11 +87,11 @@ async def refresh_transaction_status(
         }
         
         if tx_status["status"] == "confirmed":
-            update_data["confirmation_count"] = 1  # In production, calculate actual confirmations
+            update_data["confirmation_count"] = await blockchain_manager.get_confirmations(chain, tx_status.get("block_number"))
         
-        result = supabase.table("transactions").update(update_data).eq("id", tx["id"]).execute()
+        result = await transactions.update(tx["id"], update_data)
         
-        if not result.data:
+        if not result:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to update transaction status"
@@ -129,55 +115,25 @@ async def get_transaction_stats(
     days: int = Query(30, ge=1, le=365)
 ):
     """Get transaction statistics summary"""
-    supabase = get_supabase()
-    
     # Calculate date range
     end_date = datetime.utcnow()
     start_date = end_date - timedelta(days=days)
     
-    # Get transaction counts by status
-    status_query = supabase.table("transactions").select("status").select("count", count="exact").eq("payment_requests.merchant_id", current_merchant["id"]).gte("created_at", start_date.isoformat())
-    
-    # Get total volume by token
-    volume_query = supabase.table("transactions").select("token, amount").eq("payment_requests.merchant_id", current_merchant["id"]).eq("status", "confirmed").gte("created_at", start_date.isoformat())
-    
-    # Get transactions by chain
-    chain_query = supabase.table("transactions").select("chain").select("count", count="exact").eq("payment_requests.merchant_id", current_merchant["id"]).gte("created_at", start_date.isoformat())
-    
     try:
-        # Execute queries
-        status_result = status_query.execute()
-        volume_result = volume_query.execute()
-        chain_result = chain_query.execute()
-        
-        # Process results
-        status_counts = {}
-        for row in status_result.data:
-            status_counts[row["status"]] = row["count"]
+        # Grouped counts and exact volumes come back from the database in one round trip
+        stats = await transactions.summarize(current_merchant["id"], since=start_date)
         
-        token_volumes = {}
-        for row in volume_result.data:
-            token = row["token"]
-            amount = float(row["amount"])
-            if token not in token_volumes:
-                token_volumes[token] = 0
-            token_volumes[token] += amount
-        
-        chain_counts = {}
-        for row in chain_result.data:
-            chain_counts[row["chain"]] = row["count"]
-        
-        return {
+        return DecimalJSONResponse({
             "period_days": days,
-            "total_transactions": sum(status_counts.values()),
-            "status_breakdown": status_counts,
-            "token_volumes": token_volumes,
-            "chain_breakdown": chain_counts,
+            "total_transactions": sum(stats["status_breakdown"].values()),
+            "status_breakdown": stats["status_breakdown"],
+            "token_volumes": stats["token_volumes"],
+            "chain_breakdown": stats["chain_breakdown"],
             "date_range": {
                 "start": start_date.isoformat(),
                 "end": end_date.isoformat()
             }
-        }
+        })
         
     except Exception as e:
         raise HTTPException(
@@ -190,23 +146,36 @@ async def check_pending_transactions(
     current_merchant: dict = Depends(get_current_merchant)
 ):
     """Check and update status of pending transactions"""
-    supabase = get_supabase()
-    
     # Get all pending transactions for this merchant
-    pending_txs = supabase.table("transactions").select("""
-        *,
-        payment_requests!inner(merchant_id)
-    """).eq("payment_requests.merchant_id", current_merchant["id"]).eq("status", "pending").execute()
+    pending_txs = await transactions.list_pending(current_merchant["id"])
     
     updated_count = 0
     
-    for tx in pending_txs.data:
+    # One batched status lookup per chain, all chains in parallel
+    by_chain: Dict[ChainType, List[dict]] = {}
+    for tx in pending_txs:
+        by_chain.setdefault(ChainType(tx["chain"]), []).append(tx)
+    
+    async def chain_statuses(chain: ChainType, txs: List[dict]) -> Tuple[List[Optional[dict]], int]:
+        try:
+            # EVM heads are tracked in memory, so asking for the head costs no RPC call there
+            return await asyncio.gather(
+                blockchain_manager.get_transaction_statuses(chain, [tx["tx_hash"] for tx in txs]),
+                blockchain_manager.get_latest_block_number(chain)
+            )
+        except Exception:
+            return [None] * len(txs), 0
+    
+    results = await asyncio.gather(*(chain_statuses(chain, txs) for chain, txs in by_chain.items()))
+    checked = [
+        (tx, tx_status, head)
+        for txs, (statuses, head) in zip(by_chain.values(), results)
+        for tx, tx_status in zip(txs, statuses)
+    ]
+    
+    for tx, tx_status, head in checked:
         try:
-            # Get updated status from blockchain
-            chain = ChainType(tx["chain"])
-            tx_status = await blockchain_manager.get_transaction_status(chain, tx["tx_hash"])
-            
-            if tx_status["status"] != "pending":
+            if tx_status is not None and tx_status["status"] != "pending":
                 # Update transaction status
                 update_data = {
                     "status": tx_status["status"],
@@ -216,9 +185,9 @@ async def check_pending_transactions(
                 }
                 
                 if tx_status["status"] == "confirmed":
-                    update_data["confirmation_count"] = 1
+                    update_data["confirmation_count"] = confirmation_count(head, tx_status.get("block_number"))
                 
-                supabase.table("transactions").update(update_data).eq("id", tx["id"]).execute()
+                await transactions.update(tx["id"], update_data)
                 updated_count += 1
                 
         except Exception:
@@ -226,6 +195,6 @@ async def check_pending_transactions(
             continue
     
     return {
-        "message": f"Checked {len(pending_txs.data)} pending transactions",
+        "message": f"Checked {len(pending_txs)} pending transactions",
         "updated": updated_count
     }
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from decimal import Decimal
+import asyncio
 import uuid
 
 from app.models import (
@@ -8,8 +9,9 @@ from app.models import (
     ChainType, TokenType
 )
 from app.core.security import get_current_merchant
-from app.database import get_supabase
+from app.repositories import merchant_wallets
 from app.blockchain.manager import blockchain_manager
+from app.blockchain.tokens import token_registry
 
 router = APIRouter()
 
@@ -19,12 +21,10 @@ async def create_wallet(
     current_merchant: dict = Depends(get_current_merchant)
 ):
     """Create a new wallet for a specific chain"""
-    supabase = get_supabase()
-    
     # Check if wallet already exists for this chain
-    existing = supabase.table("merchant_wallets").select("id").eq("merchant_id", current_merchant["id"]).eq("chain", wallet_data.chain.value).execute()
+    existing = await merchant_wallets.get_for_chain(current_merchant["id"], wallet_data.chain.value, columns="id")
     
-    if existing.data:
+    if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Wallet already exists for {wallet_data.chain.value}"
@@ -46,15 +46,14 @@ async def create_wallet(
         "is_active": True
     }
     
-    result = supabase.table("merchant_wallets").insert(wallet).execute()
+    created_wallet = await merchant_wallets.create(wallet)
     
-    if not result.data:
+    if not created_wallet:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to create wallet"
         )
     
-    created_wallet = result.data[0]
     return WalletResponse(**created_wallet)
 
 @router.get("/", response_model=List[WalletResponse])
@@ -64,20 +63,13 @@ async def list_wallets(
     active_only: bool = Query(True)
 ):
     """List merchant wallets with optional filters"""
-    supabase = get_supabase()
-    
-    query = supabase.table("merchant_wallets").select("*").eq("merchant_id", current_merchant["id"])
-    
-    if chain:
-        query = query.eq("chain", chain.value)
-    if active_only:
-        query = query.eq("is_active", True)
-    
-    query = query.order("created_at", desc=True)
-    
-    result = query.execute()
+    wallets = await merchant_wallets.list_for_merchant(
+        current_merchant["id"],
+        chain=chain.value if chain else None,
+        active_only=active_only
+    )
     
-    return [WalletResponse(**wallet) for wallet in result.data]
+    return [WalletResponse(**wallet) for wallet in wallets]
 
 @router.get("/{wallet_id}", response_model=WalletResponse)
 async def get_wallet(
@@ -85,19 +77,44 @@ async def get_wallet(
     current_merchant: dict = Depends(get_current_merchant)
 ):
     """Get wallet details"""
-    supabase = get_supabase()
+    wallet = await merchant_wallets.get(wallet_id, current_merchant["id"])
     
-    result = supabase.table("merchant_wallets").select("*").eq("id", wallet_id).eq("merchant_id", current_merchant["id"]).execute()
-    
-    if not result.data:
+    if not wallet:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Wallet not found"
         )
     
-    wallet = result.data[0]
     return WalletResponse(**wallet)
 
+async def wallet_balances(wallets: List[dict]) -> List[BalanceResponse]:
+    """Balances of every supported token in `wallets`, one batched read per chain with all chains in parallel"""
+    by_chain: Dict[ChainType, List[Tuple[dict, TokenType]]] = {}
+    for wallet in wallets:
+        chain = ChainType(wallet["chain"])
+        for token in token_registry.symbols(chain):
+            by_chain.setdefault(chain, []).append((wallet, token))
+    
+    async def read_chain(chain: ChainType, pairs: List[Tuple[dict, TokenType]]) -> List[Optional[Decimal]]:
+        try:
+            return await blockchain_manager.get_balances(chain, [(wallet["address"], token) for wallet, token in pairs])
+        except Exception:
+            return [None] * len(pairs)
+    
+    results = await asyncio.gather(*(read_chain(chain, pairs) for chain, pairs in by_chain.items()))
+    
+    balances = []
+    for pairs, chain_balances in zip(by_chain.values(), results):
+        for (wallet, token), balance in zip(pairs, chain_balances):
+            balances.append(BalanceResponse(
+                chain=wallet["chain"],
+                token=token.value,
+                # If balance check fails, report zero balance
+                balance=balance if balance is not None else Decimal(0),
+                address=wallet["address"]
+            ))
+    return balances
+
 @router.get("/{wallet_id}/balance", response_model=BalanceResponse)
 async def get_wallet_balance(
     wallet_id: str,
@@ -105,18 +122,15 @@ async def get_wallet_balance(
     current_merchant: dict = Depends(get_current_merchant)
 ):
     """Get wallet balance for a specific token"""
-    supabase = get_supabase()
-    
     # Get wallet details
-    wallet_result = supabase.table("merchant_wallets").select("*").eq("id", wallet_id).eq("merchant_id", current_merchant["id"]).execute()
+    wallet = await merchant_wallets.get(wallet_id, current_merchant["id"])
     
-    if not wallet_result.data:
+    if not wallet:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Wallet not found"
         )
     
-    wallet = wallet_result.data[0]
     
     try:
         # Get balance from blockchain
@@ -142,103 +156,26 @@ async def get_wallet_balances(
     current_merchant: dict = Depends(get_current_merchant)
 ):
     """Get wallet balances for all supported tokens on this chain"""
-    supabase = get_supabase()
-    
     # Get wallet details
-    wallet_result = supabase.table("merchant_wallets").select("*").eq("id", wallet_id).eq("merchant_id", current_merchant["id"]).execute()
+    wallet = await merchant_wallets.get(wallet_id, current_merchant["id"])
     
-    if not wallet_result.data:
+    if not wallet:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Wallet not found"
         )
     
-    wallet = wallet_result.data[0]
-    chain = ChainType(wallet["chain"])
-    
-    # Get supported tokens for this chain
-    supported_tokens = []
-    if chain == ChainType.ETHEREUM:
-        supported_tokens = [TokenType.USDC, TokenType.USDT, TokenType.DAI]
-    elif chain == ChainType.POLYGON:
-        supported_tokens = [TokenType.USDC, TokenType.USDT, TokenType.DAI]
-    elif chain == ChainType.BSC:
-        supported_tokens = [TokenType.USDC, TokenType.USDT, TokenType.BUSD]
-    elif chain == ChainType.AVALANCHE:
-        supported_tokens = [TokenType.USDC, TokenType.USDT, TokenType.DAI]
-    elif chain == ChainType.TRON:
-        supported_tokens = [TokenType.USDC, TokenType.USDT]
-    elif chain == ChainType.SOLANA:
-        supported_tokens = [TokenType.USDC, TokenType.USDT]
-    
-    balances = []
-    for token in supported_tokens:
-        try:
-            balance = await blockchain_manager.get_balance(chain, wallet["address"], token)
-            balances.append(BalanceResponse(
-                chain=wallet["chain"],
-                token=token.value,
-                balance=balance,
-                address=wallet["address"]
-            ))
-        except Exception:
-            # If balance check fails, add zero balance
-            balances.append(BalanceResponse(
-                chain=wallet["chain"],
-                token=token.value,
-                balance=Decimal(0),
-                address=wallet["address"]
-            ))
-    
-    return balances
+    return await wallet_balances([wallet])
 
 @router.get("/balances/all", response_model=MerchantBalancesResponse)
 async def get_all_balances(
     current_merchant: dict = Depends(get_current_merchant)
 ):
     """Get all balances across all chains and tokens"""
-    supabase = get_supabase()
-    
     # Get all active wallets
-    wallets_result = supabase.table("merchant_wallets").select("*").eq("merchant_id", current_merchant["id"]).eq("is_active", True).execute()
+    wallets = await merchant_wallets.list_for_merchant(current_merchant["id"], active_only=True)
     
-    all_balances = []
-    
-    for wallet in wallets_result.data:
-        chain = ChainType(wallet["chain"])
-        
-        # Get supported tokens for this chain
-        supported_tokens = []
-        if chain == ChainType.ETHEREUM:
-            supported_tokens = [TokenType.USDC, TokenType.USDT, TokenType.DAI]
-        elif chain == ChainType.POLYGON:
-            supported_tokens = [TokenType.USDC, TokenType.USDT, TokenType.DAI]
-        elif chain == ChainType.BSC:
-            supported_tokens = [TokenType.USDC, TokenType.USDT, TokenType.BUSD]
-        elif chain == ChainType.AVALANCHE:
-            supported_tokens = [TokenType.USDC, TokenType.USDT, TokenType.DAI]
-        elif chain == ChainType.TRON:
-            supported_tokens = [TokenType.USDC, TokenType.USDT]
-        elif chain == ChainType.SOLANA:
-            supported_tokens = [TokenType.USDC, TokenType.USDT]
-        
-        for token in supported_tokens:
-            try:
-                balance = await blockchain_manager.get_balance(chain, wallet["address"], token)
-                all_balances.append(BalanceResponse(
-                    chain=wallet["chain"],
-                    token=token.value,
-                    balance=balance,
-                    address=wallet["address"]
-                ))
-            except Exception:
-                # If balance check fails, add zero balance
-                all_balances.append(BalanceResponse(
-                    chain=wallet["chain"],
-                    token=token.value,
-                    balance=Decimal(0),
-                    address=wallet["address"]
-                ))
+    all_balances = await wallet_balances(wallets)
     
     return MerchantBalancesResponse(
         merchant_id=current_merchant["id"],
@@ -251,21 +188,19 @@ async def deactivate_wallet(
     current_merchant: dict = Depends(get_current_merchant)
 ):
     """Deactivate a wallet"""
-    supabase = get_supabase()
-    
     # Check if wallet exists and belongs to merchant
-    existing = supabase.table("merchant_wallets").select("id").eq("id", wallet_id).eq("merchant_id", current_merchant["id"]).execute()
+    existing = await merchant_wallets.get(wallet_id, current_merchant["id"], columns="id")
     
-    if not existing.data:
+    if not existing:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Wallet not found"
         )
     
     # Deactivate wallet
-    result = supabase.table("merchant_wallets").update({"is_active": False}).eq("id", wallet_id).execute()
+    result = await merchant_wallets.update(wallet_id, {"is_active": False})
     
-    if not result.data:
+    if not result:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to deactivate wallet"
@@ -279,21 +214,19 @@ async def activate_wallet(
     current_merchant: dict = Depends(get_current_merchant)
 ):
     """Activate a wallet"""
-    supabase = get_supabase()
-    
     # Check if wallet exists and belongs to merchant
-    existing = supabase.table("merchant_wallets").select("id").eq("id", wallet_id).eq("merchant_id", current_merchant["id"]).execute()
+    existing = await merchant_wallets.get(wallet_id, current_merchant["id"], columns="id")
     
-    if not existing.data:
+    if not existing:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Wallet not found"
         )
     
     # Activate wallet
-    result = supabase.table("merchant_wallets").update({"is_active": True}).eq("id", wallet_id).execute()
+    result = await merchant_wallets.update(wallet_id, {"is_active": True})
     
-    if not result.data:
+    if not result:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to activate wallet"
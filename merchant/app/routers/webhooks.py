@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request, Header
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request, Response, Header
 from typing import List, Optional
 from datetime import datetime
 import json
@@ -8,22 +8,21 @@ import hmac
 
 from app.models import WebhookLogResponse, WebhookEvent
 from app.core.security import get_current_merchant, verify_webhook_signature
-from app.database import get_supabase
+from app.core.pagination import decode_cursor, set_page_headers
+from app.repositories import merchants, webhook_logs
 from app.core.config import settings
 
 router = APIRouter()
 
 async def send_webhook(merchant_id: str, event_type: str, data: dict):
     """Send webhook to merchant"""
-    supabase = get_supabase()
-    
     # Get merchant webhook URL
-    merchant_result = supabase.table("merchants").select("webhook_url").eq("id", merchant_id).execute()
+    merchant = await merchants.get_cached(merchant_id)
     
-    if not merchant_result.data or not merchant_result.data[0].get("webhook_url"):
+    if not merchant or not merchant.get("webhook_url"):
         return None
     
-    webhook_url = merchant_result.data[0]["webhook_url"]
+    webhook_url = merchant["webhook_url"]
     
     # Prepare webhook payload
     payload = {
@@ -62,7 +61,7 @@ async def send_webhook(merchant_id: str, event_type: str, data: dict):
                 "retry_count": 0
             }
             
-            supabase.table("webhook_logs").insert(webhook_log).execute()
+            await webhook_logs.record(webhook_log)
             
             return response.status_code == 200
             
@@ -77,7 +76,7 @@ async def send_webhook(merchant_id: str, event_type: str, data: dict):
             "retry_count": 0
         }
         
-        supabase.table("webhook_logs").insert(webhook_log).execute()
+        await webhook_logs.record(webhook_log)
         
         return False
 
@@ -105,24 +104,25 @@ async def test_webhook(
 
 @router.get("/logs", response_model=List[WebhookLogResponse])
 async def get_webhook_logs(
+    response: Response,
     current_merchant: dict = Depends(get_current_merchant),
-    event_type: Optional[str] = None,
-    limit: int = 50,
-    offset: int = 0
+    event_type: Optional[str] = Query(None),
+    limit: int = Query(50, le=100),
+    offset: int = Query(0, ge=0, deprecated=True),
+    cursor: Optional[str] = Query(None)
 ):
     """Get webhook delivery logs"""
-    supabase = get_supabase()
-    
-    query = supabase.table("webhook_logs").select("*").eq("merchant_id", current_merchant["id"])
-    
-    if event_type:
-        query = query.eq("event_type", event_type)
-    
-    query = query.order("created_at", desc=True).range(offset, offset + limit - 1)
-    
-    result = query.execute()
+    page_cursor = decode_cursor(cursor)
+    logs, has_more = await webhook_logs.list_for_merchant(
+        current_merchant["id"],
+        event_type=event_type,
+        limit=limit,
+        offset=offset,
+        cursor=page_cursor
+    )
+    set_page_headers(response, logs, has_more, page_cursor, offset)
     
-    return [WebhookLogResponse(**log) for log in result.data]
+    return [WebhookLogResponse(**log) for log in logs]
 
 @router.post("/retry/{log_id}")
 async def retry_webhook(
@@ -130,19 +130,15 @@ async def retry_webhook(
     current_merchant: dict = Depends(get_current_merchant)
 ):
     """Retry a failed webhook"""
-    supabase = get_supabase()
-    
     # Get webhook log
-    log_result = supabase.table("webhook_logs").select("*").eq("id", log_id).eq("merchant_id", current_merchant["id"]).execute()
+    log = await webhook_logs.get(log_id, current_merchant["id"])
     
-    if not log_result.data:
+    if not log:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Webhook log not found"
         )
     
-    log = log_result.data[0]
-    
     # Check retry count
     if log["retry_count"] >= 5:
         raise HTTPException(
@@ -158,9 +154,9 @@ async def retry_webhook(
     )
     
     # Update retry count
-    supabase.table("webhook_logs").update({
+    await webhook_logs.update(log_id, {
         "retry_count": log["retry_count"] + 1
-    }).eq("id", log_id).execute()
+    })
     
     return {
         "success": success,
@@ -203,7 +199,6 @@ async def receive_webhook(
             )
         
         # Log incoming webhook
-        supabase = get_supabase()
         webhook_log = {
             "merchant_id": merchant_id,
             "event_type": f"incoming_{event_type}",
@@ -213,7 +208,7 @@ async def receive_webhook(
             "retry_count": 0
         }
         
-        supabase.table("webhook_logs").insert(webhook_log).execute()
+        await webhook_logs.record(webhook_log)
         
         return {"status": "success", "message": "Webhook processed successfully"}
         
@@ -0,0 +1,68 @@
+"""
+Per-request cost of API key authentication: plaintext `api_key` lookup
+(before) versus prefix lookup + keyed hash with the verified-prefix and
+merchant caches (after). Every lookup goes to a local PostgREST stand-in
+with fixed latency; repeat requests reuse one key, as a single integration does.
+
+    python -m benchmarks.api_key_auth --requests 500 --latency 0.005
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from benchmarks.stub_server import StubServer
+
+# The stand-in accepts any well-formed key
+DUMMY_KEY = "header.payload.signature"
+
+async def timed(call, requests: int) -> float:
+    """Median latency of `call` in milliseconds"""
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        await call()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+async def run(url: str, api_key: str, requests: int):
+    os.environ["SUPABASE_URL"] = url
+    os.environ["SUPABASE_KEY"] = DUMMY_KEY
+    from app.core.config import settings
+    settings.supabase_url, settings.supabase_key = url, DUMMY_KEY
+    from app.core.security import verify_api_key
+    from app.database import supabase_pool
+    from app.repositories import merchants
+    
+    async def before():
+        merchant = await merchants.get_by_api_key(api_key)
+        assert merchant and merchant.get("is_active")
+    
+    await supabase_pool.open()
+    try:
+        return await timed(before, requests), await timed(lambda: verify_api_key(api_key), requests)
+    finally:
+        await supabase_pool.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.005, help="simulated database round trip in seconds")
+    args = parser.parse_args()
+    
+    from app.core.security import api_key_columns, generate_api_key
+    api_key = generate_api_key()
+    merchant = {"id": "bench", "email": "bench@example.com", "is_active": True, **api_key_columns(api_key), "api_key": api_key}
+    
+    with StubServer(latency=args.latency, responder=lambda path, body: [merchant]) as server:
+        before, after = asyncio.run(run(server.url, api_key, args.requests))
+        round_trips = server.requests
+    
+    print(f"plaintext lookup:       {before:8.3f} ms/request")
+    print(f"prefix + hash, cached:  {after:8.3f} ms/request  ({before / after:.0f}x)")
+    print(f"database round trips:   {round_trips} for {2 * args.requests} requests")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Event-loop lag under a mixed workload: EVM transaction signing and bcrypt
+hashing interleaved with I/O-bound reads. Signing inline on the loop (before)
+is compared with signing through the crypto executor (after), in both thread
+and process mode.
+
+    python -m benchmarks.crypto_executor --signatures 200 --hashes 10 --reads 500 --duration 1
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.blockchain.signing import create_evm_account, sign_evm_transaction
+from app.core.executor import CryptoExecutor
+from app.core.security import _hash_password
+
+TICK = 0.001
+
+def sample_transaction(nonce: int) -> dict:
+    return {
+        "to": "0x000000000000000000000000000000000000dEaD",
+        "value": 0,
+        "gas": 100000,
+        "gasPrice": 30_000_000_000,
+        "nonce": nonce,
+        "chainId": 1,
+        "data": "0xa9059cbb" + "00" * 64,
+    }
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+async def run(executor, signatures: int, hashes: int, reads: int, read_latency: float, duration: float) -> dict:
+    _, private_key = create_evm_account()
+    if executor is not None:
+        # Start the workers before measuring (process pools spawn them on demand)
+        await asyncio.gather(*(executor.run(create_evm_account) for _ in range(executor.workers)))
+    lags, read_latencies = [], []
+    done = asyncio.Event()
+    
+    async def monitor():
+        # How late a 1 ms timer fires is how long something else held the loop
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(TICK)
+            lags.append((time.perf_counter() - started - TICK) * 1000)
+    
+    async def crypto(arrival: float, fn, *args):
+        await asyncio.sleep(max(0.0, arrival - time.perf_counter()))
+        if executor is None:
+            return fn(*args)
+        return await executor.run(fn, *args)
+    
+    async def read(arrival: float):
+        await asyncio.sleep(max(0.0, arrival - time.perf_counter()))
+        await asyncio.sleep(read_latency)
+        # Measured from when the request arrived, so time spent waiting for the loop counts
+        read_latencies.append((time.perf_counter() - arrival) * 1000)
+    
+    monitor_task = asyncio.create_task(monitor())
+    started = time.perf_counter()
+    # Requests arrive evenly spread over `duration` seconds
+    jobs = [crypto(started + duration * i / signatures, sign_evm_transaction, sample_transaction(i), private_key) for i in range(signatures)]
+    jobs += [crypto(started + duration * i / max(1, hashes), _hash_password, f"password-{i}") for i in range(hashes)]
+    jobs += [read(started + duration * i / reads) for i in range(reads)]
+    await asyncio.gather(*jobs)
+    elapsed = time.perf_counter() - started
+    done.set()
+    await monitor_task
+    
+    return {
+        "elapsed": elapsed,
+        "lag_p99": percentile(lags, 0.99),
+        "lag_max": max(lags),
+        "read_p50": statistics.median(read_latencies),
+        "read_p99": percentile(read_latencies, 0.99),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--signatures", type=int, default=200)
+    parser.add_argument("--hashes", type=int, default=10, help="bcrypt password hashes")
+    parser.add_argument("--reads", type=int, default=500)
+    parser.add_argument("--read-latency", type=float, default=0.005, help="seconds per simulated read")
+    parser.add_argument("--duration", type=float, default=1.0, help="seconds over which requests arrive")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    
+    print(f"{'':>10} {'total s':>8} {'lag p99 ms':>11} {'lag max ms':>11} {'read p50 ms':>12} {'read p99 ms':>12}")
+    for label, kind in (("inline", None), ("thread", "thread"), ("process", "process")):
+        executor = CryptoExecutor(kind, args.workers) if kind else None
+        try:
+            result = asyncio.run(run(executor, args.signatures, args.hashes, args.reads, args.read_latency, args.duration))
+        finally:
+            if executor:
+                asyncio.run(executor.stop())
+        print(
+            f"{label:>10} {result['elapsed']:>8.2f} {result['lag_p99']:>11.2f} {result['lag_max']:>11.2f} "
+            f"{result['read_p50']:>12.2f} {result['read_p99']:>12.2f}"
+        )
+
+if __name__ == "__main__":
+    main()
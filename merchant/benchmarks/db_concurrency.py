@@ -0,0 +1,71 @@
+"""
+Concurrent-request throughput on a single event loop: synchronous supabase-py
+`.execute()` inside async handlers (before) versus the async repository layer
+(after). Each simulated request does one merchant lookup against a local
+PostgREST stand-in with fixed latency.
+
+    python -m benchmarks.db_concurrency --requests 200 --concurrency 50 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.stub_server import StubServer
+
+# The stand-in accepts any well-formed key
+DUMMY_KEY = "header.payload.signature"
+
+async def run_blocking(url: str, requests: int, concurrency: int) -> float:
+    from supabase import create_client
+    
+    client = create_client(url, DUMMY_KEY)
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def handler(i: int):
+        async with semaphore:
+            client.table("merchants").select("*").eq("id", str(i)).execute()
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(handler(i) for i in range(requests)))
+    return requests / (time.perf_counter() - started)
+
+async def run_async(url: str, requests: int, concurrency: int) -> float:
+    os.environ["SUPABASE_URL"] = url
+    os.environ["SUPABASE_KEY"] = DUMMY_KEY
+    from app.core.config import settings
+    settings.supabase_url, settings.supabase_key = url, DUMMY_KEY
+    from app.database import supabase_pool
+    from app.repositories import merchants
+    
+    await supabase_pool.open()
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def handler(i: int):
+        async with semaphore:
+            await merchants.get_by_id(str(i))
+    
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(handler(i) for i in range(requests)))
+        return requests / (time.perf_counter() - started)
+    finally:
+        await supabase_pool.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated database round trip in seconds")
+    args = parser.parse_args()
+    
+    with StubServer(latency=args.latency) as server:
+        before = asyncio.run(run_blocking(server.url, args.requests, args.concurrency))
+        after = asyncio.run(run_async(server.url, args.requests, args.concurrency))
+    
+    print(f"blocking .execute(): {before:8.1f} req/s")
+    print(f"async repositories:  {after:8.1f} req/s  ({after / before:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+ERC-20 balance lookups per second at increasing concurrency: synchronous
+Web3 calls inside async methods (before) versus the AsyncWeb3 EVM engine (after),
+against a local JSON-RPC stand-in with fixed latency.
+
+    python -m benchmarks.evm_rpc --requests 200 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from decimal import Decimal
+
+from eth_abi import decode, encode
+
+from benchmarks.stub_server import StubServer
+
+HOLDER = "0x000000000000000000000000000000000000dEaD"
+CONCURRENCY = (1, 10, 50)
+
+# Function selectors answered by the stand-in
+BALANCE_OF = "0x70a08231"
+DECIMALS = "0x313ce567"
+AGGREGATE3 = "0x82ad56cb"
+
+def erc20_result(data: str) -> bytes:
+    value = 6 if data.startswith(DECIMALS) else 1_000_000
+    return value.to_bytes(32, "big")
+
+def block(number: int) -> dict:
+    """Header of block `number` on the stand-in's chain"""
+    return {
+        "number": hex(number),
+        "hash": "0x" + f"{number:064x}",
+        "parentHash": "0x" + f"{number - 1:064x}",
+        "timestamp": hex(1_700_000_000 + 12 * number),
+        "baseFeePerGas": "0x3b9aca00",
+    }
+
+def json_rpc_result(request: dict):
+    if request["method"] == "eth_chainId":
+        return "0x1"
+    if request["method"] == "eth_blockNumber":
+        return "0x1000"
+    if request["method"] == "eth_getBlockByNumber":
+        return block(0x1000)
+    if request["method"] == "eth_gasPrice":
+        return "0x12a05f200"
+    if request["method"] == "eth_maxPriorityFeePerGas":
+        return "0x3b9aca00"
+    if request["method"] == "eth_feeHistory":
+        blocks, _, percentiles = request["params"]
+        blocks = int(blocks, 16) if isinstance(blocks, str) else blocks
+        return {
+            "oldestBlock": hex(0x1000 - blocks + 1),
+            "baseFeePerGas": ["0x3b9aca00"] * (blocks + 1),
+            "gasUsedRatio": [0.5] * blocks,
+            "reward": [[hex(100_000_000 * (i + 1)) for i in range(len(percentiles))]] * blocks,
+        }
+    if request["method"] == "eth_getTransactionByHash":
+        tx_hash = request["params"][0]
+        return {"hash": tx_hash, "from": HOLDER.lower(), "to": HOLDER.lower(), "value": "0x0", "gasPrice": "0x6fc23ac00", "blockNumber": "0xfff"}
+    if request["method"] == "eth_getTransactionReceipt":
+        return {"transactionHash": request["params"][0], "status": "0x1", "blockNumber": "0xfff", "gasUsed": "0xb411"}
+    if request["method"] == "eth_call":
+        data = request["params"][0].get("data") or request["params"][0].get("input") or ""
+        if data.startswith(AGGREGATE3):
+            # Multicall3: answer every aggregated call as if made on its own
+            (calls,) = decode(["(address,bool,bytes)[]"], bytes.fromhex(data[10:]))
+            results = [(True, erc20_result("0x" + call_data.hex())) for _, _, call_data in calls]
+            return "0x" + encode(["(bool,bytes)[]"], [results]).hex()
+        return "0x" + erc20_result(data).hex()
+    return None
+
+def responder(path: str, body: bytes):
+    """Answer single and batched JSON-RPC requests"""
+    payload = json.loads(body or b"{}")
+    requests = payload if isinstance(payload, list) else [payload]
+    responses = [{"jsonrpc": "2.0", "id": request.get("id"), "result": json_rpc_result(request)} for request in requests]
+    return responses if isinstance(payload, list) else responses[0]
+
+async def run_blocking(url: str, token: str, requests: int, concurrency: int) -> float:
+    from web3 import Web3
+    
+    w3 = Web3(Web3.HTTPProvider(url))
+    balance_abi = [{"constant": True, "inputs": [{"name": "_owner", "type": "address"}], "name": "balanceOf", "outputs": [{"name": "balance", "type": "uint256"}], "type": "function"}]
+    decimals_abi = [{"constant": True, "inputs": [], "name": "decimals", "outputs": [{"name": "", "type": "uint8"}], "type": "function"}]
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def get_balance():
+        async with semaphore:
+            balance = w3.eth.contract(address=token, abi=balance_abi).functions.balanceOf(HOLDER).call()
+            decimals = w3.eth.contract(address=token, abi=decimals_abi).functions.decimals().call()
+            return Decimal(balance) / Decimal(10 ** decimals)
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(get_balance() for _ in range(requests)))
+    return requests / (time.perf_counter() - started)
+
+async def run_async(url: str, requests: int, concurrency: int) -> float:
+    from app.blockchain.evm import EVMChain
+    from app.core.config import settings
+    from app.models import ChainType, TokenType
+    
+    blockchain = EVMChain(ChainType.ETHEREUM, {**settings.evm_chains["ethereum"], "rpc_urls": [url]})
+    blockchain.cache = None  # every lookup should reach the stand-in
+    await blockchain.open()
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def get_balance():
+        async with semaphore:
+            return await blockchain.get_balance(HOLDER, TokenType.USDT)
+    
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(get_balance() for _ in range(requests)))
+        return requests / (time.perf_counter() - started)
+    finally:
+        await blockchain.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated RPC round trip in seconds")
+    args = parser.parse_args()
+    
+    from app.core.config import settings
+    token = settings.supported_tokens["ethereum"]["USDT"]
+    
+    print(f"{'concurrency':>11} {'sync Web3 req/s':>16} {'AsyncWeb3 req/s':>16}")
+    with StubServer(latency=args.latency, responder=responder) as server:
+        for concurrency in CONCURRENCY:
+            before = asyncio.run(run_blocking(server.url, token, args.requests, concurrency))
+            after = asyncio.run(run_async(server.url, args.requests, concurrency))
+            print(f"{concurrency:>11} {before:>16.1f} {after:>16.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Fee fields for --lookups EIP-1559 payouts made every --interval seconds: the
+latest block and eth_maxPriorityFeePerGas fetched for every payout (before),
+versus the FeeOracle's suggestions, refreshed from eth_feeHistory on each head
+reported by the running HeadTracker (after). The local stand-in's head advances
+every --block-time seconds. HTTP requests include the tracker's head polls.
+
+    python -m benchmarks.fee_oracle --lookups 200 --interval 0.02 --block-time 1
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.rpc_cache import advancing
+from benchmarks.stub_server import StubServer
+
+async def run(url: str, args, cached: bool) -> dict:
+    from app.blockchain.evm import EVMChain
+    from app.core.config import settings
+    from app.models import ChainType
+    
+    blockchain = EVMChain(ChainType.ETHEREUM, {**settings.evm_chains["ethereum"], "rpc_urls": [url], "block_time": args.block_time})
+    await blockchain.open()
+    
+    async def per_send_fees():
+        # send_transaction before the fee oracle
+        latest, priority_fee = await asyncio.gather(blockchain.w3.eth.get_block("latest"), blockchain.w3.eth.max_priority_fee)
+        return {"maxFeePerGas": 2 * latest["baseFeePerGas"] + priority_fee, "maxPriorityFeePerGas": priority_fee}
+    
+    latencies = []
+    try:
+        if cached:
+            await blockchain.heads.start()
+        for _ in range(args.lookups):
+            started = time.perf_counter()
+            await (blockchain.fee_oracle.fees() if cached else per_send_fees())
+            latencies.append((time.perf_counter() - started) * 1000)
+            await asyncio.sleep(args.interval)
+    finally:
+        await blockchain.heads.stop()
+        await blockchain.close()
+    return {"p50": statistics.median(latencies), "max": max(latencies), **blockchain.fee_oracle.stats()}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lookups", type=int, default=200)
+    parser.add_argument("--interval", type=float, default=0.02, help="seconds between payouts")
+    parser.add_argument("--block-time", type=float, default=1.0, help="seconds between the stand-in's blocks")
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated RPC round trip in seconds")
+    args = parser.parse_args()
+    
+    print(f"{'':>12} {'HTTP requests':>14} {'p50 ms':>8} {'max ms':>8} {'refreshes':>10} {'on demand':>10}")
+    for label, cached in (("per send", False), ("fee oracle", True)):
+        with StubServer(latency=args.latency, responder=advancing(args.block_time)) as server:
+            result = asyncio.run(run(server.url, args, cached))
+            print(
+                f"{label:>12} {server.requests:>14} {result['p50']:>8.2f} {result['max']:>8.1f} "
+                f"{result['refreshes']:>10} {result['on_demand_refreshes']:>10}"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+--payouts ERC-20 payouts from one wallet, requested at the same moment. Before,
+every send asks the node for the wallet's transaction count, so payouts are
+either made one at a time or collide on the same nonce. After, EVMChain's
+NonceManager syncs once and hands out consecutive nonces, so all of them are
+signed and broadcast in parallel. The local stand-in rejects a nonce it has
+already accepted, like a node does.
+
+    python -m benchmarks.nonces --payouts 50 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+from decimal import Decimal
+
+import rlp
+
+from benchmarks.evm_rpc import HOLDER, json_rpc_result
+from benchmarks.stub_server import StubServer
+
+class Node:
+    """Nonces accepted from the sending wallet"""
+    
+    def __init__(self):
+        self.accepted = set()
+        self.lock = threading.Lock()
+    
+    def pending(self) -> int:
+        nonce = 0
+        while nonce in self.accepted:
+            nonce += 1
+        return nonce
+    
+    def result(self, request: dict):
+        if request["method"] == "eth_getTransactionCount":
+            with self.lock:
+                return {"result": hex(self.pending())}
+        if request["method"] == "eth_sendRawTransaction":
+            raw = bytes.fromhex(request["params"][0][2:])
+            # Type-2 transaction: 0x02 || rlp([chainId, nonce, ...])
+            nonce = int.from_bytes(rlp.decode(raw[1:])[1], "big")
+            with self.lock:
+                if nonce in self.accepted:
+                    return {"error": {"code": -32000, "message": "nonce too low"}}
+                self.accepted.add(nonce)
+            return {"result": "0x" + f"{nonce:064x}"}
+        return {"result": json_rpc_result(request)}
+    
+    def respond(self, path: str, body: bytes):
+        payload = json.loads(body or b"{}")
+        requests = payload if isinstance(payload, list) else [payload]
+        responses = [{"jsonrpc": "2.0", "id": request.get("id"), **self.result(request)} for request in requests]
+        return responses if isinstance(payload, list) else responses[0]
+
+async def run(url: str, payouts: int, mode: str) -> dict:
+    from app.blockchain.evm import DEFAULT_GAS_LIMIT, EVMChain, transfer_data
+    from app.blockchain.signing import create_evm_account, sign_evm_transaction
+    from app.core.config import settings
+    from app.core.executor import crypto_executor
+    from app.models import ChainType, TokenType
+    
+    blockchain = EVMChain(ChainType.ETHEREUM, {**settings.evm_chains["ethereum"], "rpc_urls": [url]})
+    await blockchain.open()
+    address, private_key = create_evm_account()
+    
+    async def send_fetching_nonce():
+        # send_transaction before the nonce manager: a transaction count lookup per send
+        entry = await blockchain._token(TokenType.USDT)
+        nonce, latest, priority_fee = await asyncio.gather(
+            blockchain.w3.eth.get_transaction_count(address),
+            blockchain.w3.eth.get_block("latest"),
+            blockchain.w3.eth.max_priority_fee
+        )
+        fees = {"maxFeePerGas": 2 * latest["baseFeePerGas"] + priority_fee, "maxPriorityFeePerGas": priority_fee}
+        transaction = {
+            "chainId": blockchain.chain_id,
+            "from": address,
+            "to": entry.address,
+            "value": 0,
+            "data": transfer_data(HOLDER, entry.to_units(Decimal("1"))),
+            "gas": DEFAULT_GAS_LIMIT,
+            "nonce": nonce,
+            **fees,
+        }
+        raw_transaction = await crypto_executor.run(sign_evm_transaction, transaction, private_key)
+        return await blockchain.w3.eth.send_raw_transaction(raw_transaction)
+    
+    async def send():
+        if mode == "nonce manager":
+            return await blockchain.send_transaction(address, HOLDER, Decimal("1"), TokenType.USDT, private_key)
+        return await send_fetching_nonce()
+    
+    started = time.perf_counter()
+    try:
+        if mode == "serial":
+            results = []
+            for _ in range(payouts):
+                try:
+                    results.append(await send())
+                except Exception as e:
+                    results.append(e)
+        else:
+            results = await asyncio.gather(*(send() for _ in range(payouts)), return_exceptions=True)
+    finally:
+        await blockchain.close()
+    failed = sum(1 for result in results if isinstance(result, Exception))
+    return {"sent": payouts - failed, "failed": failed, "elapsed": time.perf_counter() - started}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--payouts", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated RPC round trip in seconds")
+    args = parser.parse_args()
+    
+    print(f"{'':>15} {'sent':>5} {'failed':>7} {'total s':>8} {'HTTP requests':>14}")
+    for label in ("serial", "concurrent", "nonce manager"):
+        node = Node()
+        with StubServer(latency=args.latency, responder=node.respond) as server:
+            result = asyncio.run(run(server.url, args.payouts, label))
+            print(f"{label:>15} {result['sent']:>5} {result['failed']:>7} {result['elapsed']:>8.2f} {server.requests:>14}")
+
+if __name__ == "__main__":
+    main()
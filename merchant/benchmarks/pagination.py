@@ -0,0 +1,131 @@
+"""
+Latency of one list page at increasing depth: LIMIT/OFFSET (before) versus
+(created_at, id) keyset cursors (after). Seeds one merchant with N payment
+requests into a migrated Postgres database, then times
+`payment_requests.list_for_merchant` through the postgres backend.
+
+    DATABASE_URL=postgresql://... python -m app.migrations upgrade
+    DATABASE_URL=postgresql://... python -m benchmarks.pagination --rows 510000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import uuid
+
+import asyncpg
+
+from app.core.pagination import Cursor
+
+PAGE_SIZE = 50
+DEPTHS = (1, 100, 1000, 10000)
+
+async def seed(dsn: str, rows: int) -> str:
+    """Insert a throwaway merchant with `rows` payment requests, one second apart"""
+    merchant_id = str(uuid.uuid4())
+    conn = await asyncpg.connect(dsn)
+    try:
+        await conn.execute(
+            "INSERT INTO merchants (id, email, company_name, api_key) VALUES ($1, $2, 'Benchmark', $3)",
+            uuid.UUID(merchant_id), f"bench-{merchant_id}@example.com", f"bench_{merchant_id}"
+        )
+        async with conn.transaction():
+            # Row by row, the rollup trigger would rewrite the same few daily_rollups rows
+            # hundreds of thousands of times in one statement; add the seeded rows' totals once
+            await conn.execute("ALTER TABLE payment_requests DISABLE TRIGGER maintain_payment_requests_rollups")
+            await conn.execute(
+                """
+                INSERT INTO payment_requests (merchant_id, payment_id, chain, token, amount, recipient_address, created_at)
+                SELECT $1, $3 || n, 'ethereum', 'USDT', 1, '0x0', NOW() - n * INTERVAL '1 second'
+                FROM generate_series(1, $2) AS n
+                """,
+                uuid.UUID(merchant_id), rows, f"bench_{merchant_id}_"
+            )
+            await conn.execute(
+                """
+                INSERT INTO daily_rollups (merchant_id, source, day, chain, token, status, count, amount)
+                SELECT merchant_id, 'payment_requests', (created_at AT TIME ZONE 'UTC')::date,
+                       chain, token, COALESCE(status, 'null'), count(*), sum(amount)
+                FROM payment_requests WHERE merchant_id = $1
+                GROUP BY 1, 2, 3, 4, 5, 6
+                """,
+                uuid.UUID(merchant_id)
+            )
+            await conn.execute("ALTER TABLE payment_requests ENABLE TRIGGER maintain_payment_requests_rollups")
+        await conn.execute("ANALYZE payment_requests")
+    finally:
+        await conn.close()
+    return merchant_id
+
+async def cleanup(dsn: str, merchant_id: str):
+    conn = await asyncpg.connect(dsn)
+    try:
+        await conn.execute("DELETE FROM merchants WHERE id = $1", uuid.UUID(merchant_id))
+    finally:
+        await conn.close()
+
+async def cursor_at(dsn: str, merchant_id: str, position: int) -> Cursor:
+    """Cursor a client would hold after paging down to `position`"""
+    conn = await asyncpg.connect(dsn)
+    try:
+        row = await conn.fetchrow(
+            "SELECT created_at, id FROM payment_requests WHERE merchant_id = $1 "
+            "ORDER BY created_at DESC, id DESC OFFSET $2 LIMIT 1",
+            uuid.UUID(merchant_id), position - 1
+        )
+    finally:
+        await conn.close()
+    return Cursor(created_at=row["created_at"].isoformat(), id=str(row["id"]))
+
+async def timed(call, repeat: int) -> float:
+    """Median latency of `call` in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await call()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+async def run(dsn: str, rows: int, repeat: int):
+    from app.core.config import settings
+    settings.database_backend, settings.database_url = "postgres", dsn
+    from app.repositories import base, payment_requests
+    base.backend = base.create_backend()
+    
+    merchant_id = await seed(dsn, rows)
+    await base.backend.open()
+    try:
+        print(f"{'page':>8} {'offset ms':>10} {'cursor ms':>10}")
+        for page in DEPTHS:
+            position = (page - 1) * PAGE_SIZE
+            if position >= rows:
+                break
+            offset_ms = await timed(
+                lambda: payment_requests.list_for_merchant(merchant_id, limit=PAGE_SIZE, offset=position),
+                repeat
+            )
+            cursor = await cursor_at(dsn, merchant_id, position) if position else None
+            cursor_ms = await timed(
+                lambda: payment_requests.list_for_merchant(merchant_id, limit=PAGE_SIZE, cursor=cursor),
+                repeat
+            )
+            print(f"{page:>8} {offset_ms:>10.2f} {cursor_ms:>10.2f}")
+    finally:
+        await base.backend.close()
+        await cleanup(dsn, merchant_id)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=510_000, help="payment requests to seed")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", ""))
+    args = parser.parse_args()
+    
+    if not args.database_url:
+        parser.error("DATABASE_URL (or --database-url) is required")
+    asyncio.run(run(args.database_url, args.rows, args.repeat))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Tenant isolation under abuse: one merchant floods an expensive chain route
+while another makes a steady stream of cheap balance lookups. Both routes
+share a fixed pool of simulated RPC slots. Prints the well-behaved tenant's
+latency without (before) and with (after) RateLimitMiddleware.
+
+    python -m benchmarks.rate_limit --abusers 50 --duration 5
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.core.rate_limit import MemoryRateLimiter, RateLimitMiddleware
+from app.core.security import create_access_token
+
+def build_app(rpc_slots: int, rpc_latency: float, limited: bool):
+    """Stand-in API whose chain routes queue for `rpc_slots` provider connections"""
+    app = FastAPI()
+    slots = asyncio.Semaphore(rpc_slots)
+    
+    async def rpc_call():
+        async with slots:
+            await asyncio.sleep(rpc_latency)
+    
+    @app.get("/api/v1/wallets/balances/all")
+    async def balances_all():
+        await asyncio.gather(*(rpc_call() for _ in range(4)))
+        return {}
+    
+    @app.get("/api/v1/wallets/{wallet_id}/balance")
+    async def balance(wallet_id: str):
+        await rpc_call()
+        return {}
+    
+    return RateLimitMiddleware(app, limiter=MemoryRateLimiter()) if limited else app
+
+async def run(limited: bool, abusers: int, duration: float, victim_rps: float, rpc_slots: int, rpc_latency: float):
+    app = build_app(rpc_slots, rpc_latency, limited)
+    abuser_headers = {"Authorization": f"Bearer {create_access_token({'sub': 'abuser'})}"}
+    victim_headers = {"Authorization": f"Bearer {create_access_token({'sub': 'victim'})}"}
+    counts = {"abuser_ok": 0, "abuser_limited": 0, "victim_limited": 0}
+    latencies = []
+    deadline = time.perf_counter() + duration
+    
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def abuser():
+            while time.perf_counter() < deadline:
+                response = await client.get("/api/v1/wallets/balances/all", headers=abuser_headers)
+                if response.status_code == 429:
+                    counts["abuser_limited"] += 1
+                    # A well-behaved client would wait Retry-After; an abusive one retries at once
+                    await asyncio.sleep(0.001)
+                else:
+                    counts["abuser_ok"] += 1
+        
+        async def victim():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await client.get("/api/v1/wallets/w1/balance", headers=victim_headers)
+                if response.status_code == 429:
+                    counts["victim_limited"] += 1
+                else:
+                    latencies.append((time.perf_counter() - started) * 1000)
+                await asyncio.sleep(max(0.0, 1 / victim_rps - (time.perf_counter() - started)))
+        
+        await asyncio.gather(victim(), *(abuser() for _ in range(abusers)))
+    
+    latencies.sort()
+    return {
+        **counts,
+        "p50": statistics.median(latencies),
+        "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--abusers", type=int, default=50, help="concurrent request loops of the abusive tenant")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per run")
+    parser.add_argument("--victim-rps", type=float, default=10.0)
+    parser.add_argument("--rpc-slots", type=int, default=8, help="shared RPC provider connections")
+    parser.add_argument("--rpc-latency", type=float, default=0.05, help="seconds per RPC call")
+    args = parser.parse_args()
+    
+    print(f"{'':>14} {'victim p50 ms':>14} {'victim p99 ms':>14} {'victim 429s':>12} {'abuser ok':>10} {'abuser 429s':>12}")
+    for label, limited in (("no limiter", False), ("rate limited", True)):
+        result = asyncio.run(run(limited, args.abusers, args.duration, args.victim_rps, args.rpc_slots, args.rpc_latency))
+        print(
+            f"{label:>14} {result['p50']:>14.1f} {result['p99']:>14.1f} {result['victim_limited']:>12} "
+            f"{result['abuser_ok']:>10} {result['abuser_limited']:>12}"
+        )
+
+if __name__ == "__main__":
+    main()
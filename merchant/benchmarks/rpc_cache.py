@@ -0,0 +1,95 @@
+"""
+RPC traffic behind a merchant dashboard that refreshes faster than blocks are
+produced: every refresh reads the balances of --wallets wallets and the status
+of --hashes transactions, half of them long final and half still unmined.
+Compares EVMChain without the response cache (before) and with it (after). The
+local stand-in's head advances every --block-time seconds.
+
+    python -m benchmarks.rpc_cache --refreshes 40 --interval 0.1 --block-time 1
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from benchmarks.evm_rpc import block, json_rpc_result
+from benchmarks.stub_server import StubServer
+
+FIRST_BLOCK = 0x1000
+FINAL_BLOCK = "0x800"
+
+def advancing(block_time: float):
+    """JSON-RPC responder whose head moves on every `block_time` seconds; odd transaction hashes are unmined"""
+    started = time.monotonic()
+    
+    def result(request: dict):
+        if request["method"] == "eth_getBlockByNumber":
+            return block(FIRST_BLOCK + int((time.monotonic() - started) / block_time))
+        if request["method"] == "eth_getTransactionReceipt":
+            if int(request["params"][0], 16) % 2:
+                return None
+            return {**json_rpc_result(request), "blockNumber": FINAL_BLOCK}
+        return json_rpc_result(request)
+    
+    def respond(path: str, body: bytes):
+        payload = json.loads(body or b"{}")
+        requests = payload if isinstance(payload, list) else [payload]
+        responses = [{"jsonrpc": "2.0", "id": request.get("id"), "result": result(request)} for request in requests]
+        return responses if isinstance(payload, list) else responses[0]
+    
+    return respond
+
+async def run(url: str, args, cached: bool) -> dict:
+    from app.blockchain.evm import EVMChain
+    from app.blockchain.tokens import token_registry
+    from app.core.config import settings
+    from app.models import ChainType
+    
+    blockchain = EVMChain(ChainType.ETHEREUM, {**settings.evm_chains["ethereum"], "rpc_urls": [url], "block_time": args.block_time})
+    if not cached:
+        blockchain.cache = None
+    await blockchain.open()
+    tokens = token_registry.symbols(ChainType.ETHEREUM)
+    reads = [("0x" + f"{i + 1:040x}", token) for i in range(args.wallets) for token in tokens]
+    tx_hashes = ["0x" + f"{i:064x}" for i in range(args.hashes)]
+    
+    latencies = []
+    try:
+        for _ in range(args.refreshes):
+            started = time.perf_counter()
+            await asyncio.gather(blockchain.get_balances(reads), blockchain.get_transaction_statuses(tx_hashes))
+            latencies.append((time.perf_counter() - started) * 1000)
+            await asyncio.sleep(args.interval)
+    finally:
+        await blockchain.close()
+    stats = blockchain.stats()
+    ratio = 0.0
+    if cached:
+        methods = stats["cache"]["methods"].values()
+        hits = sum(method["hits"] for method in methods)
+        ratio = hits / max(1, hits + sum(method["misses"] for method in methods))
+    return {"p50": statistics.median(latencies), "hit_ratio": ratio, "reorgs": stats["cache"]["reorgs"] if cached else 0}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--refreshes", type=int, default=40)
+    parser.add_argument("--interval", type=float, default=0.1, help="seconds between dashboard refreshes")
+    parser.add_argument("--block-time", type=float, default=1.0, help="seconds between the stand-in's blocks")
+    parser.add_argument("--wallets", type=int, default=20)
+    parser.add_argument("--hashes", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated RPC round trip in seconds")
+    args = parser.parse_args()
+    
+    print(f"{'':>9} {'HTTP requests':>14} {'per refresh':>12} {'p50 ms':>8} {'hit ratio':>10} {'reorgs':>7}")
+    for label, cached in (("uncached", False), ("cached", True)):
+        with StubServer(latency=args.latency, responder=advancing(args.block_time)) as server:
+            result = asyncio.run(run(server.url, args, cached))
+            print(
+                f"{label:>9} {server.requests:>14} {server.requests / args.refreshes:>12.1f} "
+                f"{result['p50']:>8.1f} {result['hit_ratio']:>10.2%} {result['reorgs']:>7}"
+            )
+
+if __name__ == "__main__":
+    main()
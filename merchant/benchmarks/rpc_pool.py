@@ -0,0 +1,94 @@
+"""
+Balance reads against unreliable RPC providers: one endpoint (before) versus
+the RpcPool over three endpoints, without and with hedged reads (after). The
+local stand-ins are
+
+    primary    10 ms, but 5% of requests stall for --spike seconds and 5% fail with 503
+    dead       every request fails with 503
+    secondary  10 ms, with its own independent 5% of stalls
+
+    python -m benchmarks.rpc_pool --requests 600 --concurrency 10
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from benchmarks.evm_rpc import HOLDER, responder
+from benchmarks.stub_server import StubServer
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+async def run(urls, requests: int, concurrency: int, hedge: bool) -> dict:
+    from app.blockchain.evm import EVMChain
+    from app.core.config import settings
+    from app.models import ChainType, TokenType
+    
+    blockchain = EVMChain(ChainType.ETHEREUM, {**settings.evm_chains["ethereum"], "rpc_urls": urls})
+    blockchain.pool.hedge = hedge
+    blockchain.cache = None  # every read should reach the endpoints
+    await blockchain.open()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+    
+    async def read():
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await blockchain.get_balance(HOLDER, TokenType.USDT)
+                latencies.append((time.perf_counter() - started) * 1000)
+            except Exception:
+                errors += 1
+    
+    try:
+        await asyncio.gather(*(read() for _ in range(requests)))
+    finally:
+        await blockchain.close()
+    stats = blockchain.pool.stats()
+    return {
+        "ok": len(latencies),
+        "errors": errors,
+        "p50": percentile(latencies, 0.5),
+        "p99": percentile(latencies, 0.99),
+        "failovers": stats["failovers"],
+        "hedges": stats["hedges"],
+        "ejections": sum(endpoint["ejections"] for endpoint in stats["endpoints"]),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=600)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--spike", type=float, default=0.3, help="seconds a stalled request takes")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    random.seed(args.seed)
+    
+    primary = StubServer(
+        latency=lambda: args.spike if random.random() < 0.05 else 0.01,
+        responder=responder,
+        fault=lambda: 503 if random.random() < 0.05 else None
+    )
+    dead = StubServer(latency=0.001, responder=responder, fault=lambda: 503)
+    secondary = StubServer(latency=lambda: args.spike if random.random() < 0.05 else 0.01, responder=responder)
+    
+    print(f"{'':>16} {'ok':>5} {'errors':>7} {'p50 ms':>8} {'p99 ms':>8} {'failovers':>10} {'hedges':>7} {'ejections':>10}")
+    with primary, dead, secondary:
+        scenarios = (
+            ("single endpoint", [primary.url], False),
+            ("pool", [primary.url, dead.url, secondary.url], False),
+            ("pool + hedging", [primary.url, dead.url, secondary.url], True),
+        )
+        for label, urls, hedge in scenarios:
+            result = asyncio.run(run(urls, args.requests, args.concurrency, hedge))
+            print(
+                f"{label:>16} {result['ok']:>5} {result['errors']:>7} {result['p50']:>8.1f} {result['p99']:>8.1f} "
+                f"{result['failovers']:>10} {result['hedges']:>7} {result['ejections']:>10}"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Local HTTP stand-in used by the benchmarks.
+
+Serves canned JSON after an artificial delay so client-side concurrency can be
+measured without a real Supabase project or RPC provider.
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional, Union
+import json
+import threading
+import time
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+    
+    def handle_error(self, request, client_address):
+        # Clients hang up on purpose (timeouts, hedged requests that lost the race)
+        pass
+
+class StubServer:
+    """Threaded HTTP server answering every request after `latency` seconds
+    
+    `latency` may also be a callable returning each request's delay, and `fault`
+    a callable returning an HTTP status to fail a request with (None to answer it).
+    """
+    
+    def __init__(
+        self,
+        latency: Union[float, Callable[[], float]] = 0.02,
+        responder: Optional[Callable[[str, bytes], object]] = None,
+        fault: Optional[Callable[[], Optional[int]]] = None
+    ):
+        self.latency = latency
+        self.responder = responder or (lambda path, body: [])
+        self.fault = fault or (lambda: None)
+        self.requests = 0
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def _reply(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                server.requests += 1
+                time.sleep(server.latency() if callable(server.latency) else server.latency)
+                failure = server.fault()
+                payload = json.dumps({"error": "injected fault"} if failure else server.responder(self.path, body)).encode()
+                self.send_response(failure or 200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+            
+            do_GET = do_POST = do_PATCH = _reply
+            
+            def log_message(self, *args):
+                pass
+        
+        self.httpd = _Server(("127.0.0.1", 0), Handler)
+    
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}"
+    
+    def __enter__(self) -> "StubServer":
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+    
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
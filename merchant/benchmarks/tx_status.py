@@ -0,0 +1,77 @@
+"""
+Time to check a merchant's pending EVM transactions: a transaction plus a
+receipt lookup per hash, made hash after hash (before), versus
+get_transaction_statuses() sending them as JSON-RPC batches (after). The
+local stand-in refuses batches larger than --provider-limit, so the transport
+has to find a batch size that works.
+
+    python -m benchmarks.tx_status --hashes 200 --latency 0.02 --provider-limit 50
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.evm_rpc import responder
+from benchmarks.stub_server import StubServer
+
+def limited(provider_limit: int):
+    """JSON-RPC responder that answers an oversized batch with a single error, like many providers"""
+    def respond(path: str, body: bytes):
+        payload = json.loads(body or b"{}")
+        if isinstance(payload, list) and len(payload) > provider_limit:
+            return {"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": f"batch limit {provider_limit} exceeded"}}
+        return responder(path, body)
+    return respond
+
+async def run(url: str, hashes: int, batched: bool) -> dict:
+    from app.blockchain.evm import EVMChain
+    from app.core.config import settings
+    from app.models import ChainType
+    
+    blockchain = EVMChain(ChainType.ETHEREUM, {**settings.evm_chains["ethereum"], "rpc_urls": [url]})
+    blockchain.cache = None  # every lookup should reach the stand-in
+    await blockchain.open()
+    tx_hashes = ["0x" + f"{i:064x}" for i in range(hashes)]
+    
+    async def serial():
+        statuses = []
+        for tx_hash in tx_hashes:
+            tx, receipt = await asyncio.gather(
+                blockchain.w3.eth.get_transaction(tx_hash),
+                blockchain.w3.eth.get_transaction_receipt(tx_hash)
+            )
+            statuses.append("confirmed" if receipt.status == 1 else "failed")
+        return statuses
+    
+    try:
+        started = time.perf_counter()
+        if batched:
+            statuses = [result["status"] for result in await blockchain.get_transaction_statuses(tx_hashes)]
+        else:
+            statuses = await serial()
+        elapsed = time.perf_counter() - started
+    finally:
+        await blockchain.close()
+    return {"elapsed": elapsed, "confirmed": statuses.count("confirmed"), **blockchain.transport.stats()}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hashes", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated RPC round trip in seconds")
+    parser.add_argument("--provider-limit", type=int, default=50, help="largest batch the stand-in accepts")
+    args = parser.parse_args()
+    
+    print(f"{'':>8} {'total s':>8} {'confirmed':>10} {'HTTP requests':>14} {'rejected':>9} {'final batch':>12}")
+    with StubServer(latency=args.latency, responder=limited(args.provider_limit)) as server:
+        for label, batched in (("serial", False), ("batched", True)):
+            before = server.requests
+            result = asyncio.run(run(server.url, args.hashes, batched))
+            print(
+                f"{label:>8} {result['elapsed']:>8.2f} {result['confirmed']:>10} {server.requests - before:>14} "
+                f"{result['batch_rejections']:>9} {result['batch_size']:>12}"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Latency of the work behind GET /wallets/balances/all for a merchant with one
+wallet on each EVM chain: one balanceOf round trip per (wallet, token), made
+serially (before), versus wallet_balances() batching each chain's reads into a
+Multicall3 aggregate3 call with the chains in parallel (after). Runs against
+the local JSON-RPC stand-in from benchmarks/evm_rpc.py.
+
+    python -m benchmarks.wallet_balances --rounds 10 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.evm_rpc import HOLDER, responder
+from benchmarks.stub_server import StubServer
+
+async def run(url: str, rounds: int, batched: bool) -> dict:
+    from app.blockchain.evm import EVMChain
+    from app.blockchain.manager import blockchain_manager
+    from app.blockchain.tokens import token_registry
+    from app.core.config import settings
+    from app.models import ChainType
+    from app.routers.wallets import wallet_balances
+    
+    wallets = []
+    for name, config in settings.evm_chains.items():
+        chain = ChainType(name)
+        blockchain_manager.blockchains[chain] = EVMChain(chain, {**config, "rpc_urls": [url]})
+        blockchain_manager.blockchains[chain].cache = None  # every round should reach the stand-in
+        wallets.append({"chain": name, "address": HOLDER})
+    await blockchain_manager.open()
+    
+    async def serial():
+        balances = []
+        for wallet in wallets:
+            chain = ChainType(wallet["chain"])
+            for token in token_registry.symbols(chain):
+                balances.append(await blockchain_manager.get_balance(chain, wallet["address"], token))
+        return balances
+    
+    latencies = []
+    try:
+        for _ in range(rounds):
+            started = time.perf_counter()
+            balances = await (wallet_balances(wallets) if batched else serial())
+            latencies.append((time.perf_counter() - started) * 1000)
+    finally:
+        await blockchain_manager.close()
+    return {"balances": len(balances), "p50": statistics.median(latencies), "max": max(latencies)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated RPC round trip in seconds")
+    args = parser.parse_args()
+    
+    print(f"{'':>10} {'balances':>9} {'RPC calls':>10} {'p50 ms':>8} {'max ms':>8}")
+    with StubServer(latency=args.latency, responder=responder) as server:
+        for label, batched in (("serial", False), ("multicall", True)):
+            before = server.requests
+            result = asyncio.run(run(server.url, args.rounds, batched))
+            calls = (server.requests - before) / args.rounds
+            print(f"{label:>10} {result['balances']:>9} {calls:>10.1f} {result['p50']:>8.1f} {result['max']:>8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -5,23 +5,48 @@ from contextlib import asynccontextmanager
 import os
 from dotenv import load_dotenv
 
-from app.database import init_supabase
+from app.repositories.base import get_backend
+from app.blockchain.manager import blockchain_manager
+from app.blockchain.tokens import token_registry
+from app.blockchain import nonces
+from app.repositories import webhook_logs
+from app.repositories import merchants as merchant_records
+from app.migrations import partitions
 from app.routers import auth, merchants, payments, wallets, transactions, webhooks, payouts
 from app.core.config import settings
+from app.core.security import verified_api_keys, verify_metrics_token
+from app.core.revocation import token_versions
+from app.core import rate_limit
+from app.core.executor import crypto_executor
+from app.core.pagination import NEXT_CURSOR_HEADER, PREV_CURSOR_HEADER
 
 # Load environment variables
 load_dotenv()
 
-# Initialize Supabase
-supabase_client = init_supabase()
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     print("🚀 Starting Stablecoin Merchant Payment Rails API")
+    await get_backend().open()
+    crypto_executor.start()
+    await blockchain_manager.open()
+    await blockchain_manager.start_head_trackers()
+    await partitions.maintainer.start()
+    await webhook_logs.writer.start()
+    await token_versions.start()
     yield
     # Shutdown
     print("🛑 Shutting down API")
+    await token_versions.stop()
+    await partitions.maintainer.stop()
+    await webhook_logs.writer.stop()
+    await merchant_records.cache.close()
+    await rate_limit.limiter.close()
+    await blockchain_manager.stop_head_trackers()
+    await nonces.lease.close()
+    await blockchain_manager.close()
+    await crypto_executor.stop()
+    await get_backend().close()
 
 app = FastAPI(
     title="Stablecoin Merchant Payment Rails API",
@@ -30,6 +55,10 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Rate limiting (added first so CORS headers are also set on 429 responses)
+if settings.rate_limit_enabled:
+    app.add_middleware(rate_limit.RateLimitMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -37,6 +66,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, PREV_CURSOR_HEADER, "Retry-After"],
 )
 
 # Include routers
@@ -61,6 +91,23 @@ async def root():
 async def health_check():
     return {"status": "healthy", "timestamp": "2024-01-01T00:00:00Z"}
 
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(verify_metrics_token)])
+async def metrics():
+    """Per-process runtime counters"""
+    return {
+        "database": get_backend().stats(),
+        "partitions": partitions.maintainer.stats(),
+        "webhook_log_writer": webhook_logs.writer.stats(),
+        "merchant_cache": merchant_records.cache.stats(),
+        "api_key_cache": verified_api_keys.stats(),
+        "token_versions": token_versions.stats(),
+        "rate_limit": rate_limit.limiter.stats(),
+        "crypto_executor": crypto_executor.stats(),
+        "tokens": token_registry.stats(),
+        "nonce_lease": nonces.lease.stats(),
+        "blockchain": blockchain_manager.stats()
+    }
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
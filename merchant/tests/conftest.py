@@ -0,0 +1,86 @@
+"""
+Shared fixtures.
+
+Database tests run against a scratch database, merchant_test, created and
+migrated on the Postgres server at TEST_DATABASE_URL, and are skipped when it is
+not set:
+
+    TEST_DATABASE_URL=postgresql://postgres@localhost:5432/postgres python -m pytest
+"""
+
+from urllib.parse import urlsplit, urlunsplit
+import asyncio
+import os
+
+import pytest
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "")
+SCRATCH_DATABASE = "merchant_test"
+
+def scratch_url(url: str, database: str = SCRATCH_DATABASE) -> str:
+    return urlunsplit(urlsplit(url)._replace(path=f"/{database}"))
+
+# Settings are read at import time, so they have to be in place before the app is imported
+os.environ.setdefault("SUPABASE_URL", "https://test.supabase.co")
+os.environ.setdefault("SUPABASE_KEY", "test.test.test")
+if TEST_DATABASE_URL:
+    os.environ["DATABASE_BACKEND"] = "postgres"
+    os.environ["DATABASE_URL"] = scratch_url(TEST_DATABASE_URL)
+
+async def recreate_database(database: str, drop_only: bool = False) -> str:
+    import asyncpg
+    
+    conn = await asyncpg.connect(TEST_DATABASE_URL)
+    try:
+        await conn.execute(f"DROP DATABASE IF EXISTS {database} WITH (FORCE)")
+        if not drop_only:
+            await conn.execute(f"CREATE DATABASE {database}")
+    finally:
+        await conn.close()
+    return scratch_url(TEST_DATABASE_URL, database)
+
+async def create_scratch_database() -> str:
+    from app.migrations import runner
+    
+    url = await recreate_database(SCRATCH_DATABASE)
+    await runner.upgrade(url)
+    return url
+
+@pytest.fixture(scope="session")
+def database_url() -> str:
+    """DSN of the migrated scratch database"""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    return asyncio.run(create_scratch_database())
+
+@pytest.fixture
+async def empty_database(database_url):
+    """DSN of a second, empty database, dropped after the test"""
+    url = await recreate_database(f"{SCRATCH_DATABASE}_empty")
+    yield url
+    await recreate_database(f"{SCRATCH_DATABASE}_empty", drop_only=True)
+
+@pytest.fixture
+async def backend(database_url):
+    """The app's PostgresBackend, opened for one test"""
+    from app.repositories.base import get_backend
+    
+    storage = get_backend()
+    await storage.open()
+    yield storage
+    await storage.close()
+
+@pytest.fixture
+async def merchant(backend):
+    """A fresh merchant row"""
+    from app.core.security import api_key_columns, generate_api_key
+    
+    api_key = generate_api_key()
+    suffix = api_key[:8]
+    rows = await backend.insert("merchants", [{
+        "email": f"merchant-{suffix}@example.com",
+        "company_name": f"Merchant {suffix}",
+        **api_key_columns(api_key),
+        "is_active": True,
+    }])
+    return {**rows[0], "plain_api_key": api_key}
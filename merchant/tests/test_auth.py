@@ -0,0 +1,82 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.core.revocation import TokenVersions, token_versions
+from app.core.security import verify_token
+from app.repositories import merchants
+
+@pytest.fixture
+async def client(backend):
+    from main import app
+    
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test/api/v1") as http:
+        yield http
+
+async def login(client, merchant) -> dict:
+    response = await client.post("/auth/login", json={"email": merchant["email"], "api_key": merchant["plain_api_key"]})
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+async def test_me_returns_the_authenticated_merchant(client, merchant):
+    response = await client.get("/auth/me", headers=await login(client, merchant))
+    assert response.status_code == 200
+    assert response.json()["id"] == merchant["id"]
+    assert response.json()["api_key"] is None
+
+async def test_deactivate_revokes_tokens_and_activate_restores_access(client, merchant):
+    headers = await login(client, merchant)
+    assert (await client.get("/auth/me", headers=headers)).status_code == 200
+    
+    response = await client.post("/auth/deactivate", headers=headers)
+    assert response.status_code == 200
+    # The cached copy is dropped right away
+    assert (await merchants.get_cached(merchant["id"]))["is_active"] is False
+    response = await client.get("/auth/me", headers=headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token has been revoked"
+    
+    # A token issued while inactive only opens /activate
+    inactive_headers = await login(client, merchant)
+    response = await client.get("/auth/me", headers=inactive_headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Merchant account is inactive"
+    assert (await client.post("/auth/activate", headers=inactive_headers)).status_code == 200
+    
+    response = await client.get("/auth/me", headers=await login(client, merchant))
+    assert response.status_code == 200
+    assert response.json()["is_active"] is True
+
+async def test_endpoints_reject_missing_and_invalid_tokens(client):
+    assert (await client.post("/auth/deactivate")).status_code == 403
+    response = await client.post("/auth/activate", headers={"Authorization": "Bearer not-a-token"})
+    assert response.status_code == 401
+
+async def test_claims_token_is_revoked_after_deactivation(client, merchant, monkeypatch):
+    monkeypatch.setattr(settings, "jwt_claims_mode", True)
+    await token_versions.refresh()
+    headers = await login(client, merchant)
+    claims = verify_token(headers["Authorization"].split()[1])
+    assert claims["merchant"]["is_active"] is True
+    
+    # Another worker, refreshing its version set in the background
+    other_worker = TokenVersions(refresh_interval=0.05, max_staleness=1)
+    await other_worker.start()
+    try:
+        assert other_worker.is_current(merchant["id"], claims["ver"])
+        
+        assert (await client.post("/auth/deactivate", headers=headers)).status_code == 200
+        
+        # This worker rejects the token immediately, without trusting its claims
+        response = await client.get("/auth/me", headers=headers)
+        assert response.status_code == 401
+        assert response.json()["detail"] == "Token has been revoked"
+        
+        # The other one within its refresh interval
+        await asyncio.sleep(0.2)
+        assert not other_worker.is_current(merchant["id"], claims["ver"])
+    finally:
+        await other_worker.stop()
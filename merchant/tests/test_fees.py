@@ -0,0 +1,105 @@
+import asyncio
+from decimal import Decimal
+
+import httpx
+import pytest
+
+from app.blockchain.evm import DEFAULT_GAS_LIMIT, EVMChain
+from app.blockchain.fees import GasLimits
+from app.core.config import settings
+from app.core.security import get_current_merchant
+from app.models import ChainType, TokenType
+from benchmarks.evm_rpc import responder
+from benchmarks.stub_server import StubServer
+
+# What the stand-in answers: eth_gasPrice, and the last base fee and median rewards of eth_feeHistory
+GAS_PRICE = 5_000_000_000
+BASE_FEE = 1_000_000_000
+TIPS = {"slow": 100_000_000, "standard": 200_000_000, "fast": 300_000_000}
+
+@pytest.fixture
+def rpc():
+    with StubServer(latency=0, responder=responder) as server:
+        yield server
+
+@pytest.fixture
+async def open_chain(rpc):
+    chains = []
+    
+    async def open_chain(chain: ChainType) -> EVMChain:
+        blockchain = EVMChain(chain, {**settings.evm_chains[chain.value], "rpc_urls": [rpc.url]})
+        await blockchain.open()
+        chains.append(blockchain)
+        return blockchain
+    
+    yield open_chain
+    for blockchain in chains:
+        await blockchain.close()
+
+async def test_fees_are_read_again_only_once_stale(open_chain, rpc, monkeypatch):
+    blockchain = await open_chain(ChainType.ETHEREUM)
+    oracle = blockchain.fee_oracle
+    # Suggestions go stale after 0.1s
+    monkeypatch.setattr(settings, "fee_max_age_blocks", 0.1 / blockchain.heads.block_time)
+    
+    # Concurrent callers share one read
+    suggestions = await asyncio.gather(*(oracle.fees() for _ in range(5)))
+    assert suggestions == [{"maxFeePerGas": 2 * BASE_FEE + TIPS["standard"], "maxPriorityFeePerGas": TIPS["standard"]}] * 5
+    assert (oracle.refreshes, oracle.on_demand_refreshes) == (1, 1)
+    
+    requests = rpc.requests
+    assert (await oracle.fees("fast"))["maxPriorityFeePerGas"] == TIPS["fast"]
+    assert (oracle.refreshes, rpc.requests) == (1, requests)
+    
+    await asyncio.sleep(0.15)
+    await oracle.fees("slow")
+    assert (oracle.refreshes, oracle.on_demand_refreshes) == (2, 2)
+
+async def test_legacy_chain_quotes_gas_price(open_chain):
+    blockchain = await open_chain(ChainType.BSC)
+    assert blockchain.fee_model == "legacy"
+    
+    quote = await blockchain.fee_quote(TokenType.USDT)
+    assert quote["gas_limit"] == DEFAULT_GAS_LIMIT
+    assert quote["base_fee_per_gas"] is None
+    assert quote["levels"]["standard"] == {
+        "max_fee_per_gas": None,
+        "max_priority_fee_per_gas": None,
+        "gas_price": GAS_PRICE,
+        "max_cost": Decimal(GAS_PRICE * DEFAULT_GAS_LIMIT) / Decimal(10 ** 18),
+    }
+    assert quote["levels"]["fast"]["gas_price"] == int(GAS_PRICE * 1.25)
+    
+    only = await blockchain.fee_quote(TokenType.USDT, "slow")
+    assert list(only["levels"]) == ["slow"]
+
+async def test_unknown_urgency_is_a_bad_request(open_chain, monkeypatch):
+    from app.blockchain.manager import blockchain_manager
+    from main import app
+    
+    monkeypatch.setitem(blockchain_manager.blockchains, ChainType.ETHEREUM, await open_chain(ChainType.ETHEREUM))
+    monkeypatch.setitem(app.dependency_overrides, get_current_merchant, lambda: {"id": "merchant"})
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test/api/v1") as client:
+        response = await client.get("/payouts/quote", params={"chain": "ethereum", "token": "USDT", "urgency": "ludicrous"})
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Unsupported urgency: ludicrous"
+        
+        response = await client.get("/payouts/quote", params={"chain": "ethereum", "token": "USDT", "urgency": "fast"})
+        assert response.status_code == 200
+        assert list(response.json()["levels"]) == ["fast"]
+
+def test_gas_limit_never_goes_below_the_default():
+    limits = GasLimits(100_000)
+    token = "0xdAC17F958D2ee523a2206206994597C13D831ec7"
+    assert limits.limit(token) == 100_000
+    
+    # Cheap transfers seen so far do not lower it
+    limits.observe(token, 40_000)
+    assert limits.limit(token) == 100_000
+    
+    # Expensive ones raise it, with headroom, whatever the address case
+    limits.observe(token.lower(), 90_000)
+    limits.observe(token, 60_000)
+    assert limits.estimate(token) == 90_000
+    assert limits.limit(token.upper()) == 112_500
@@ -0,0 +1,29 @@
+import httpx
+import pytest
+
+from app.core.config import settings
+
+@pytest.fixture
+async def client(backend):
+    from main import app
+    
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        yield http
+
+async def test_metrics_are_off_without_a_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "metrics_token", "")
+    response = await client.get("/metrics", headers={"Authorization": "Bearer "})
+    assert response.status_code == 404
+
+async def test_metrics_require_the_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "metrics_token", "scrape-me")
+    assert (await client.get("/metrics")).status_code == 401
+    
+    response = await client.get("/metrics", headers={"Authorization": "Bearer guess"})
+    assert response.status_code == 401
+    assert response.headers["WWW-Authenticate"] == "Bearer"
+    
+    response = await client.get("/metrics", headers={"Authorization": "Bearer scrape-me"})
+    assert response.status_code == 200
+    assert "database" in response.json()
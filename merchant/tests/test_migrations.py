@@ -0,0 +1,27 @@
+import asyncpg
+
+from app.migrations import load_schema, runner
+
+SCHEMA_OBJECTS = """
+SELECT c.relname, c.relkind, t.tgname
+FROM pg_class c LEFT JOIN pg_trigger t ON t.tgrelid = c.oid AND NOT t.tgisinternal
+WHERE c.relnamespace = 'public'::regnamespace
+ORDER BY 1, 2, 3
+"""
+
+async def test_concatenated_schema_can_run_twice(empty_database):
+    conn = await asyncpg.connect(empty_database)
+    try:
+        await conn.execute(load_schema())
+        objects = await conn.fetch(SCHEMA_OBJECTS)
+        await conn.execute("INSERT INTO merchants (email, company_name, api_key_prefix) VALUES ('a@example.com', 'A', 'a')")
+        
+        await conn.execute(load_schema())
+        assert await conn.fetch(SCHEMA_OBJECTS) == objects
+        assert await conn.fetchval("SELECT count(*) FROM merchants") == 1
+    finally:
+        await conn.close()
+
+async def test_upgrade_is_a_no_op_once_applied(database_url):
+    assert await runner.upgrade(database_url) == []
+    assert all(migration["applied"] for migration in await runner.status(database_url))
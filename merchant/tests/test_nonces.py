@@ -0,0 +1,133 @@
+import asyncio
+import random
+import time
+from typing import List, Optional
+
+import pytest
+
+from app.blockchain.nonces import MemoryNonceLease, NonceLease, NonceManager, PostgresNonceLease, WalletBusy
+from app.core.config import settings
+
+WALLET = "0x000000000000000000000000000000000000dEaD"
+
+class Chain:
+    """Pending transaction count of every wallet, as the node reports it"""
+    
+    def __init__(self, pending: int = 7):
+        self.pending = pending
+        self.fetches = 0
+    
+    async def fetch_pending(self, address: str) -> int:
+        self.fetches += 1
+        await asyncio.sleep(0.01)
+        return self.pending
+
+class ScriptedLease(NonceLease):
+    """Answers try_acquire from a script: True taken, False renewed, None held elsewhere"""
+    
+    name = "scripted"
+    
+    def __init__(self, results: List[Optional[bool]]):
+        super().__init__()
+        self.results = results
+    
+    async def try_acquire(self, key: str, ttl: float) -> Optional[bool]:
+        return self.results.pop(0) if len(self.results) > 1 else self.results[0]
+
+async def reserve(nonces: NonceManager) -> int:
+    async with nonces.reserve(WALLET) as nonce:
+        return nonce
+
+async def test_concurrent_reservations_get_consecutive_nonces():
+    chain = Chain()
+    nonces = NonceManager("ethereum", chain.fetch_pending, MemoryNonceLease())
+    
+    async def send() -> int:
+        async with nonces.reserve(WALLET) as nonce:
+            # Signing and broadcasting overlap across sends
+            await asyncio.sleep(random.uniform(0, 0.02))
+            return nonce
+    
+    allocated = await asyncio.gather(*(send() for _ in range(50)))
+    assert sorted(allocated) == list(range(7, 57))
+    assert chain.fetches == 1
+    assert nonces.stats()["in_flight"] == 0
+
+async def test_failed_send_resyncs_before_the_next_one():
+    chain = Chain()
+    nonces = NonceManager("ethereum", chain.fetch_pending, MemoryNonceLease())
+    assert await reserve(nonces) == 7
+    chain.pending = 8
+    
+    with pytest.raises(RuntimeError):
+        async with nonces.reserve(WALLET) as nonce:
+            assert nonce == 8
+            raise RuntimeError("broadcast failed")
+    # The node never saw nonce 8, so it is handed out again
+    assert await reserve(nonces) == 8
+    assert (chain.fetches, nonces.failures) == (2, 1)
+
+async def test_idle_wallet_is_checked_for_gaps(monkeypatch):
+    monkeypatch.setattr(settings, "nonce_resync_seconds", 0.1)
+    chain = Chain()
+    nonces = NonceManager("ethereum", chain.fetch_pending, MemoryNonceLease())
+    assert [await reserve(nonces), await reserve(nonces)] == [7, 8]
+    assert chain.fetches == 1
+    
+    # Nonce 8 was dropped: the node still expects it
+    chain.pending = 8
+    await asyncio.sleep(0.15)
+    assert await reserve(nonces) == 8
+    assert (chain.fetches, nonces.gaps) == (2, 1)
+
+async def test_idle_check_waits_for_sends_in_flight(monkeypatch):
+    monkeypatch.setattr(settings, "nonce_resync_seconds", 0.05)
+    chain = Chain()
+    nonces = NonceManager("ethereum", chain.fetch_pending, MemoryNonceLease())
+    async with nonces.reserve(WALLET) as first:
+        await asyncio.sleep(0.1)
+        # The node has not seen `first` yet, so its count would be stale
+        assert await reserve(nonces) == first + 1
+    assert chain.fetches == 1
+
+async def test_reacquired_lease_resyncs(monkeypatch):
+    # Every reservation asks the lease backend
+    monkeypatch.setattr(settings, "nonce_lease_seconds", 0)
+    chain = Chain()
+    lease = ScriptedLease([True, False, True])
+    nonces = NonceManager("ethereum", chain.fetch_pending, lease)
+    assert await reserve(nonces) == 7
+    
+    # Renewed: still ours, no round trip to the node
+    chain.pending = 20
+    assert await reserve(nonces) == 8
+    assert chain.fetches == 1
+    
+    # Lost and taken again: another worker sent up to nonce 19 meanwhile
+    assert await reserve(nonces) == 20
+    assert chain.fetches == 2
+
+async def test_wallet_held_elsewhere_raises_wallet_busy(monkeypatch):
+    monkeypatch.setattr(settings, "nonce_lease_wait_seconds", 0.1)
+    chain = Chain()
+    lease = ScriptedLease([None])
+    nonces = NonceManager("ethereum", chain.fetch_pending, lease)
+    
+    started = time.monotonic()
+    with pytest.raises(WalletBusy):
+        await reserve(nonces)
+    assert time.monotonic() - started >= 0.1
+    assert lease.waits > 0
+    assert (chain.fetches, nonces.allocated) == (0, 0)
+
+async def test_postgres_lease_is_held_by_one_worker(backend, monkeypatch):
+    monkeypatch.setattr(settings, "nonce_lease_wait_seconds", 0.1)
+    key = f"ethereum:{WALLET.lower()}:{random.getrandbits(32)}"
+    first, second = PostgresNonceLease(), PostgresNonceLease()
+    
+    assert await first.acquire(key) is True
+    with pytest.raises(WalletBusy):
+        await second.acquire(key)
+    # Renewing is not a new acquisition
+    first.held_until.clear()
+    assert await first.acquire(key) is False
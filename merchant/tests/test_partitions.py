@@ -0,0 +1,67 @@
+from datetime import datetime, time, timezone
+import asyncio
+import uuid
+
+from app.core.config import settings
+from app.migrations import runner
+from app.migrations.partitions import PartitionMaintainer, apply_retention, ensure_future_partitions, month_offset
+
+def last_partition(table: str) -> str:
+    month = month_offset(datetime.utcnow().date().replace(day=1), settings.partition_months_ahead)
+    return f"{table}_{month:%Y_%m}"
+
+async def partition_exists(conn, name: str) -> bool:
+    return await conn.fetchval("SELECT to_regclass($1) IS NOT NULL", name)
+
+async def test_maintainer_recreates_missing_partitions_periodically(backend):
+    names = [last_partition("transactions"), last_partition("webhook_logs")]
+    maintainer = PartitionMaintainer(0.05)
+    async with backend.pool.acquire() as conn:
+        for name in names:
+            await conn.execute(f'DROP TABLE IF EXISTS "{name}"')
+        
+        await maintainer.start()
+        try:
+            assert [await partition_exists(conn, name) for name in names] == [True, True]
+            
+            # A partition that goes missing while the process runs comes back on the next check
+            await conn.execute(f'DROP TABLE "{names[0]}"')
+            await asyncio.sleep(0.3)
+            assert await partition_exists(conn, names[0])
+        finally:
+            await maintainer.stop()
+    assert maintainer.runs >= 2 and maintainer.created >= 3 and maintainer.errors == 0
+
+async def test_dry_run_leaves_the_database_and_archive_alone(backend, database_url, tmp_path):
+    name = last_partition("transactions")
+    async with backend.pool.acquire() as conn:
+        await conn.execute(f'DROP TABLE IF EXISTS "{name}"')
+        try:
+            await apply_retention(database_url, str(tmp_path / "archive"), dry_run=True)
+            assert not await partition_exists(conn, name)
+            assert not (tmp_path / "archive").exists()
+        finally:
+            await ensure_future_partitions()
+
+async def test_rebuild_after_retention_keeps_archived_rollups(backend, database_url, merchant, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "transaction_retention_months", 12)
+    monkeypatch.setattr(settings, "webhook_log_retention_months", 0)
+    this_month = datetime.utcnow().date().replace(day=1)
+    archived_month = month_offset(this_month, -14)
+    async with backend.pool.acquire() as conn:
+        await conn.execute("SELECT ensure_monthly_partitions('transactions', $1, $2)", archived_month, settings.partition_months_ahead)
+        for created_at in (archived_month.replace(day=5), this_month):
+            await conn.execute(
+                "INSERT INTO transactions (merchant_id, tx_hash, chain, token, amount, from_address, to_address, status, created_at) "
+                "VALUES ($1, $2, 'ethereum', 'USDC', 10, '0xdef', '0xabc', 'confirmed', $3)",
+                uuid.UUID(merchant["id"]), f"0x{uuid.uuid4().hex}", datetime.combine(created_at, time(12), timezone.utc)
+            )
+    
+    before = await backend.rpc("rollup_totals", {"p_merchant_id": merchant["id"]})
+    assert before == {"transactions": {"confirmed": 2}}
+    
+    archived = await apply_retention(database_url, str(tmp_path))
+    assert any(line.startswith(f"transactions_{archived_month:%Y_%m} ") for line in archived)
+    await runner.rebuild_rollups(database_url)
+    
+    assert await backend.rpc("rollup_totals", {"p_merchant_id": merchant["id"]}) == before
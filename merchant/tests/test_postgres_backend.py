@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+import asyncio
+import uuid
+
+import pytest
+
+async def create_payment_requests(backend, merchant, count: int):
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return await backend.insert("payment_requests", [
+        {
+            "merchant_id": merchant["id"],
+            "payment_id": f"pay_{uuid.uuid4().hex}",
+            "chain": "ethereum",
+            "token": "USDC",
+            "amount": f"{i + 1}.5",
+            "recipient_address": "0xabc",
+            "status": "pending" if i % 2 else "completed",
+            # ISO strings, as the routers pass them
+            "created_at": (start + timedelta(minutes=i)).isoformat(),
+        }
+        for i in range(count)
+    ])
+
+async def test_hot_queries_run_repeatedly(backend, merchant):
+    # More rounds than pooled connections, so connections are reused across acquires
+    for _ in range(backend.pool.get_max_size() * 2):
+        rows = await backend.select("merchants", "*", {"id": merchant["id"]})
+        assert [row["id"] for row in rows] == [merchant["id"]]
+
+async def test_hot_queries_run_concurrently(backend, merchant):
+    results = await asyncio.gather(*(backend.select("merchants", "*", {"id": merchant["id"]}) for _ in range(50)))
+    assert all(rows[0]["email"] == merchant["email"] for rows in results)
+
+async def test_insert_returns_postgrest_shaped_rows(backend, merchant):
+    rows = await create_payment_requests(backend, merchant, 1)
+    row = rows[0]
+    assert isinstance(row["id"], str)
+    assert row["amount"] == Decimal("1.5")
+    assert datetime.fromisoformat(row["created_at"]) == datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+async def test_insert_rows_with_different_columns(backend, merchant):
+    base = {"merchant_id": merchant["id"], "chain": "ethereum", "token": "USDC", "amount": "1", "recipient_address": "0xabc"}
+    rows = await backend.insert("payment_requests", [
+        {**base, "payment_id": f"mixed_1_{merchant['id']}"},
+        {**base, "payment_id": f"mixed_2_{merchant['id']}", "status": "completed", "expires_at": "2026-01-02T00:00:00+00:00"},
+    ])
+    # Columns a row leaves out get their defaults, and a later row's extra columns are kept
+    assert [row["status"] for row in rows] == ["pending", "completed"]
+    assert rows[0]["expires_at"] is None
+    assert datetime.fromisoformat(rows[1]["expires_at"]) == datetime(2026, 1, 2, tzinfo=timezone.utc)
+
+async def test_select_filters_and_columns(backend, merchant):
+    created = await create_payment_requests(backend, merchant, 4)
+    payment_ids = [row["payment_id"] for row in created]
+    
+    rows = await backend.select("payment_requests", "payment_id, status", {
+        "merchant_id": merchant["id"],
+        "payment_id__in": payment_ids[:3],
+        "created_at__gte": created[1]["created_at"],
+    }, order_by="created_at", desc=False)
+    assert rows == [{"payment_id": payment_ids[1], "status": "pending"}, {"payment_id": payment_ids[2], "status": "completed"}]
+
+async def test_select_pages_with_offset_and_keyset(backend, merchant):
+    created = await create_payment_requests(backend, merchant, 5)
+    newest_first = [row["id"] for row in reversed(created)]
+    
+    page = await backend.select("payment_requests", "*", {"merchant_id": merchant["id"]}, order_by="created_at", limit=2, offset=2)
+    assert [row["id"] for row in page] == newest_first[2:4]
+    
+    last = page[-1]
+    page = await backend.select(
+        "payment_requests", "*", {"merchant_id": merchant["id"]},
+        order_by="created_at", limit=2, after=(last["created_at"], last["id"])
+    )
+    assert [row["id"] for row in page] == newest_first[4:]
+
+async def test_dotted_filter_joins_the_parent_table(backend, merchant):
+    payment = (await create_payment_requests(backend, merchant, 1))[0]
+    tx_hash = f"0x{uuid.uuid4().hex}"
+    await backend.insert("transactions", [{
+        "payment_request_id": payment["id"],
+        "tx_hash": tx_hash,
+        "chain": "ethereum",
+        "token": "USDC",
+        "amount": "1.5",
+        "from_address": "0xdef",
+        "to_address": "0xabc",
+    }])
+    
+    rows = await backend.select("transactions", "tx_hash, merchant_id", {"payment_requests.merchant_id": merchant["id"]})
+    assert rows == [{"tx_hash": tx_hash, "merchant_id": merchant["id"]}]
+
+async def test_update_returns_changed_rows(backend, merchant):
+    payment = (await create_payment_requests(backend, merchant, 1))[0]
+    rows = await backend.update("payment_requests", {"status": "expired"}, {"id": payment["id"]})
+    assert [row["status"] for row in rows] == ["expired"]
+    assert await backend.update("payment_requests", {"status": "expired"}, {"id": str(uuid.uuid4())}) == []
+
+async def test_rpc_returns_function_result(backend, merchant):
+    await create_payment_requests(backend, merchant, 3)
+    totals = await backend.rpc("rollup_totals", {"p_merchant_id": merchant["id"]})
+    assert totals == {"payment_requests": {"completed": 2, "pending": 1}}
+
+async def test_unknown_identifiers_are_rejected(backend):
+    with pytest.raises(ValueError):
+        await backend.select("merchants; DROP TABLE merchants", "*", {})
@@ -0,0 +1,56 @@
+import uuid
+
+async def create_payment(backend, merchant, status: str = "pending"):
+    rows = await backend.insert("payment_requests", [{
+        "merchant_id": merchant["id"],
+        "payment_id": f"pay_{uuid.uuid4().hex}",
+        "chain": "ethereum",
+        "token": "USDC",
+        "amount": "10",
+        "recipient_address": "0xabc",
+        "status": status,
+    }])
+    return rows[0]
+
+async def create_transaction(backend, payment, status: str = "pending"):
+    rows = await backend.insert("transactions", [{
+        "payment_request_id": payment["id"],
+        "tx_hash": f"0x{uuid.uuid4().hex}",
+        "chain": "ethereum",
+        "token": "USDC",
+        "amount": "10",
+        "from_address": "0xdef",
+        "to_address": "0xabc",
+        "status": status,
+    }])
+    return rows[0]
+
+async def test_deleting_a_merchant_cascades_through_rolled_up_rows(backend, merchant):
+    payment = await create_payment(backend, merchant)
+    await create_transaction(backend, payment)
+    await backend.insert("payouts", [{
+        "merchant_id": merchant["id"],
+        "payout_id": f"po_{uuid.uuid4().hex}",
+        "chain": "ethereum",
+        "token": "USDC",
+        "amount": "3",
+        "recipient_address": "0xabc",
+    }])
+    
+    async with backend.pool.acquire() as conn:
+        await conn.execute("DELETE FROM merchants WHERE id = $1", uuid.UUID(merchant["id"]))
+        assert await conn.fetchval("SELECT count(*) FROM daily_rollups WHERE merchant_id = $1", uuid.UUID(merchant["id"])) == 0
+
+async def test_deleting_a_row_removes_it_from_its_rollup(backend, merchant):
+    payment = await create_payment(backend, merchant)
+    async with backend.pool.acquire() as conn:
+        await conn.execute("DELETE FROM payment_requests WHERE id = $1", uuid.UUID(payment["id"]))
+    assert await backend.rpc("rollup_totals", {"p_merchant_id": merchant["id"]}) == {}
+
+async def test_partitioned_transactions_roll_up_under_their_table_name(backend, merchant):
+    payment = await create_payment(backend, merchant, status="completed")
+    transaction = await create_transaction(backend, payment)
+    await backend.update("transactions", {"status": "confirmed"}, {"id": transaction["id"]})
+    
+    totals = await backend.rpc("rollup_totals", {"p_merchant_id": merchant["id"]})
+    assert totals == {"payment_requests": {"completed": 1}, "transactions": {"confirmed": 1}}
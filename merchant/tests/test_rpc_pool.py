@@ -0,0 +1,186 @@
+from contextlib import ExitStack
+import asyncio
+import time
+
+import aiohttp
+import pytest
+
+from app.blockchain.rpc import Endpoint, EndpointError, RpcPool
+from app.core.config import settings
+from benchmarks.evm_rpc import responder
+from benchmarks.stub_server import StubServer
+
+BLOCK_NUMBER = {"jsonrpc": "2.0", "id": 1, "method": "eth_blockNumber", "params": []}
+SEND_RAW = {"jsonrpc": "2.0", "id": 1, "method": "eth_sendRawTransaction", "params": ["0x00"]}
+
+class Upstream:
+    """RPC endpoint stand-in whose latency and failures can be changed mid-test"""
+    
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.failing = False
+        self.arrivals = []
+        self.server = StubServer(latency=self._latency, responder=responder, fault=lambda: 503 if self.failing else None)
+    
+    def _latency(self) -> float:
+        self.arrivals.append(time.monotonic())
+        return self.delay
+
+@pytest.fixture
+def upstream():
+    """Factory of running Upstreams, shut down after the test"""
+    with ExitStack() as stack:
+        def start(delay: float = 0.0) -> Upstream:
+            server = Upstream(delay)
+            stack.enter_context(server.server)
+            return server
+        
+        yield start
+
+@pytest.fixture
+async def pool_over():
+    """Factory of open RpcPools over Upstreams"""
+    sessions = []
+    
+    def open_pool(*upstreams: Upstream, hedge: bool = False) -> RpcPool:
+        pool = RpcPool([server.server.url for server in upstreams], hedge=hedge)
+        pool.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5), raise_for_status=True)
+        sessions.append(pool.session)
+        return pool
+    
+    yield open_pool
+    for session in sessions:
+        await session.close()
+
+async def test_fails_over_to_the_next_endpoint(upstream, pool_over):
+    first, second = upstream(), upstream()
+    first.failing = True
+    pool = pool_over(first, second)
+    
+    assert (await pool.post(BLOCK_NUMBER))["result"] == "0x1000"
+    assert [len(first.arrivals), len(second.arrivals)] == [1, 1]
+    assert pool.failovers == 1
+    assert pool.endpoints[0].failures == 1
+
+async def test_fails_over_when_an_endpoint_is_unreachable(upstream, pool_over):
+    with upstream().server as closed:
+        url = closed.url
+    pool = pool_over(upstream())
+    pool.endpoints.insert(0, Endpoint(url))
+    
+    assert (await pool.post(BLOCK_NUMBER))["result"] == "0x1000"
+    # Nothing reached the endpoint, so even a write may be sent elsewhere
+    assert "result" in await pool.post(SEND_RAW, idempotent=False)
+    assert pool.failovers == 2
+
+async def test_writes_are_not_repeated_after_reaching_an_endpoint(upstream, pool_over):
+    first, second = upstream(), upstream()
+    first.failing = True
+    pool = pool_over(first, second)
+    
+    with pytest.raises(EndpointError):
+        await pool.post(SEND_RAW, idempotent=False)
+    assert [len(first.arrivals), len(second.arrivals)] == [1, 0]
+
+async def test_failing_endpoint_is_ejected_then_readmitted(upstream, pool_over, monkeypatch):
+    monkeypatch.setattr(settings, "rpc_eject_after_failures", 2)
+    monkeypatch.setattr(settings, "rpc_eject_seconds", 0.3)
+    first, second = upstream(), upstream()
+    first.failing = True
+    pool = pool_over(first, second)
+    
+    for _ in range(2):
+        await pool.post(BLOCK_NUMBER)
+    assert not pool.endpoints[0].available and pool.endpoints[0].ejections == 1
+    
+    # While ejected it gets no traffic, even though it would score best (never measured)
+    for _ in range(3):
+        await pool.post(BLOCK_NUMBER)
+    assert [len(first.arrivals), len(second.arrivals)] == [2, 5]
+    
+    # Back in rotation after the cool-off
+    first.failing = False
+    await asyncio.sleep(0.35)
+    assert pool.endpoints[0].available
+    await pool.post(BLOCK_NUMBER)
+    assert len(first.arrivals) == 3
+    assert pool.endpoints[0].consecutive_failures == 0
+
+async def test_all_endpoints_ejected_still_tries_the_one_due_back_first(upstream, pool_over, monkeypatch):
+    monkeypatch.setattr(settings, "rpc_eject_after_failures", 1)
+    monkeypatch.setattr(settings, "rpc_eject_seconds", 60)
+    first, second = upstream(), upstream()
+    first.failing = second.failing = True
+    pool = pool_over(first, second)
+    
+    with pytest.raises(EndpointError):
+        await pool.post(BLOCK_NUMBER)
+    first.failing = second.failing = False
+    
+    assert (await pool.post(BLOCK_NUMBER))["result"] == "0x1000"
+    assert len(first.arrivals) == 2
+
+async def warm_up(pool: RpcPool, requests: int = 10):
+    """Measure every endpoint, each one on its own"""
+    for endpoint in pool.endpoints:
+        for _ in range(requests):
+            await pool._send(endpoint, BLOCK_NUMBER)
+
+async def test_hedges_a_slow_read_after_the_p95_delay(upstream, pool_over, monkeypatch):
+    monkeypatch.setattr(settings, "rpc_hedge_min_delay_ms", 0)
+    first, second = upstream(0.05), upstream(0.1)
+    pool = pool_over(first, second, hedge=True)
+    await warm_up(pool, requests=5)
+    p95 = pool.endpoints[0].p95()
+    assert pool.pick() is pool.endpoints[0]
+    
+    # Answered within its p95: no second request
+    first.delay = 0.02
+    await pool.post(BLOCK_NUMBER)
+    assert pool.hedges == 0 and len(second.arrivals) == 5
+    
+    # Stalled: the same read goes to the other endpoint once the p95 has passed, and it answers first
+    first.delay = 1.0
+    started = time.perf_counter()
+    assert (await pool.post(BLOCK_NUMBER))["result"] == "0x1000"
+    assert time.perf_counter() - started < 0.5
+    assert second.arrivals[-1] - first.arrivals[-1] >= p95 * 0.9
+    assert (pool.hedges, pool.hedge_wins) == (1, 1)
+
+async def test_writes_are_never_hedged(upstream, pool_over, monkeypatch):
+    monkeypatch.setattr(settings, "rpc_hedge_min_delay_ms", 0)
+    first, second = upstream(0.02), upstream(0.05)
+    pool = pool_over(first, second, hedge=True)
+    await warm_up(pool, requests=3)
+    
+    first.delay = 0.3
+    await pool.post(SEND_RAW, idempotent=False)
+    assert pool.hedges == 0 and len(second.arrivals) == 3
+
+async def test_routes_to_the_lowest_latency_endpoint(upstream, pool_over):
+    slow, fast = upstream(0.05), upstream(0.005)
+    pool = pool_over(slow, fast)
+    
+    for _ in range(20):
+        await pool.post(BLOCK_NUMBER)
+    # Each is tried once while unmeasured, then the faster one takes the traffic
+    assert [len(slow.arrivals), len(fast.arrivals)] == [1, 19]
+    
+    # Once its average climbs past the other's, traffic moves back
+    fast.delay = 0.2
+    for _ in range(10):
+        await pool.post(BLOCK_NUMBER)
+    assert len(slow.arrivals) >= 5
+
+async def test_errors_count_against_an_endpoint(upstream, pool_over):
+    flaky, steady = upstream(0.005), upstream(0.02)
+    pool = pool_over(flaky, steady)
+    await warm_up(pool, requests=3)
+    assert pool.pick() is pool.endpoints[0]
+    
+    # One failure is enough to score the faster endpoint below the steady one
+    flaky.failing = True
+    await pool.post(BLOCK_NUMBER)
+    flaky.failing = False
+    assert pool.endpoints[0].error_rate > 0
+    assert pool.pick() is pool.endpoints[1]
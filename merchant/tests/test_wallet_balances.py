@@ -0,0 +1,182 @@
+import json
+from decimal import Decimal
+
+import pytest
+from eth_abi import decode, encode
+
+from app.blockchain import evm
+from app.blockchain.evm import EVMChain
+from app.blockchain.manager import blockchain_manager
+from app.blockchain.tokens import TokenRegistry, token_registry
+from app.core.config import settings
+from app.models import ChainType, TokenType
+from app.routers.wallets import wallet_balances
+from benchmarks.evm_rpc import AGGREGATE3, BALANCE_OF, DECIMALS, HOLDER
+from benchmarks.stub_server import StubServer
+
+OTHER_HOLDER = "0x00000000000000000000000000000000000bEEF1"
+# balanceOf reverts for this holder on every token, and for every holder on BAD_TOKEN
+BAD_HOLDER = "0x00000000000000000000000000000000000Bad00"
+BAD_TOKEN = TokenType.USDT
+
+def units(target: str, holder: str) -> int:
+    """Raw balance the stand-in reports, different for every (token, holder)"""
+    return int(target[-4:], 16) * 1_000_000 + int(holder[-4:], 16)
+
+class Chain:
+    """JSON-RPC stand-in for ERC-20 and Multicall3 reads, recording each call it answers"""
+    
+    def __init__(self, decimals: int = 6, bad_token: str = "", multicall: bool = True):
+        self.decimals = decimals
+        self.bad_token = bad_token.lower()
+        self.multicall = multicall
+        self.calls = []
+    
+    def call(self, target: str, data: bytes):
+        """(success, return data) of one eth_call"""
+        self.calls.append(data[:4])
+        if data[:4].hex() == DECIMALS[2:]:
+            return True, self.decimals.to_bytes(32, "big")
+        holder = "0x" + data[-20:].hex()
+        if target.lower() == self.bad_token or holder == BAD_HOLDER.lower():
+            return False, b""
+        return True, units(target, holder).to_bytes(32, "big")
+    
+    def result(self, request: dict) -> dict:
+        reply = {"jsonrpc": "2.0", "id": request.get("id")}
+        if request["method"] != "eth_call":
+            return {**reply, "result": "0x1"}
+        target = request["params"][0]["to"]
+        data = bytes.fromhex((request["params"][0].get("data") or request["params"][0]["input"])[2:])
+        if data[:4].hex() == AGGREGATE3[2:]:
+            self.calls.append(data[:4])
+            if not self.multicall:
+                return {**reply, "error": {"code": -32000, "message": "execution reverted"}}
+            (calls,) = decode(["(address,bool,bytes)[]"], data[4:])
+            results = [self.call(call_target, call_data) for call_target, _, call_data in calls]
+            return {**reply, "result": "0x" + encode(["(bool,bytes)[]"], [results]).hex()}
+        success, output = self.call(target, data)
+        if not success:
+            return {**reply, "error": {"code": 3, "message": "execution reverted"}}
+        return {**reply, "result": "0x" + output.hex()}
+    
+    def responder(self, path: str, body: bytes):
+        payload = json.loads(body or b"{}")
+        if isinstance(payload, list):
+            return [self.result(request) for request in payload]
+        return self.result(payload)
+    
+    def count(self, selector: str) -> int:
+        return sum(1 for call in self.calls if call.hex() == selector[2:])
+
+@pytest.fixture
+def chain_stub():
+    stub = Chain(bad_token=token_registry.get(ChainType.ETHEREUM, BAD_TOKEN).address)
+    with StubServer(latency=0, responder=stub.responder) as server:
+        stub.url = server.url
+        yield stub
+
+async def open_chain(chain: ChainType, url: str) -> EVMChain:
+    blockchain = EVMChain(chain, {**settings.evm_chains[chain.value], "rpc_urls": [url]})
+    blockchain.cache = None  # every read should reach the stand-in
+    await blockchain.open()
+    return blockchain
+
+def expected(chain: ChainType, token: TokenType, holder: str) -> Decimal:
+    entry = token_registry.get(chain, token)
+    return entry.from_units(units(entry.address, holder.lower()))
+
+async def test_a_reverting_call_does_not_fail_its_batch(chain_stub):
+    blockchain = await open_chain(ChainType.ETHEREUM, chain_stub.url)
+    try:
+        balances = await blockchain.get_balances([
+            (HOLDER, TokenType.USDC),
+            (HOLDER, BAD_TOKEN),
+            (BAD_HOLDER, TokenType.USDC),
+            (OTHER_HOLDER, TokenType.USDC),
+        ])
+    finally:
+        await blockchain.close()
+    
+    assert balances == [
+        expected(ChainType.ETHEREUM, TokenType.USDC, HOLDER),
+        None,
+        None,
+        expected(ChainType.ETHEREUM, TokenType.USDC, OTHER_HOLDER),
+    ]
+    # One aggregate3 round trip, not a fallback to one call per balance
+    assert chain_stub.count(AGGREGATE3) == 1
+    assert (blockchain.multicall_batches, blockchain.multicall_calls, blockchain.multicall_failures) == (1, 4, 0)
+
+async def test_failed_batch_falls_back_to_one_read_per_balance(chain_stub):
+    chain_stub.multicall = False
+    blockchain = await open_chain(ChainType.ETHEREUM, chain_stub.url)
+    try:
+        balances = await blockchain.get_balances([(HOLDER, TokenType.USDC), (BAD_HOLDER, TokenType.USDC), (HOLDER, BAD_TOKEN)])
+    finally:
+        await blockchain.close()
+    
+    assert balances == [expected(ChainType.ETHEREUM, TokenType.USDC, HOLDER), None, None]
+    assert blockchain.multicall_failures == 1
+    assert chain_stub.count(BALANCE_OF) == 3
+
+async def test_batches_are_split_at_the_configured_size(chain_stub, monkeypatch):
+    monkeypatch.setattr(settings, "multicall_batch_size", 2)
+    holders = [f"0x{i:040x}" for i in range(1, 6)]
+    blockchain = await open_chain(ChainType.ETHEREUM, chain_stub.url)
+    try:
+        balances = await blockchain.get_balances([(holder, TokenType.USDC) for holder in holders])
+    finally:
+        await blockchain.close()
+    
+    assert balances == [expected(ChainType.ETHEREUM, TokenType.USDC, holder) for holder in holders]
+    assert chain_stub.count(AGGREGATE3) == 3
+
+async def test_unconfigured_decimals_are_fetched_once_per_token(chain_stub, monkeypatch):
+    chain_stub.decimals = 18
+    registry = TokenRegistry(settings.supported_tokens, {}, list(settings.evm_chains))
+    monkeypatch.setattr(evm, "token_registry", registry)
+    blockchain = await open_chain(ChainType.ETHEREUM, chain_stub.url)
+    try:
+        first = await blockchain.get_balances([(HOLDER, TokenType.USDC), (OTHER_HOLDER, TokenType.USDC), (HOLDER, TokenType.DAI)])
+        assert chain_stub.count(DECIMALS) == 2
+        
+        # Later reads, batched or not, reuse the fetched decimals
+        second = await blockchain.get_balances([(HOLDER, TokenType.USDC), (HOLDER, TokenType.DAI)])
+        single = await blockchain.get_balance(OTHER_HOLDER, TokenType.USDC)
+    finally:
+        await blockchain.close()
+    
+    assert chain_stub.count(DECIMALS) == 2
+    usdc = registry.get(ChainType.ETHEREUM, TokenType.USDC)
+    assert usdc.decimals == 18
+    assert first[0] == second[0] == Decimal(units(usdc.address, HOLDER.lower())) / Decimal(10 ** 18)
+    assert single == first[1]
+    assert registry.stats()["fetched_decimals"] == 2
+
+async def test_router_matches_serial_reads(chain_stub, monkeypatch):
+    chains = [ChainType(name) for name in settings.evm_chains]
+    for chain in chains:
+        monkeypatch.setitem(blockchain_manager.blockchains, chain, await open_chain(chain, chain_stub.url))
+    wallets = [{"chain": chain.value, "address": holder} for chain in chains for holder in (HOLDER, OTHER_HOLDER)]
+    
+    try:
+        serial = []
+        for wallet in wallets:
+            chain = ChainType(wallet["chain"])
+            for token in token_registry.symbols(chain):
+                try:
+                    balance = await blockchain_manager.get_balance(chain, wallet["address"], token)
+                except Exception:
+                    balance = Decimal(0)
+                serial.append((wallet["chain"], token.value, wallet["address"], balance))
+        assert chain_stub.count(AGGREGATE3) == 0
+        
+        batched = await wallet_balances(wallets)
+    finally:
+        for chain in chains:
+            await blockchain_manager.blockchains[chain].close()
+    
+    assert [(balance.chain, balance.token, balance.address, balance.balance) for balance in batched] == serial
+    # One aggregate3 call per chain instead of one balanceOf per (wallet, token)
+    assert chain_stub.count(AGGREGATE3) == len(chains)
@@ -0,0 +1,35 @@
+import httpx
+import pytest
+
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.security import get_current_merchant
+from app.repositories import webhook_logs
+
+@pytest.fixture
+async def client(backend, merchant, monkeypatch):
+    from main import app
+    
+    monkeypatch.setitem(app.dependency_overrides, get_current_merchant, lambda: merchant)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test/api/v1") as http:
+        yield http
+
+async def test_logs_page_by_cursor(client, merchant):
+    for i in range(5):
+        # The writer is not running, so each log is inserted straight away
+        await webhook_logs.record({"merchant_id": merchant["id"], "event_type": "test", "payload": {"n": i}, "retry_count": 0})
+    
+    seen = []
+    params = {"limit": 2}
+    while True:
+        response = await client.get("/webhooks/logs", params=params)
+        assert response.status_code == 200
+        seen += [log["payload"]["n"] for log in response.json()]
+        if NEXT_CURSOR_HEADER not in response.headers:
+            break
+        params = {"limit": 2, "cursor": response.headers[NEXT_CURSOR_HEADER]}
+    assert seen == [4, 3, 2, 1, 0]
+
+async def test_logs_limit_and_offset_are_bounded(client):
+    assert (await client.get("/webhooks/logs", params={"limit": 101})).status_code == 422
+    assert (await client.get("/webhooks/logs", params={"offset": -1})).status_code == 422
@@ -0,0 +1,104 @@
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+
+from app.repositories import write_behind
+from app.repositories.write_behind import WriteBehindWriter
+
+class Backend:
+    """Records every insert; `release` is cleared to hold inserts until the test sets it"""
+    
+    def __init__(self):
+        self.inserts: List[List[Dict[str, Any]]] = []
+        self.release = asyncio.Event()
+        self.release.set()
+    
+    async def insert(self, table: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        await self.release.wait()
+        self.inserts.append(rows)
+        return rows
+    
+    @property
+    def rows(self) -> List[Dict[str, Any]]:
+        return [row for rows in self.inserts for row in rows]
+
+@pytest.fixture
+def recorder(monkeypatch):
+    """Stands in for the storage backend the writer inserts through"""
+    recorder = Backend()
+    monkeypatch.setattr(write_behind, "get_backend", lambda: recorder)
+    return recorder
+
+@pytest.fixture
+async def start_writer():
+    writers = []
+    
+    async def start(batch_size: int = 100, flush_interval: float = 10, max_buffered: int = 1000) -> WriteBehindWriter:
+        writer = WriteBehindWriter("webhook_logs", batch_size, flush_interval, max_buffered)
+        await writer.start()
+        writers.append(writer)
+        return writer
+    
+    yield start
+    for writer in writers:
+        await writer.stop()
+
+async def test_flushes_when_a_batch_is_full(recorder, start_writer):
+    writer = await start_writer(batch_size=3)
+    for i in range(4):
+        await writer.put({"n": i})
+    await asyncio.sleep(0.05)
+    
+    # The fourth row waits for more rows or the interval
+    assert recorder.inserts == [[{"n": 0}, {"n": 1}, {"n": 2}]]
+
+async def test_flushes_a_partial_batch_after_the_interval(recorder, start_writer):
+    writer = await start_writer(flush_interval=0.1)
+    await writer.put({"n": 0})
+    await writer.put({"n": 1})
+    await asyncio.sleep(0.05)
+    assert recorder.inserts == []
+    
+    await asyncio.sleep(0.1)
+    assert recorder.inserts == [[{"n": 0}, {"n": 1}]]
+
+async def test_put_blocks_while_the_buffer_is_full(recorder, start_writer):
+    writer = await start_writer(batch_size=1, max_buffered=2)
+    recorder.release.clear()
+    # The flusher takes the first row and is held in its insert; the next two fill the buffer
+    for i in range(3):
+        await writer.put({"n": i})
+        await asyncio.sleep(0.01)
+    
+    blocked = asyncio.create_task(writer.put({"n": 3}))
+    await asyncio.sleep(0.05)
+    assert not blocked.done()
+    assert writer.backpressure_waits == 1
+    
+    recorder.release.set()
+    await asyncio.wait_for(blocked, 1)
+    await writer.stop()
+    assert recorder.rows == [{"n": i} for i in range(4)]
+
+async def test_stop_drains_every_buffered_row(recorder, start_writer):
+    writer = await start_writer(batch_size=2)
+    for i in range(5):
+        await writer.put({"n": i})
+    
+    await writer.stop()
+    assert recorder.rows == [{"n": i} for i in range(5)]
+    assert writer.stats()["running"] is False
+    
+    # Once stopped, rows are written straight away
+    await writer.put({"n": 5})
+    assert recorder.inserts[-1] == [{"n": 5}]
+
+async def test_rows_with_different_columns_are_inserted_separately(recorder, start_writer):
+    writer = await start_writer(batch_size=3)
+    for row in ({"n": 0}, {"n": 1, "response_status": 200}, {"n": 2}):
+        await writer.put(row)
+    await asyncio.sleep(0.05)
+    
+    assert recorder.inserts == [[{"n": 0}, {"n": 2}], [{"n": 1, "response_status": 200}]]
+    assert (writer.batches, writer.flushed_rows) == (1, 3)